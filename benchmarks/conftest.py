@@ -0,0 +1,213 @@
+import json
+import random
+import statistics
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+
+import pytest
+from scim2_models import Error
+from scim2_server.backend import InMemoryBackend
+from scim2_server.provider import SCIMProvider
+from scim2_server.utils import load_default_resource_types
+from scim2_server.utils import load_default_schemas
+from werkzeug.serving import make_server
+from werkzeug.wrappers import Response
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("scim2-tester benchmarks")
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=5,
+        help="Number of rounds of each benchmark.",
+    )
+    group.addoption(
+        "--benchmark-json",
+        help="Write the benchmark results in this JSON file.",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        help="Fail if the benchmarks are slower than the results of this JSON file.",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.25,
+        help="Accepted slowdown ratio when comparing benchmark results.",
+    )
+
+
+class FaultInjectionMiddleware:
+    """Delay the responses of a WSGI application, and randomly replace some of them with errors.
+
+    :param app: The WSGI application.
+    :param latency: The delay added to every request, in seconds.
+    :param error_rate: The proportion of requests that get a 503 SCIM error
+        instead of being passed to the application.
+    :param seed: The seed of the random errors, so runs are reproducible.
+    """
+
+    def __init__(self, app, latency=0.0, error_rate=0.0, seed=0):
+        self.app = app
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            fail = self.random.random() < self.error_rate
+
+        if fail:
+            error = Error(status=503, detail="Injected error")
+            response = Response(
+                json.dumps(error.model_dump()),
+                status=503,
+                content_type="application/scim+json",
+            )
+            return response(environ, start_response)
+
+        return self.app(environ, start_response)
+
+
+def make_scim2_server(latency=0.0, error_rate=0.0):
+    app = SCIMProvider(InMemoryBackend())
+    for schema in load_default_schemas().values():
+        app.register_schema(schema)
+
+    for resource_type in load_default_resource_types().values():
+        app.register_resource_type(resource_type)
+
+    return FaultInjectionMiddleware(app, latency=latency, error_rate=error_rate)
+
+
+@pytest.fixture
+def scim2_server():
+    """Build in-process SCIM servers, with optional latency and errors."""
+    return make_scim2_server
+
+
+@pytest.fixture
+def scim2_server_url():
+    """Serve SCIM servers over HTTP, with optional latency and errors."""
+    servers = []
+
+    def serve(latency=0.0, error_rate=0.0):
+        app = make_scim2_server(latency=latency, error_rate=error_rate)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        servers.append((server, thread))
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield serve
+
+    for server, thread in servers:
+        server.shutdown()
+        thread.join()
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    timings: list[float] = field(default_factory=list)
+    extra: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "median": self.median,
+            "min": min(self.timings),
+            "max": max(self.timings),
+        }
+
+
+class Benchmark:
+    """Run a function several rounds and record its durations.
+
+    Additional measurements, like the transport time, can be stored in :attr:`extra`.
+    They are averaged over the rounds.
+    """
+
+    def __init__(self, name: str, rounds: int):
+        self.result = BenchmarkResult(name)
+        self.rounds = rounds
+
+    @property
+    def extra(self):
+        return self.result.extra
+
+    def __call__(self, func, *args, **kwargs):
+        returned = None
+        for _ in range(self.rounds):
+            start = time.perf_counter()
+            returned = func(*args, **kwargs)
+            self.result.timings.append(time.perf_counter() - start)
+        return returned
+
+    def record(self, key: str, value: float) -> None:
+        self.extra[key] = self.extra.get(key, 0.0) + value / self.rounds
+
+
+BENCHMARK_RESULTS: list[BenchmarkResult] = []
+
+
+@pytest.fixture
+def benchmark(request):
+    bench = Benchmark(request.node.name, request.config.getoption("benchmark_rounds"))
+    yield bench
+    if bench.result.timings:
+        BENCHMARK_RESULTS.append(bench.result)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not BENCHMARK_RESULTS:
+        return
+
+    terminalreporter.section("benchmarks")
+    for result in BENCHMARK_RESULTS:
+        extra = " ".join(f"{key}={value:.4f}" for key, value in result.extra.items())
+        terminalreporter.write_line(
+            f"{result.name}: median={result.median:.4f}s "
+            f"min={min(result.timings):.4f}s {extra}"
+        )
+
+    if path := config.getoption("benchmark_json"):
+        with open(path, "w") as fd:
+            json.dump([result.to_dict() for result in BENCHMARK_RESULTS], fd, indent=2)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session, exitstatus):
+    path = session.config.getoption("benchmark_compare")
+    if not path or not BENCHMARK_RESULTS:
+        return
+
+    with open(path) as fd:
+        baseline = {result["name"]: result["median"] for result in json.load(fd)}
+
+    tolerance = session.config.getoption("benchmark_tolerance")
+    regressions = [
+        f"{result.name}: {result.median:.4f}s instead of {baseline[result.name]:.4f}s"
+        for result in BENCHMARK_RESULTS
+        if result.name in baseline
+        and result.median > baseline[result.name] * (1 + tolerance)
+    ]
+    if regressions:
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        reporter.write("\n")
+        reporter.section("benchmark regressions", red=True)
+        for regression in regressions:
+            reporter.write_line(regression)
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
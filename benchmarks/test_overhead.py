@@ -0,0 +1,84 @@
+"""Measure the time spent in scim2-tester, apart from the transport time."""
+
+import pytest
+from scim2_client.engines.werkzeug import TestSCIMClient
+from werkzeug.test import Client
+
+from scim2_tester import CheckConfig
+from scim2_tester import CheckResult
+from scim2_tester import Status
+from scim2_tester import check_server
+from scim2_tester.filling import generate_random_values
+from scim2_tester.resource import creation_field_names
+from scim2_tester.resource import model_from_resource_type
+from scim2_tester.resource import replacement_field_names
+from scim2_tester.utils import checker
+
+
+@pytest.fixture
+def conf(scim2_server):
+    client = TestSCIMClient(Client(scim2_server()))
+    client.discover()
+    return CheckConfig(client)
+
+
+def test_check_server_overhead(benchmark, conf):
+    """Complete checks with an in-process server, split in transport time and tester overhead."""
+
+    def run():
+        results = check_server(conf.client)
+        duration = sum(result.duration for result in results)
+        transport_time = sum(result.metrics.transport_time for result in results)
+        benchmark.record("transport", transport_time)
+        benchmark.record("overhead", duration - transport_time)
+        benchmark.record("requests", sum(result.metrics.requests for result in results))
+        return results
+
+    results = benchmark(run)
+    assert all(result.status == Status.SUCCESS for result in results)
+
+
+@pytest.mark.parametrize("resource_type_id", ["User", "Group"])
+def test_value_generation(benchmark, conf, resource_type_id):
+    """Generate random objects, without performing any request."""
+    resource_type = next(
+        resource_type
+        for resource_type in conf.client.resource_types
+        if resource_type.id == resource_type_id
+    )
+    model = model_from_resource_type(conf, resource_type)
+    field_names = creation_field_names(model)
+
+    def run():
+        for _ in range(100):
+            generate_random_values(conf, model(), field_names)
+
+    benchmark(run)
+
+
+def test_model_introspection(benchmark, conf):
+    """Find the models and their fields from the resource types."""
+
+    def run():
+        for _ in range(100):
+            for resource_type in conf.client.resource_types:
+                model = model_from_resource_type(conf, resource_type)
+                creation_field_names(model)
+                replacement_field_names(model)
+
+    benchmark(run)
+
+
+def test_result_building(benchmark, conf):
+    """Decorate check results, without performing any request."""
+
+    @checker
+    def check_nothing(conf: CheckConfig) -> CheckResult:
+        """Do nothing."""
+        return CheckResult(conf, status=Status.SUCCESS)
+
+    def run():
+        for _ in range(1000):
+            check_nothing(conf)
+
+    benchmark(run)
@@ -0,0 +1,53 @@
+"""Measure the impact of the server latency and errors on the checks."""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from httpx import Client
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_client.engines.httpx import SyncSCIMClient
+
+from scim2_tester import CheckConfig
+from scim2_tester import check_server
+from scim2_tester import check_server_async
+from scim2_tester.load import run_load
+
+LATENCY = 0.02
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_threaded_checks_with_latency(benchmark, scim2_server_url, max_workers):
+    url = scim2_server_url(latency=LATENCY)
+    with Client(base_url=url) as http_client:
+        client = SyncSCIMClient(http_client)
+        client.discover()
+        benchmark(check_server, client, max_workers=max_workers)
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 10])
+def test_async_checks_with_latency(benchmark, scim2_server_url, max_concurrency):
+    url = scim2_server_url(latency=LATENCY)
+
+    async def run():
+        async with AsyncClient(base_url=url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            return await check_server_async(client, max_concurrency=max_concurrency)
+
+    benchmark(lambda: asyncio.run(run()))
+
+
+@pytest.mark.parametrize("error_rate", [0.0, 0.1])
+def test_load_with_errors(benchmark, scim2_server_url, error_rate):
+    url = scim2_server_url(latency=LATENCY, error_rate=error_rate)
+    with Client(base_url=url) as http_client:
+        client = SyncSCIMClient(http_client)
+        client.discover()
+        conf = CheckConfig(client)
+
+        def run():
+            report = run_load(conf, iterations=10, workers=5)
+            benchmark.record("error_rate", report.error_rate)
+            benchmark.record("p95", report.operations["lifecycle"].p95)
+
+        benchmark(run)
@@ -1,7 +1,53 @@
-from .checker import check_server
-from .utils import CheckConfig
-from .utils import CheckResult
-from .utils import SCIMTesterError
-from .utils import Status
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["check_server", "Status", "CheckResult", "CheckConfig", "SCIMTesterError"]
+if TYPE_CHECKING:
+    from .checker import check_server
+    from .checker import check_server_async
+    from .checker import iter_check_server
+    from .checker import iter_check_server_async
+    from .utils import CheckConfig
+    from .utils import CheckResult
+    from .utils import Retention
+    from .utils import SCIMTesterError
+    from .utils import Status
+
+# The submodules import scim2-client, scim2-models and pydantic,
+# they are only imported when one of their attributes is accessed.
+_lazy_attributes = {
+    "check_server": "checker",
+    "check_server_async": "checker",
+    "iter_check_server": "checker",
+    "iter_check_server_async": "checker",
+    "CheckConfig": "utils",
+    "CheckResult": "utils",
+    "Retention": "utils",
+    "SCIMTesterError": "utils",
+    "Status": "utils",
+}
+
+__all__ = [
+    "check_server",
+    "check_server_async",
+    "iter_check_server",
+    "iter_check_server_async",
+    "Status",
+    "CheckResult",
+    "CheckConfig",
+    "Retention",
+    "SCIMTesterError",
+]
+
+
+def __getattr__(name: str):
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f".{_lazy_attributes[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,3 @@
+from scim2_tester.cli import main
+
+main()
@@ -0,0 +1,238 @@
+import json
+from collections.abc import Iterator
+
+from scim2_models import Bulk
+from scim2_models import BulkOperation
+from scim2_models import BulkRequest
+from scim2_models import BulkResponse
+from scim2_models import Context
+from scim2_models import Meta
+from scim2_models import Resource
+
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import SCIMTesterError
+from scim2_tester.utils import Steps
+from scim2_tester.utils import journal_created
+from scim2_tester.utils import journal_deleted
+from scim2_tester.utils import steps
+
+BULK_URL = "/Bulk"
+
+
+class PartialCreationError(SCIMTesterError):
+    """Exception raised when only some objects of a batch could be created.
+
+    :param created: The objects that were created before or besides the failure.
+    """
+
+    def __init__(self, message: str, conf: CheckConfig, created: list[Resource]):
+        super().__init__(message, conf)
+        self.created = created
+
+
+def bulk_config(conf: CheckConfig) -> Bulk | None:
+    """Return the bulk configuration of the server, or :data:`None` if it does not support bulk requests."""
+    service_provider_config = getattr(conf.client, "service_provider_config", None)
+    bulk = service_provider_config.bulk if service_provider_config else None
+    return bulk if bulk and bulk.supported else None
+
+
+def creation_operation(conf: CheckConfig, obj: Resource) -> dict:
+    operation = BulkOperation(
+        method=BulkOperation.Method.post,
+        bulk_id=conf.value_generator.uuid().hex,
+        path=conf.client.resource_endpoint(obj.__class__),
+    )
+    # Operations are dumped by hand because scim2-models would normalize
+    # the case of the attributes names of the data payload.
+    return {
+        **operation.model_dump(),
+        "data": obj.model_dump(scim_ctx=Context.RESOURCE_CREATION_REQUEST),
+    }
+
+
+def deletion_operation(conf: CheckConfig, obj: Resource) -> dict:
+    operation = BulkOperation(
+        method=BulkOperation.Method.delete,
+        path=f"{conf.client.resource_endpoint(obj.__class__)}/{obj.id}",
+    )
+    return operation.model_dump()
+
+
+def split_operations(bulk: Bulk, operations: list[dict]) -> Iterator[list[dict]]:
+    """Split operations in batches respecting the server ``maxOperations`` and ``maxPayloadSize``."""
+    envelope_size = len(json.dumps(BulkRequest(operations=[]).model_dump()))
+    batch: list[dict] = []
+    batch_size = envelope_size
+    for operation in operations:
+        operation_size = len(json.dumps(operation)) + 1
+        if batch and (
+            (bulk.max_operations and len(batch) >= bulk.max_operations)
+            or (
+                bulk.max_payload_size
+                and batch_size + operation_size > bulk.max_payload_size
+            )
+        ):
+            yield batch
+            batch = []
+            batch_size = envelope_size
+
+        batch.append(operation)
+        batch_size += operation_size
+
+    if batch:
+        yield batch
+
+
+def bulk_payload(operations: list[dict]) -> dict:
+    return {**BulkRequest(operations=[]).model_dump(), "Operations": operations}
+
+
+def parse_bulk_response(
+    conf: CheckConfig, operations: list[dict], payload: dict | None
+) -> list[BulkOperation]:
+    """Validate a bulk response, and return its operations in the order of the request operations."""
+    response = BulkResponse.model_validate(payload or {})
+    response_operations = response.operations or []
+    by_bulk_id = {
+        operation.bulk_id: operation
+        for operation in response_operations
+        if operation.bulk_id
+    }
+    if len(response_operations) != len(operations):
+        raise SCIMTesterError(
+            f"The bulk response has {len(response_operations)} operations instead of {len(operations)}",
+            conf,
+        )
+
+    # Operations are matched by bulkId when available, by position otherwise.
+    return [
+        by_bulk_id.get(operation.get("bulkId", ""), response_operation)
+        for operation, response_operation in zip(
+            operations, response_operations, strict=False
+        )
+    ]
+
+
+def check_operations(
+    conf: CheckConfig, operations: list[BulkOperation], expected_statuses: list[int]
+) -> None:
+    for operation in operations:
+        if operation.status not in expected_statuses:
+            raise SCIMTesterError(
+                f"Bulk {operation.method.value if operation.method else ''} operation on "
+                f"{operation.location or operation.path} returned status {operation.status} "
+                f"instead of {expected_statuses[0]}: {operation.response}",
+                conf,
+            )
+
+
+def created_object(
+    conf: CheckConfig, obj: Resource, operation: BulkOperation
+) -> Resource:
+    """Build the created object from a bulk operation response.
+
+    Servers are not required to return the created object, so the
+    request object is completed with the id and the location if there is none.
+    """
+    if operation.response:
+        return obj.__class__.model_validate(
+            operation.response, scim_ctx=Context.RESOURCE_CREATION_RESPONSE
+        )
+
+    if not operation.location:
+        raise SCIMTesterError(
+            f"Bulk POST operation {operation.bulk_id} on {operation.path} "
+            "returned neither the created object nor its location",
+            conf,
+        )
+
+    return obj.model_copy(
+        update={
+            "id": operation.location.rstrip("/").split("/")[-1],
+            "meta": Meta(location=operation.location),
+        }
+    )
+
+
+def bulk_request(
+    conf: CheckConfig, operations: list[dict]
+) -> Steps[list[BulkOperation]]:
+    """Perform bulk requests, and return the response operations."""
+    bulk = bulk_config(conf)
+    if bulk is None:
+        raise SCIMTesterError("The server does not support bulk operations", conf)
+
+    response_operations = []
+    for batch in split_operations(bulk, operations):
+        payload = yield conf.client.create(
+            bulk_payload(batch),
+            check_request_payload=False,
+            check_response_payload=False,
+            expected_status_codes=[200],
+            url=BULK_URL,
+        )
+        response_operations += parse_bulk_response(conf, batch, payload)
+    return response_operations
+
+
+def bulk_created(
+    conf: CheckConfig, objects: list[Resource], operations: list[BulkOperation]
+) -> list[Resource]:
+    # Successful creations are recorded before failures are reported,
+    # so the created objects can be cleaned up in any case.
+    created = []
+    error = None
+    for obj, operation in zip(objects, operations, strict=True):
+        if operation.status == 201:
+            try:
+                created.append(created_object(conf, obj, operation))
+            except SCIMTesterError as exc:
+                error = error or exc
+
+    journal_created(conf, created)
+    try:
+        check_operations(conf, operations, [201])
+    except SCIMTesterError as exc:
+        error = exc
+
+    if error:
+        raise PartialCreationError(error.message, conf, created) from error
+    return created
+
+
+def bulk_deleted(
+    conf: CheckConfig,
+    objects: list[Resource],
+    operations: list[BulkOperation],
+    missing_ok: bool,
+) -> None:
+    statuses = [200, 204, 404] if missing_ok else [200, 204]
+    journal_deleted(
+        conf,
+        [
+            obj
+            for obj, operation in zip(objects, operations, strict=True)
+            if operation.status in statuses
+        ],
+    )
+    check_operations(conf, operations, statuses)
+
+
+@steps
+def bulk_create(conf: CheckConfig, objects: list[Resource]) -> Steps[list[Resource]]:
+    """Create objects with bulk requests, and return the created objects."""
+    operations = [creation_operation(conf, obj) for obj in objects]
+    return bulk_created(conf, objects, (yield from bulk_request(conf, operations)))
+
+
+@steps
+def bulk_delete(
+    conf: CheckConfig, objects: list[Resource], missing_ok: bool = False
+) -> Steps[None]:
+    """Delete objects with bulk requests.
+
+    :param missing_ok: Whether objects that are already deleted should be ignored.
+    """
+    operations = [deletion_operation(conf, obj) for obj in objects]
+    bulk_deleted(conf, objects, (yield from bulk_request(conf, operations)), missing_ok)
@@ -1,24 +1,63 @@
-import argparse
-import uuid
+import asyncio
+from collections.abc import AsyncGenerator
+from collections.abc import Generator
+from typing import Any
 
 from scim2_client import SCIMClient
 from scim2_models import Error
+from scim2_models import Resource
 
-from scim2_tester.resource import check_resource_type
+from scim2_tester.bulk import bulk_config
+from scim2_tester.bulk import bulk_create
+from scim2_tester.bulk import bulk_delete
+from scim2_tester.cleanup import delete_fixtures
+from scim2_tester.cleanup import delete_objects
+from scim2_tester.discovery import build_resource_models
+from scim2_tester.filling import fill_with_random_values
+from scim2_tester.filling import minimal_field_names
+from scim2_tester.fixtures import FixturePool
+from scim2_tester.journal import Journal
+from scim2_tester.registry import DISCOVERY_DATA
+from scim2_tester.registry import checks
+from scim2_tester.registry import needed_data
+from scim2_tester.registry import producer
+from scim2_tester.registry import register
+from scim2_tester.registry import select_checks
+from scim2_tester.resource import lifecycle_check_names
+from scim2_tester.resource import lifecycle_graph
+from scim2_tester.resource import model_from_resource_type
 from scim2_tester.resource_types import check_resource_types_endpoint
+from scim2_tester.scheduler import Graph
+from scim2_tester.scheduler import Node
+from scim2_tester.scheduler import as_list
+from scim2_tester.scheduler import iter_graphs
+from scim2_tester.scheduler import iter_graphs_async
+from scim2_tester.scheduler import skipped_graph
 from scim2_tester.schemas import check_schemas_endpoint
 from scim2_tester.service_provider_config import check_service_provider_config_endpoint
 from scim2_tester.utils import CheckConfig
 from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Retention
+from scim2_tester.utils import SCIMTesterError
 from scim2_tester.utils import Status
+from scim2_tester.utils import Steps
+from scim2_tester.utils import StepsFunction
+from scim2_tester.utils import asynchronous
 from scim2_tester.utils import checker
+from scim2_tester.utils import hold_last_result
+from scim2_tester.utils import hold_last_result_async
+from scim2_tester.utils import run_steps_async
+from scim2_tester.values import ValueGenerator
 
 
+@register(needs=["resource_models"], tags=["misc"])
 @checker
-def check_random_url(conf: CheckConfig) -> CheckResult:
+def check_random_url(conf: CheckConfig) -> Steps[CheckResult]:
     """Check that a request to a random URL returns a 404 Error object."""
-    probably_invalid_url = f"/{str(uuid.uuid4())}"
-    response = conf.client.query(url=probably_invalid_url, raise_scim_errors=False)
+    probably_invalid_url = f"/{conf.value_generator.string()}"
+    response = yield conf.client.query(
+        url=probably_invalid_url, raise_scim_errors=False
+    )
 
     if not isinstance(response, Error):
         return CheckResult(
@@ -44,7 +83,63 @@ def check_random_url(conf: CheckConfig) -> CheckResult:
     )
 
 
-def check_server(client: SCIMClient, raise_exceptions=False) -> list[CheckResult]:
+def first_resource_model(conf: CheckConfig) -> type[Resource] | None:
+    """Return the model of the first resource type, used by checks that need any kind of resource."""
+    for resource_type in conf.client.resource_types or []:
+        if model := model_from_resource_type(conf, resource_type):
+            return model
+
+    return None
+
+
+@register(needs=DISCOVERY_DATA, tags=["bulk"])
+@checker
+def check_bulk_endpoint(conf: CheckConfig, model: type[Resource]) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.7 <7644#section-3.7>`, the `/Bulk` endpoint performs several operations in one request.
+
+    An object is created, then deleted, with bulk requests.
+    """
+    garbages: list[Resource] = []
+    try:
+        obj, garbages = yield from fill_with_random_values.steps(
+            conf, model(), minimal_field_names(model)
+        )
+        created = yield from bulk_create.steps(conf, [obj])
+        try:
+            yield from bulk_delete.steps(conf, created)
+        except SCIMTesterError:
+            # The created object is deleted with the garbages instead.
+            garbages += created
+            raise
+    except SCIMTesterError as exc:
+        return CheckResult(conf, status=Status.ERROR, reason=exc.message)
+    finally:
+        yield from delete_objects.steps(conf, garbages, missing_ok=True)
+
+    return CheckResult(
+        conf,
+        status=Status.SUCCESS,
+        reason=f"Successful bulk creation and deletion of a {model.__name__} object with id {created[0].id}",
+        data=created[0],
+    )
+
+
+check_random_url_async = asynchronous(check_random_url)
+check_bulk_endpoint_async = asynchronous(check_bulk_endpoint)
+
+
+def check_server(
+    client: SCIMClient,
+    raise_exceptions=False,
+    max_workers=None,
+    journal: Journal | None = None,
+    share_fixtures=True,
+    retention: Retention = Retention.ALL,
+    lazy_payloads=False,
+    random_seed: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+) -> list[CheckResult]:
     """Perform a series of check to a SCIM server.
 
     It starts by retrieving the standard :class:`~scim2_models.ServiceProviderConfig`,
@@ -56,66 +151,332 @@ def check_server(client: SCIMClient, raise_exceptions=False) -> list[CheckResult
 
     :param client: A SCIM client that will perform the requests.
     :param raise_exceptions: Whether exceptions should be raised or stored in a :class:`~scim2_tester.CheckResult` object.
+    :param max_workers: If set, the resource types are checked concurrently in this number of threads.
+        See :attr:`~scim2_tester.CheckConfig.max_workers`.
+    :param journal: If set, the created and deleted resources are recorded in this journal.
+        See :attr:`~scim2_tester.CheckConfig.journal`.
+    :param share_fixtures: Whether the resources targeted by references are created once
+        and shared by all the checks, instead of being created for every checked object.
+        See :attr:`~scim2_tester.CheckConfig.fixture_pool`.
+    :param retention: What the returned results keep.
+        See :attr:`~scim2_tester.CheckConfig.retention`.
+    :param lazy_payloads: Whether list responses are validated only when the result data is accessed.
+        See :attr:`~scim2_tester.CheckConfig.lazy_payloads`.
+    :param random_seed: The seed of the random values, to reproduce a run.
+        See :attr:`~scim2_tester.CheckConfig.value_generator`.
+    :param include_checks: The names or tags of the checks to run, with the checks they require.
+        See :attr:`~scim2_tester.CheckConfig.include_checks`.
+    :param exclude_checks: The names or tags of the checks not to run.
+        See :attr:`~scim2_tester.CheckConfig.exclude_checks`.
+    """
+    return list(
+        iter_check_server(
+            client,
+            raise_exceptions,
+            max_workers,
+            journal,
+            share_fixtures,
+            retention,
+            lazy_payloads,
+            random_seed,
+            include_checks,
+            exclude_checks,
+        )
+    )
+
+
+def iter_check_server(
+    client: SCIMClient,
+    raise_exceptions=False,
+    max_workers=None,
+    journal: Journal | None = None,
+    share_fixtures=True,
+    retention: Retention = Retention.ALL,
+    lazy_payloads=False,
+    random_seed: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+) -> Generator[CheckResult, None, None]:
+    """Like :func:`~scim2_tester.check_server`, but yield the results as soon as they are available.
+
+    The results can be displayed progressively, and the checks can be stopped early,
+    for instance at the first error, by stopping the iteration.
+    The temporary and shared resources are deleted even if the iteration is stopped early.
+    """
+    conf = CheckConfig(
+        client,
+        raise_exceptions,
+        max_workers=max_workers,
+        journal=journal,
+        fixture_pool=FixturePool() if share_fixtures else None,
+        retention=retention,
+        lazy_payloads=lazy_payloads,
+        value_generator=ValueGenerator(random_seed),
+        include_checks=include_checks,
+        exclude_checks=exclude_checks,
+    )
+    results = iter_checks(conf)
+    try:
+        for result in results:
+            yield result.retain()
+    finally:
+        results.close()
+
+
+def discovered_data(client: SCIMClient) -> set[str]:
+    """Return the discovery data already registered to a client."""
+    return {data for data in DISCOVERY_DATA if getattr(client, data, None)}
+
+
+def configure_client(client: SCIMClient, outputs: dict[str, Any]) -> None:
+    """Register the discovered configuration resources to a client, if no other have been registered yet."""
+    if not client.service_provider_config:
+        client.service_provider_config = outputs.get("service_provider_config")
+
+    if not client.resource_types:
+        client.resource_types = outputs.get("resource_types")
+
+    # The schemas endpoint provides the schemas the resource models are built from.
+    if not client.resource_models:
+        client.resource_models = build_resource_models(
+            client,
+            client.resource_types or [],
+            outputs.get("resource_models") or [],
+        )
+
+
+def unavailable_data_reason(
+    conf: CheckConfig, name: str, selected: set[str]
+) -> str | None:
+    """Return why a check cannot run, if the discovery data it needs is missing."""
+    needed = needed_data(name) - discovered_data(conf.client)
+    missing = [data for data in DISCOVERY_DATA if data in needed]
+    if not missing:
+        return None
+
+    check = producer(missing[0])
+    if check not in selected:
+        return f"Skipped because {check} was not run"
+
+    return f"Skipped because {check} did not provide the {missing[0]}"
+
+
+def discovery_node(name: str, check: StepsFunction, outputs: dict[str, Any]) -> Node:
+    """Return a node running a discovery check, and storing the discovered data in `outputs`."""
+
+    def run(conf: CheckConfig, data: dict[str, Any]) -> Steps[Any]:
+        result = yield from check.steps(conf)
+        if (produces := checks[name].produces) is not None:
+            outputs[produces] = as_list(result)[0].data
+        return result
+
+    return Node(name, run)
+
+
+def discovery_graphs(outputs: dict[str, Any]) -> list[Graph]:
+    """Return the checks of the discovery endpoints, that can run concurrently."""
+    endpoints = {
+        "check_service_provider_config_endpoint": check_service_provider_config_endpoint,
+        "check_resource_types_endpoint": check_resource_types_endpoint,
+        "check_schemas_endpoint": check_schemas_endpoint,
+    }
+    return [
+        Graph([discovery_node(name, check, outputs)])
+        for name, check in endpoints.items()
+    ]
+
+
+def server_graphs(conf: CheckConfig, selected: set[str]) -> list[Graph]:
+    """Return the checks needing the discovery data.
+
+    If the data is missing, the checks are skipped.
     """
-    conf = CheckConfig(client, raise_exceptions)
-    results = []
+    graphs = []
+    if reason := unavailable_data_reason(conf, "check_random_url", selected):
+        graphs.append(skipped_graph(["check_random_url"], reason))
+    else:
+        graphs.append(
+            Graph(
+                [
+                    Node(
+                        "check_random_url",
+                        lambda conf, data: check_random_url.steps(conf),
+                    )
+                ]
+            )
+        )
+
+    if reason := unavailable_data_reason(conf, "check_bulk_endpoint", selected):
+        graphs.append(skipped_graph(["check_bulk_endpoint"], reason))
+    elif bulk_config(conf) and (model := first_resource_model(conf)):
+        graphs.append(
+            Graph(
+                [
+                    Node(
+                        "check_bulk_endpoint",
+                        lambda conf, data: check_bulk_endpoint.steps(conf, model),
+                    )
+                ]
+            )
+        )
+
+    if reason := unavailable_data_reason(conf, "check_object_creation", selected):
+        graphs.append(skipped_graph(lifecycle_check_names(conf), reason))
+    else:
+        graphs += [
+            lifecycle_graph(conf, resource_type)
+            for resource_type in conf.client.resource_types or []
+        ]
+
+    return graphs
+
+
+def iter_checks(conf: CheckConfig) -> Generator[CheckResult, None, None]:
+    selected = select_checks(
+        conf.include_checks,
+        conf.exclude_checks or (),
+        available=discovered_data(conf.client),
+    )
 
     # Get the initial basic objects
-    result_spc = check_service_provider_config_endpoint(conf)
-    results.append(result_spc)
-    if not conf.client.service_provider_config:
-        conf.client.service_provider_config = result_spc.data
-
-    results_resource_types = check_resource_types_endpoint(conf)
-    results.extend(results_resource_types)
-    if not conf.client.resource_types:
-        conf.client.resource_types = results_resource_types[0].data
-
-    results_schemas = check_schemas_endpoint(conf)
-    results.extend(results_schemas)
-    if not conf.client.resource_models:
-        conf.client.resource_models = conf.client.build_resource_models(
-            conf.client.resource_types or [], results_schemas[0].data or []
+    outputs: dict[str, Any] = {}
+    yield from iter_graphs(conf, discovery_graphs(outputs), selected)
+    configure_client(conf.client, outputs)
+
+    # Shared fixtures are deleted once all the checks are done.
+    yield from hold_last_result(
+        iter_graphs(conf, server_graphs(conf, selected), selected),
+        lambda: delete_fixtures(conf),
+    )
+
+
+async def check_server_async(
+    client: SCIMClient,
+    raise_exceptions=False,
+    max_concurrency=10,
+    journal: Journal | None = None,
+    share_fixtures=True,
+    retention: Retention = Retention.ALL,
+    lazy_payloads=False,
+    random_seed: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+) -> list[CheckResult]:
+    """Perform a series of check to a SCIM server, with an asynchronous client.
+
+    This performs the same checks than :func:`~scim2_tester.check_server`,
+    and returns the results in the same order, but independent checks are run concurrently:
+    the :class:`~scim2_models.ServiceProviderConfig`, :class:`~scim2_models.Schema` and
+    :class:`~scim2_models.ResourceType` endpoints, every individual schema and resource type,
+    and the lifecycles of every resource type.
+
+    :param client: An asynchronous SCIM client that will perform the requests,
+        for instance a :class:`~scim2_client.engines.httpx.AsyncSCIMClient`.
+    :param raise_exceptions: Whether exceptions should be raised or stored in a :class:`~scim2_tester.CheckResult` object.
+    :param max_concurrency: The maximum number of requests performed at the same time.
+    :param journal: If set, the created and deleted resources are recorded in this journal.
+        See :attr:`~scim2_tester.CheckConfig.journal`.
+    :param share_fixtures: Whether the resources targeted by references are created once
+        and shared by all the checks, instead of being created for every checked object.
+        See :attr:`~scim2_tester.CheckConfig.fixture_pool`.
+    :param retention: What the returned results keep.
+        See :attr:`~scim2_tester.CheckConfig.retention`.
+    :param lazy_payloads: Whether list responses are validated only when the result data is accessed.
+        See :attr:`~scim2_tester.CheckConfig.lazy_payloads`.
+    :param random_seed: The seed of the random values, to reproduce a run.
+        See :attr:`~scim2_tester.CheckConfig.value_generator`.
+    :param include_checks: The names or tags of the checks to run, with the checks they require.
+        See :attr:`~scim2_tester.CheckConfig.include_checks`.
+    :param exclude_checks: The names or tags of the checks not to run.
+        See :attr:`~scim2_tester.CheckConfig.exclude_checks`.
+    """
+    return [
+        result
+        async for result in iter_check_server_async(
+            client,
+            raise_exceptions,
+            max_concurrency,
+            journal,
+            share_fixtures,
+            retention,
+            lazy_payloads,
+            random_seed,
+            include_checks,
+            exclude_checks,
         )
+    ]
 
-    if (
-        not conf.client.service_provider_config
-        or not conf.client.resource_types
-        or not conf.client.resource_models
-    ):
-        return results
 
-    # Miscelleaneous checks
-    result_random = check_random_url(conf)
-    results.append(result_random)
+async def iter_check_server_async(
+    client: SCIMClient,
+    raise_exceptions=False,
+    max_concurrency=10,
+    journal: Journal | None = None,
+    share_fixtures=True,
+    retention: Retention = Retention.ALL,
+    lazy_payloads=False,
+    random_seed: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+) -> AsyncGenerator[CheckResult, None]:
+    """Like :func:`~scim2_tester.check_server_async`, but yield the results as soon as they are available.
 
-    # Resource checks
-    for resource_type in conf.client.resource_types or []:
-        results.extend(check_resource_type(conf, resource_type))
+    Results are yielded in the same order than :func:`~scim2_tester.iter_check_server`.
+    If the iteration is stopped early, the running checks are cancelled,
+    and the temporary and shared resources are deleted.
+    """
+    conf = CheckConfig(
+        client,
+        raise_exceptions,
+        journal=journal,
+        fixture_pool=FixturePool() if share_fixtures else None,
+        retention=retention,
+        lazy_payloads=lazy_payloads,
+        value_generator=ValueGenerator(random_seed),
+        include_checks=include_checks,
+        exclude_checks=exclude_checks,
+    )
+    results = iter_checks_async(conf, asyncio.Semaphore(max_concurrency))
+    try:
+        async for result in results:
+            yield result.retain()
+    finally:
+        await results.aclose()
 
-    return results
 
+async def iter_checks_async(
+    conf: CheckConfig, semaphore: asyncio.Semaphore
+) -> AsyncGenerator[CheckResult, None]:
+    selected = select_checks(
+        conf.include_checks,
+        conf.exclude_checks or (),
+        available=discovered_data(conf.client),
+    )
 
-if __name__ == "__main__":
-    from httpx import Client
-    from scim2_client.engines.httpx import SyncSCIMClient
-
-    parser = argparse.ArgumentParser(description="Process some integers.")
-    parser.add_argument("host")
-    parser.add_argument("--token", required=False)
-    parser.add_argument("--verbose", required=False, action="store_true")
-    args = parser.parse_args()
-
-    client = Client(
-        base_url=args.host,
-        headers={"Authorization": f"Bearer {args.token}"} if args.token else None,
+    # Get the initial basic objects
+    outputs: dict[str, Any] = {}
+    results = iter_graphs_async(conf, discovery_graphs(outputs), selected, semaphore)
+    try:
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
+
+    configure_client(conf.client, outputs)
+
+    # Shared fixtures are deleted once all the checks are done.
+    results = hold_last_result_async(
+        iter_graphs_async(conf, server_graphs(conf, selected), selected, semaphore),
+        lambda: run_steps_async(delete_fixtures.steps(conf), semaphore),
     )
-    scim = SyncSCIMClient(client)
-    scim.discover()
-    results = check_server(scim)
-    for result in results:
-        print(result.status.name, result.title)
-        if result.reason:
-            print("  ", result.reason)
-            if args.verbose and result.data:
-                print("  ", result.data)
+    try:
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
+
+
+if __name__ == "__main__":
+    from scim2_tester.cli import main
+
+    main()
@@ -0,0 +1,209 @@
+import dataclasses
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import partial
+
+from scim2_client import SCIMClientError
+from scim2_models import Error
+from scim2_models import Resource
+
+from scim2_tester.bulk import bulk_config
+from scim2_tester.bulk import bulk_delete
+from scim2_tester.journal import Journal
+from scim2_tester.plan import model_index
+from scim2_tester.plan import model_plan
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import Concurrently
+from scim2_tester.utils import SCIMTesterError
+from scim2_tester.utils import Steps
+from scim2_tester.utils import journal_deleted
+from scim2_tester.utils import map_in_threads
+from scim2_tester.utils import steps
+
+CLEANUP_WORKERS = 4
+"""The number of threads deleting objects when :attr:`~scim2_tester.CheckConfig.max_workers` is not set."""
+
+
+def referenced_locations(obj) -> set[str]:
+    """Return the locations of the resources referenced by an object and its complex attributes."""
+    locations = set()
+    for field in model_plan(obj.__class__).fields.values():
+        value = getattr(obj, field.name, None)
+        if value is None or (
+            field.reference_names is None and field.nested_model is None
+        ):
+            continue
+
+        for item in value if field.is_multiple else [value]:
+            if field.reference_names is not None:
+                locations.add(str(item))
+
+            elif item is not None:
+                locations |= referenced_locations(item)
+
+    return locations
+
+
+def deletion_levels(objects: list[Resource]) -> Iterator[list[Resource]]:
+    """Group objects so each group is only referenced by the previous groups.
+
+    The objects of a group can be deleted concurrently,
+    once the objects of the previous groups are deleted.
+    """
+    remaining = list(objects)
+    while remaining:
+        referenced = set().union(*(referenced_locations(obj) for obj in remaining))
+        level = [
+            obj
+            for obj in remaining
+            if not obj.meta or obj.meta.location not in referenced
+        ]
+        # Circular references cannot be ordered, delete them anyway.
+        level = level or remaining
+        yield level
+        remaining = [obj for obj in remaining if obj not in level]
+
+
+@steps
+def delete_object(
+    conf: CheckConfig, obj: Resource, missing_ok: bool = False
+) -> Steps[None]:
+    """Delete an object, and record its deletion in the journal.
+
+    Servers answering ``200`` instead of ``204`` are tolerated,
+    as this is not what is being checked.
+    """
+    response = yield conf.client.delete(
+        obj.__class__,
+        obj.id,
+        expected_status_codes=[200, 204, 404] if missing_ok else [200, 204],
+        raise_scim_errors=not missing_ok,
+    )
+    if isinstance(response, Error) and response.status != 404:
+        raise SCIMTesterError(
+            f"Could not delete {obj.__class__.__name__} object with id {obj.id}: {response.detail}",
+            conf,
+        )
+
+    journal_deleted(conf, [obj])
+
+
+@steps
+def delete_objects(
+    conf: CheckConfig, objects: list[Resource], missing_ok: bool = False
+) -> Steps[None]:
+    """Delete objects, the ones referencing others first.
+
+    If the server supports bulk operations, objects are deleted with bulk requests.
+    Else independent objects are deleted concurrently,
+    in threads with synchronous clients, and in tasks with asynchronous clients.
+
+    :param missing_ok: Whether objects that are already deleted should be ignored.
+    """
+    if bulk_config(conf):
+        if objects:
+            yield from bulk_delete.steps(
+                conf,
+                [obj for level in deletion_levels(objects) for obj in level],
+                missing_ok,
+            )
+        return
+
+    for level in deletion_levels(objects):
+        yield Concurrently(
+            conf,
+            [
+                partial(delete_object.steps, obj=obj, missing_ok=missing_ok)
+                for obj in level
+            ],
+            max_workers=conf.max_workers or CLEANUP_WORKERS,
+        )
+
+
+@steps
+def delete_fixtures(conf: CheckConfig) -> Steps[None]:
+    """Delete the objects of the configuration :attr:`~scim2_tester.CheckConfig.fixture_pool`, if any."""
+    if conf.fixture_pool is not None:
+        yield from delete_objects.steps(
+            conf, conf.fixture_pool.clear(), missing_ok=True
+        )
+
+
+@dataclass
+class CleanupReport:
+    """The results of a journal cleanup."""
+
+    remaining: list[Resource] = dataclasses.field(default_factory=list)
+    """The resources that could not be deleted."""
+
+    errors: list[str] = dataclasses.field(default_factory=list)
+    """Why resources could not be deleted."""
+
+
+def cleanup_journal(
+    conf: CheckConfig, journal: Journal, since: int = 0
+) -> CleanupReport:
+    """Delete the resources created but not deleted by previous runs, according to a journal.
+
+    Resources that are already deleted are ignored.
+    The client resource models must have been discovered.
+
+    If the server supports bulk operations, resources are deleted with bulk requests
+    in reverse creation order, since objects are always created after the objects they reference.
+    Else resources are read to find their references,
+    and deleted concurrently level by level, the referencing ones first.
+
+    :param since: The number of journal entries to skip, see :meth:`~scim2_tester.journal.Journal.leftovers`.
+    """
+    conf = dataclasses.replace(
+        conf, journal=journal, max_workers=conf.max_workers or CLEANUP_WORKERS
+    )
+    index = model_index(tuple(conf.client.resource_models or ()))
+    leftovers = []
+    for entry in journal.leftovers(since):
+        model = index.by_schema.get(entry.schema)
+        if model is None:
+            raise SCIMTesterError(f"No model matching the schema {entry.schema}", conf)
+
+        leftovers.append(model(id=entry.id))
+
+    leftovers.reverse()
+    report = CleanupReport()
+    lock = threading.Lock()
+
+    def delete(conf: CheckConfig, obj: Resource) -> None:
+        try:
+            delete_object(conf, obj, missing_ok=True)
+        except (SCIMClientError, SCIMTesterError) as exc:
+            with lock:
+                report.errors.append(str(exc))
+
+    if bulk_config(conf):
+        try:
+            bulk_delete(conf, leftovers, missing_ok=True)
+        except (SCIMClientError, SCIMTesterError) as exc:
+            report.errors.append(str(exc))
+
+    else:
+        for level in deletion_levels(map_in_threads(conf, read_leftover, leftovers)):
+            map_in_threads(conf, delete, level)
+
+    remaining = {(entry.schema, entry.id) for entry in journal.leftovers(since)}
+    report.remaining = [
+        obj
+        for obj in leftovers
+        if (obj.__class__.model_fields["schemas"].default[0], obj.id) in remaining
+    ]
+    return report
+
+
+def read_leftover(conf: CheckConfig, obj: Resource) -> Resource:
+    """Read a leftover resource to know the resources it references.
+
+    The bare resource is returned if it cannot be read, for instance because it is already deleted.
+    """
+    try:
+        return conf.client.query(obj.__class__, obj.id)
+    except (SCIMClientError, SCIMTesterError):
+        return obj
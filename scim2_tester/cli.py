@@ -0,0 +1,461 @@
+import argparse
+import contextlib
+
+
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a positive integer")
+    return number
+
+
+def positive_float(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a positive number")
+    return number
+
+
+def resource_type_count(value: str) -> tuple[str, int]:
+    resource_type, separator, count = value.partition("=")
+    if not separator or not resource_type:
+        raise argparse.ArgumentTypeError(f"{value!r} is not RESOURCE_TYPE=COUNT")
+    return resource_type, positive_int(count)
+
+
+def positive_ints(value: str) -> list[int]:
+    return [positive_int(item) for item in value.split(",")]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Check SCIM RFCs server compliance.")
+    parser.add_argument("host", nargs="?")
+    parser.add_argument("--token", required=False)
+    parser.add_argument("--verbose", required=False, action="store_true")
+    parser.add_argument("--max-workers", required=False, type=positive_int)
+    parser.add_argument(
+        "--load-iterations",
+        required=False,
+        type=positive_int,
+        help="Run a load test with this number of lifecycles instead of the checks.",
+    )
+    parser.add_argument(
+        "--load-duration",
+        required=False,
+        type=positive_float,
+        help="Run a load test for this number of seconds instead of the checks.",
+    )
+    parser.add_argument("--load-workers", required=False, type=positive_int, default=1)
+    parser.add_argument("--load-rate", required=False, type=positive_float)
+    parser.add_argument("--load-open-loop", required=False, action="store_true")
+    parser.add_argument(
+        "--seed-resources",
+        required=False,
+        type=positive_int,
+        metavar="COUNT",
+        help="Create this number of random resources of every resource type instead of running the checks. Needs a --journal.",
+    )
+    parser.add_argument(
+        "--seed-count",
+        required=False,
+        type=resource_type_count,
+        action="append",
+        default=[],
+        metavar="RESOURCE_TYPE=COUNT",
+        help="Create this number of random resources of a resource type when seeding.",
+    )
+    parser.add_argument(
+        "--filter-probe",
+        required=False,
+        type=positive_ints,
+        metavar="SIZES",
+        help="Time filters at these comma-separated dataset sizes instead of running the checks. Needs a --journal.",
+    )
+    parser.add_argument(
+        "--journal",
+        required=False,
+        help="Record the created and deleted resources in this file.",
+    )
+    parser.add_argument(
+        "--discovery-cache",
+        required=False,
+        metavar="DIRECTORY",
+        help="Cache the discovery documents in this directory, and only fetch them again when they change.",
+    )
+    parser.add_argument(
+        "--cleanup-journal",
+        required=False,
+        action="store_true",
+        help="Delete the resources left over by previous runs according to the journal instead of running the checks.",
+    )
+    parser.add_argument(
+        "--retention",
+        required=False,
+        choices=["all", "failures", "summary"],
+        default="all",
+        help="What the results keep: everything, the data of failures only, or a summary.",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        required=False,
+        action="store_true",
+        help="Stop at the first error, and exit with an error code.",
+    )
+    parser.add_argument(
+        "--random-seed",
+        required=False,
+        type=int,
+        help="Generate the random values of the checks with this seed, to reproduce a previous run.",
+    )
+    parser.add_argument(
+        "--include",
+        required=False,
+        action="append",
+        metavar="NAME_OR_TAG",
+        help="Only run the checks with this name or tag, and the checks they require.",
+    )
+    parser.add_argument(
+        "--exclude",
+        required=False,
+        action="append",
+        default=[],
+        metavar="NAME_OR_TAG",
+        help="Do not run the checks with this name or tag, and skip the checks requiring them.",
+    )
+    parser.add_argument(
+        "--results",
+        required=False,
+        metavar="FILE",
+        help="Save the results in this file.",
+    )
+    parser.add_argument(
+        "--rerun-failed",
+        required=False,
+        action="store_true",
+        help="Only run the checks that failed or were skipped in the --results file, and the checks they require.",
+    )
+    parser.add_argument(
+        "--jsonl",
+        required=False,
+        metavar="FILE",
+        help="Write every result in this file as a JSON line, as soon as it is available.",
+    )
+    parser.add_argument(
+        "--junit",
+        required=False,
+        metavar="FILE",
+        help="Write the results in this file as a JUnit XML report, as soon as they are available.",
+    )
+    parser.add_argument(
+        "--max-connections",
+        required=False,
+        type=positive_int,
+        default=100,
+        help="The maximum number of connections to the server.",
+    )
+    parser.add_argument(
+        "--max-keepalive-connections",
+        required=False,
+        type=positive_int,
+        help="The maximum number of idle connections kept open. Defaults to the number of concurrent checks.",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        required=False,
+        type=float,
+        default=5.0,
+        help="The number of seconds idle connections are kept open. 0 disables keep-alive.",
+    )
+    parser.add_argument(
+        "--http2",
+        required=False,
+        action="store_true",
+        help="Use HTTP/2 when the server supports it. Needs the http2 extra.",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        required=False,
+        type=float,
+        default=5.0,
+        help="The maximum number of seconds to establish a connection.",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        required=False,
+        type=float,
+        default=5.0,
+        help="The maximum number of seconds to wait for a response.",
+    )
+    parser.add_argument(
+        "--fleet",
+        required=False,
+        metavar="TENANTS",
+        help="Check the tenants of this JSON lines file concurrently instead of a single host.",
+    )
+    parser.add_argument(
+        "--fleet-processes",
+        required=False,
+        type=positive_int,
+        help="The number of processes checking tenants. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--tenant-timeout",
+        required=False,
+        type=positive_float,
+        help="Stop the checks of a tenant after this number of seconds, once the check in progress is done.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the ``scim2-tester`` command line."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Dependencies are imported once the arguments are valid,
+    # so --help and usage errors do not pay for scim2-models and pydantic.
+    from scim2_client.engines.httpx import SyncSCIMClient
+
+    from scim2_tester.checker import iter_check_server
+    from scim2_tester.journal import Journal
+    from scim2_tester.registry import matching_checks
+    from scim2_tester.reports import ReportWriter
+    from scim2_tester.transport import TransportOptions
+    from scim2_tester.transport import require_http2
+    from scim2_tester.utils import CheckConfig
+    from scim2_tester.utils import Retention
+    from scim2_tester.utils import Status
+    from scim2_tester.values import ValueGenerator
+
+    try:
+        matching_checks([*(args.include or []), *args.exclude])
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    transport = TransportOptions(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_keepalive_connections,
+        keepalive_expiry=args.keepalive_expiry,
+        http2=args.http2,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+    )
+    if args.http2:
+        try:
+            require_http2()
+        except ImportError as exc:
+            parser.error(str(exc))
+
+    if args.fleet:
+        from scim2_tester.fleet import read_tenants
+        from scim2_tester.fleet import run_fleet
+
+        try:
+            tenants = read_tenants(args.fleet)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+        fleet_report = run_fleet(
+            tenants,
+            processes=args.fleet_processes,
+            timeout=args.tenant_timeout,
+            max_workers=args.max_workers,
+            include_checks=args.include,
+            exclude_checks=args.exclude,
+            transport=transport,
+        )
+        for tenant_report in fleet_report.tenants:
+            print(
+                "PASSED" if tenant_report.passed else "FAILED",
+                tenant_report.name,
+                f"{tenant_report.successes} successes, "
+                f"{len(tenant_report.errors)} errors, {tenant_report.skipped} skipped "
+                f"in {tenant_report.duration:.2f}s",
+            )
+            if tenant_report.error:
+                print("  ", tenant_report.error)
+            for title in tenant_report.errors:
+                print("  ", title)
+        latencies = fleet_report.latencies
+        if latencies.count:
+            print(
+                f"Checks latency: p50={latencies.p50:.3f}s p95={latencies.p95:.3f}s "
+                f"p99={latencies.p99:.3f}s"
+            )
+        print(
+            f"{len(fleet_report.passed)}/{len(fleet_report.tenants)} tenants passed "
+            f"in {fleet_report.duration:.2f}s"
+        )
+        raise SystemExit(1 if fleet_report.failed else 0)
+
+    if not args.host:
+        parser.error("the host argument is required, unless --fleet is used")
+
+    store = None
+    include = args.include
+    if args.results:
+        from scim2_tester.store import ResultStore
+        from scim2_tester.store import StoredResult
+
+        store = ResultStore(args.results)
+
+    if args.rerun_failed:
+        if not store:
+            parser.error("--rerun-failed needs --results")
+
+        include = store.failed_checks()
+        if not include:
+            print("No failed checks to run again")
+            raise SystemExit()
+
+    client = transport.client(args.host, args.token, args.max_workers or 1)
+    scim = SyncSCIMClient(client)
+    if args.discovery_cache:
+        from scim2_tester.discovery import DiscoveryCache
+
+        DiscoveryCache(args.discovery_cache).discover(scim)
+    else:
+        scim.discover()
+    journal = Journal(args.journal) if args.journal else None
+
+    if args.cleanup_journal:
+        from scim2_tester.cleanup import cleanup_journal
+
+        if not journal:
+            parser.error("--cleanup-journal needs a --journal")
+
+        cleanup_report = cleanup_journal(CheckConfig(scim), journal)
+        for error in cleanup_report.errors:
+            print(error)
+        for obj in cleanup_report.remaining:
+            print("Could not delete", obj.__class__.__name__, obj.id)
+        raise SystemExit(1 if cleanup_report.remaining else 0)
+
+    if args.seed_resources is not None or args.seed_count:
+        from scim2_tester.seed import run_seed
+
+        if not journal:
+            parser.error("--seed-resources and --seed-count need a --journal")
+
+        seed_report = run_seed(
+            CheckConfig(scim, max_workers=args.max_workers, journal=journal),
+            count=args.seed_resources or 0,
+            counts=dict(args.seed_count),
+        )
+        for resource_type, count in seed_report.created.items():
+            print(f"{count} {resource_type} resources created")
+        print(
+            f"{seed_report.throughput:.2f} resources/s, "
+            f"{seed_report.errors} failed batches"
+        )
+        raise SystemExit(1 if seed_report.errors else 0)
+
+    if args.filter_probe:
+        from scim2_tester.filters import probe_filters
+
+        if not journal:
+            parser.error("--filter-probe needs a --journal")
+
+        probe_report = probe_filters(
+            CheckConfig(scim, max_workers=args.max_workers, journal=journal),
+            sizes=args.filter_probe,
+        )
+        for curve in probe_report.curves.values():
+            print(curve.resource_type, curve.filter)
+            for point in curve.points:
+                latency = f"{point.latency:.3f}s" if point.latency else point.error
+                print(f"  {point.size}: {latency}")
+        if probe_report.seed_errors:
+            print(f"{probe_report.seed_errors} failed seeding batches")
+        raise SystemExit(1 if probe_report.seed_errors else 0)
+
+    if args.load_iterations or args.load_duration:
+        from scim2_tester.load import run_load
+
+        report = run_load(
+            CheckConfig(scim, journal=journal),
+            iterations=args.load_iterations,
+            duration=args.load_duration,
+            workers=args.load_workers,
+            rate=args.load_rate,
+            open_loop=args.load_open_loop,
+        )
+        print(
+            f"{report.iterations} lifecycles in {report.duration:.2f}s: "
+            f"{report.throughput:.2f}/s, {report.error_rate:.1%} errors"
+        )
+        for stats in report.operations.values():
+            print(
+                f"  {stats.name}: p50={stats.p50:.3f}s p95={stats.p95:.3f}s "
+                f"p99={stats.p99:.3f}s errors={stats.error_rate:.1%}"
+            )
+        if report.cleanup_error:
+            print(f"Could not delete the temporary objects: {report.cleanup_error}")
+        raise SystemExit()
+
+    # The seed is printed so a failing run can be reproduced with --random-seed.
+    random_seed = ValueGenerator(args.random_seed).seed
+    print("Random seed:", random_seed, flush=True)
+    results = iter_check_server(
+        scim,
+        max_workers=args.max_workers,
+        journal=journal,
+        retention=Retention[args.retention.upper()],
+        random_seed=random_seed,
+        include_checks=include,
+        exclude_checks=args.exclude,
+    )
+    with contextlib.ExitStack() as stack:
+        writers: list[ReportWriter] = []
+        if args.jsonl:
+            from scim2_tester.reports import JSONLinesWriter
+
+            writers.append(JSONLinesWriter(stack.enter_context(open(args.jsonl, "w"))))
+        if args.junit:
+            from scim2_tester.reports import JUnitWriter
+
+            writers.append(JUnitWriter(stack.enter_context(open(args.junit, "w"))))
+        if writers:
+            from scim2_tester.reports import iter_reported
+
+            # Writers are closed before their files, completing the reports of interrupted runs.
+            for writer in writers:
+                stack.callback(writer.close)
+            results = iter_reported(results, writers)
+
+        # Only the summaries of the results are kept in memory, to be saved at the end of the run.
+        done = []
+        try:
+            for result in results:
+                if store:
+                    done.append(StoredResult.from_result(result))
+                print(result.status.name, result.title, flush=True)
+                if result.reason:
+                    print("  ", result.reason)
+                    if args.verbose and result.data:
+                        print("  ", result.data)
+                if args.verbose:
+                    print(
+                        "  ",
+                        f"{result.duration:.3f}s, {result.metrics.requests} requests, "
+                        f"{result.metrics.bytes_sent} bytes sent, "
+                        f"{result.metrics.bytes_received} bytes received",
+                    )
+                if args.fail_fast and result.status == Status.ERROR:
+                    # Closing the iterator deletes the temporary resources.
+                    results.close()
+                    raise SystemExit(1)
+        finally:
+            # The results of interrupted runs are saved too, so they can be run again.
+            if store:
+                store.save(done)
+
+
+if __name__ == "__main__":
+    main()
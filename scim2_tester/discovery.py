@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Collection
+from pathlib import Path
+from typing import Any
+
+from scim2_client import SCIMClient
+from scim2_client import UnexpectedStatusCode
+from scim2_models import Context
+from scim2_models import ListResponse
+from scim2_models import Resource
+from scim2_models import ResourceType
+from scim2_models import Schema
+from scim2_models import ServiceProviderConfig
+
+from scim2_tester.raw import RawResponse
+from scim2_tester.raw import raw_request
+from scim2_tester.utils import Steps
+from scim2_tester.utils import run_steps
+from scim2_tester.utils import run_steps_async
+
+DISCOVERY_ENDPOINTS = {
+    "service_provider_config": "/ServiceProviderConfig",
+    "resource_types": "/ResourceTypes",
+    "schemas": "/Schemas",
+}
+"""The discovery endpoints, by client attribute."""
+
+_resource_models: dict[str, tuple[type[Resource], ...]] = {}
+_resource_models_lock = threading.Lock()
+
+
+def content_hash(payload: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def build_resource_models(
+    client: SCIMClient,
+    resource_types: Collection[ResourceType],
+    schemas: Collection[Schema],
+) -> tuple[type[Resource], ...]:
+    """Build the resource models of a server, like :meth:`~scim2_client.SCIMClient.build_resource_models`.
+
+    The models are built once per process for identical resource types and schemas,
+    so runs against unchanged servers share them.
+    """
+    key = content_hash(
+        [
+            [resource_type.model_dump(mode="json") for resource_type in resource_types],
+            [schema.model_dump(mode="json") for schema in schemas],
+        ]
+    )
+    with _resource_models_lock:
+        if key not in _resource_models:
+            _resource_models[key] = client.build_resource_models(
+                resource_types, schemas
+            )
+        return _resource_models[key]
+
+
+def client_base_url(client: SCIMClient) -> str:
+    """Return the URL identifying the server of a client."""
+    http_client = getattr(client, "client", None)
+    return str(getattr(http_client, "base_url", "")) + getattr(
+        client, "scim_prefix", ""
+    )
+
+
+class DiscoveryCache:
+    """Cache the discovery documents of servers on disk.
+
+    The :class:`~scim2_models.ServiceProviderConfig`, :class:`~scim2_models.ResourceType`
+    and :class:`~scim2_models.Schema` documents are stored by server base URL.
+    :meth:`discover` replaces :meth:`scim2_client.SCIMClient.discover`.
+    Documents are revalidated with their `ETag`: when the server answers that a document
+    has not changed, the cached one is used.
+    Other responses than ``200`` and ``304`` raise an error, and are never cached.
+    The resource models are built once per process for identical documents,
+    see :func:`build_resource_models`.
+
+    :param path: The directory where documents are stored, one file by server base URL.
+        It is created if it does not exist.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path).expanduser()
+
+    def entry_path(self, base_url: str) -> Path:
+        return self.path / f"{content_hash(base_url)}.json"
+
+    def load(self, base_url: str) -> dict[str, dict]:
+        """Return the cached documents of a server, with their `ETag`, by client attribute."""
+        try:
+            with open(self.entry_path(base_url)) as fd:
+                return json.load(fd)["documents"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def save(self, base_url: str, documents: dict[str, dict]) -> None:
+        # The entry is written atomically, so concurrent runs never read a partial file.
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry_path = self.entry_path(base_url)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_path, "w") as fd:
+            json.dump({"base_url": base_url, "documents": documents}, fd)
+        os.replace(tmp_path, entry_path)
+
+    def request_headers(self, cached: dict | None) -> dict[str, str]:
+        if cached and cached.get("etag"):
+            return {"If-None-Match": cached["etag"]}
+        return {}
+
+    def fetched(self, cached: dict | None, response: RawResponse) -> dict:
+        """Return the document of a response, or the cached one if it has not changed.
+
+        :raises UnexpectedStatusCode: If the response is neither a ``200``,
+            nor a ``304`` for a cached document.
+        """
+        if response.status_code == 200:
+            return {
+                "etag": response.headers.get("ETag"),
+                "payload": response.payload,
+            }
+
+        if response.status_code == 304 and cached:
+            return cached
+
+        raise UnexpectedStatusCode(response.status_code, source=response.payload)
+
+    def apply(self, client: SCIMClient, documents: dict[str, dict]) -> None:
+        """Register the documents and the resource models to a client."""
+        client.service_provider_config = ServiceProviderConfig.model_validate(
+            documents["service_provider_config"]["payload"],
+            scim_ctx=Context.RESOURCE_QUERY_RESPONSE,
+        )
+        client.resource_types = (
+            ListResponse[ResourceType]
+            .model_validate(
+                documents["resource_types"]["payload"],
+                scim_ctx=Context.RESOURCE_QUERY_RESPONSE,
+            )
+            .resources
+            or []
+        )
+        schemas = (
+            ListResponse[Schema]
+            .model_validate(
+                documents["schemas"]["payload"],
+                scim_ctx=Context.RESOURCE_QUERY_RESPONSE,
+            )
+            .resources
+            or []
+        )
+        client.resource_models = build_resource_models(
+            client, client.resource_types, schemas
+        )
+
+    def discovery(self, client: SCIMClient) -> Steps[None]:
+        """Return the :data:`~scim2_tester.utils.Steps` performed by :meth:`discover`."""
+        base_url = client_base_url(client)
+        cached = self.load(base_url)
+        documents = {}
+        for attribute, endpoint in DISCOVERY_ENDPOINTS.items():
+            response = yield from raw_request.steps(
+                client,
+                "GET",
+                endpoint,
+                headers=self.request_headers(cached.get(attribute)),
+            )
+            documents[attribute] = self.fetched(cached.get(attribute), response)
+
+        self.apply(client, documents)
+        if documents != cached:
+            self.save(base_url, documents)
+
+    def discover(self, client: SCIMClient) -> None:
+        """Discover the server configuration, reusing the cached documents that have not changed."""
+        run_steps(self.discovery(client))
+
+    async def discover_async(self, client: SCIMClient) -> None:
+        """Asynchronous version of :meth:`discover`."""
+        await run_steps_async(self.discovery(client))
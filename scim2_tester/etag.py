@@ -0,0 +1,174 @@
+import time
+from dataclasses import dataclass
+
+from scim2_models import Error
+from scim2_models import Resource
+
+from scim2_tester.raw import RawResponse
+from scim2_tester.raw import raw_request
+from scim2_tester.raw import resource_path
+from scim2_tester.registry import register
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Status
+from scim2_tester.utils import Steps
+from scim2_tester.utils import asynchronous
+from scim2_tester.utils import checker
+
+
+@dataclass
+class ConditionalSavings:
+    """What a conditional query saved compared to a regular query."""
+
+    bytes_saved: int
+    """The difference between the regular and the conditional response bodies sizes, in bytes."""
+
+    time_saved: float
+    """The difference between the regular and the conditional queries durations, in seconds."""
+
+
+def etag_supported(conf: CheckConfig) -> bool:
+    """Whether the server announces ETag support in its :class:`~scim2_models.ServiceProviderConfig`."""
+    service_provider_config = conf.client.service_provider_config
+    return bool(
+        service_provider_config
+        and service_provider_config.etag
+        and service_provider_config.etag.supported
+    )
+
+
+def conditional_query_result(
+    conf: CheckConfig,
+    obj: Resource,
+    etag: str | None,
+    regular: tuple[RawResponse, float],
+    conditional: tuple[RawResponse, float] | None,
+) -> CheckResult:
+    name = obj.__class__.__name__
+    if not etag or conditional is None:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"No ETag header nor meta.version for the {name} object with id {obj.id}",
+        )
+
+    response, duration = conditional
+    if response.status_code != 304:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"Expected a 304 response to a {name} query with If-None-Match, got {response.status_code}",
+        )
+
+    regular_response, regular_duration = regular
+    savings = ConditionalSavings(
+        bytes_saved=regular_response.size - response.size,
+        time_saved=regular_duration - duration,
+    )
+    return CheckResult(
+        conf,
+        status=Status.SUCCESS,
+        reason=(
+            f"Successful conditional query of a {name} object with id {obj.id}, "
+            f"saving {savings.bytes_saved} bytes and {savings.time_saved * 1000:.1f}ms"
+        ),
+        data=savings,
+    )
+
+
+def timed(response: RawResponse, start: float) -> tuple[RawResponse, float]:
+    return response, time.perf_counter() - start
+
+
+@register(requires=["check_object_creation"], tags=["resource", "etag"])
+@checker
+def check_conditional_query(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.14 <7644#section-3.14>`, servers supporting versioning must answer 304 to queries with an up-to-date `If-None-Match` header.
+
+    The object is queried once to get its `ETag`, and once more with `If-None-Match`.
+    The bytes and the time saved by the conditional query are stored in the result data.
+    """
+    path = resource_path(conf.client, obj)
+    start = time.perf_counter()
+    response = yield from raw_request.steps(conf.client, "GET", path)
+    regular = timed(response, start)
+    etag = regular[0].headers.get("ETag") or (obj.meta.version if obj.meta else None)
+    conditional = None
+    if etag:
+        start = time.perf_counter()
+        response = yield from raw_request.steps(
+            conf.client, "GET", path, headers={"If-None-Match": etag}
+        )
+        conditional = timed(response, start)
+
+    return conditional_query_result(conf, obj, etag, regular, conditional)
+
+
+@register(
+    requires=["check_object_creation", "check_object_replacement"],
+    tags=["resource", "etag"],
+)
+@checker
+def check_conditional_replacement(
+    conf: CheckConfig, obj: Resource, version: str | None
+) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.14 <7644#section-3.14>`, servers supporting versioning must answer 412 to replacements with a stale `If-Match` header.
+
+    `obj` must have been replaced since it was read, so its `meta.version` is stale,
+    and `version` is the current version of the object.
+    The object is replaced with the stale version, which must fail,
+    and then with the current version, which must succeed.
+    """
+    name = obj.__class__.__name__
+    stale_version = obj.meta.version if obj.meta else None
+    if not stale_version or not version:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"No meta.version for the {name} object with id {obj.id}",
+        )
+
+    if stale_version == version:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"The meta.version of the {name} object with id {obj.id} did not change after a replacement",
+        )
+
+    response = yield conf.client.replace(
+        obj,
+        headers={"If-Match": stale_version},
+        expected_status_codes=[412],
+        raise_scim_errors=False,
+    )
+    if not isinstance(response, Error):
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"The replacement of the {name} object with id {obj.id} with a stale If-Match header did not return an Error object",
+            data=response,
+        )
+
+    if response.status != 412:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"The replacement of the {name} object with id {obj.id} with a stale If-Match header returned a {response.status} error instead of 412",
+            data=response,
+        )
+
+    response = yield conf.client.replace(
+        obj,
+        headers={"If-Match": version},
+        expected_status_codes=conf.expected_status_codes or [200],
+    )
+    return CheckResult(
+        conf,
+        status=Status.SUCCESS,
+        reason=f"Successful conditional replacement of a {name} object with id {obj.id}",
+        data=response,
+    )
+
+
+check_conditional_query_async = asynchronous(check_conditional_query)
+check_conditional_replacement_async = asynchronous(check_conditional_replacement)
@@ -1,37 +1,63 @@
-import base64
-import random
-import uuid
-from enum import Enum
-from inspect import isclass
-from typing import Annotated
+import asyncio
+from dataclasses import dataclass
 from typing import Any
-from typing import get_args
-from typing import get_origin
-
-from scim2_models import ComplexAttribute
-from scim2_models import Extension
-from scim2_models import ExternalReference
-from scim2_models import Meta
-from scim2_models import Reference
-from scim2_models import Required
+
+from pydantic import BaseModel
 from scim2_models import Resource
-from scim2_models import URIReference
-from scim2_models.utils import UNION_TYPES
 
+from scim2_tester.bulk import bulk_config
+from scim2_tester.bulk import bulk_create
+from scim2_tester.fixtures import FixturePool
+from scim2_tester.plan import model_index
+from scim2_tester.plan import model_plan
+from scim2_tester.plan import reference_names
 from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import SCIMTesterError
+from scim2_tester.utils import Step
+from scim2_tester.utils import Steps
+from scim2_tester.utils import journal_created
+from scim2_tester.utils import run_steps
+from scim2_tester.utils import run_steps_async
+from scim2_tester.utils import steps
+from scim2_tester.values import ValueGenerator
+
+
+@dataclass
+class PendingReference:
+    """A reference attribute waiting for its target object to be created."""
+
+    obj: BaseModel
+    """The object holding the reference attribute."""
+
+    field_name: str
+    """The name of the reference attribute."""
+
+    model: type[Resource]
+    """The model of the object that needs to be created."""
+
+    is_multiple: bool = False
+    """Whether the reference attribute is multi-valued."""
+
+    def resolve(self, location: str) -> None:
+        """Set the reference attribute to the location of the created object."""
+        setattr(self.obj, self.field_name, [location] if self.is_multiple else location)
 
 
+def minimal_field_names(model: type[Resource]) -> list[str]:
+    """Return the names of the required fields of a model."""
+    return list(model_plan(model).required)
+
+
+@steps
 def create_minimal_object(
     conf: CheckConfig, model: type[Resource]
-) -> tuple[Resource, list[Resource]]:
+) -> Steps[tuple[Resource, list[Resource]]]:
     """Create an object filling with the minimum required field set."""
-    field_names = [
-        field_name
-        for field_name in model.model_fields
-        if model.get_field_annotation(field_name, Required) == Required.true
-    ]
-    obj, garbages = fill_with_random_values(conf, model(), field_names)
-    obj = conf.client.create(obj)
+    obj, garbages = yield from fill_with_random_values.steps(
+        conf, model(), minimal_field_names(model)
+    )
+    obj = yield conf.client.create(obj)
+    journal_created(conf, [obj])
     return obj, garbages
 
 
@@ -39,103 +65,165 @@ def model_from_ref_type(
     conf: CheckConfig, ref_type: type, different_than: Resource
 ) -> type[Resource]:
     """Return "User" from "Union[Literal['User'], Literal['Group']]"."""
+    return model_from_reference_names(conf, reference_names(ref_type), different_than)
 
-    def model_from_ref_type_(ref_type):
-        if get_origin(ref_type) in UNION_TYPES:
-            return [
-                model_from_ref_type_(sub_ref_type)
-                for sub_ref_type in get_args(ref_type)
-            ]
-
-        model_name = get_args(ref_type)[0]
-        model = conf.client.get_resource_model(model_name)
-        return model
 
-    models = model_from_ref_type_(ref_type)
-    models = models if isinstance(models, list) else [models]
-    acceptable_models = [model for model in models if model != different_than]
+def model_from_reference_names(
+    conf: CheckConfig, names: tuple[str, ...], different_than: Resource
+) -> type[Resource]:
+    """Return the first model named in `names` that is not `different_than`."""
+    index = model_index(tuple(conf.client.resource_models or ()))
+    acceptable_models = [
+        model
+        for name in names
+        if (model := index.get(name)) is not None and model != different_than
+    ]
     return acceptable_models[0]
 
 
-def fill_with_random_values(
+def generate_random_values(
     conf: CheckConfig, obj: Resource, field_names: list[str] | None = None
-) -> Resource:
-    """Fill an object with random values generated according the attribute types."""
-    garbages = []
-    for field_name in field_names or obj.model_fields.keys():
-        field = obj.model_fields[field_name]
-        if field.default:
+) -> list[PendingReference]:
+    """Fill an object with random values generated according the attribute types.
+
+    References to other resources cannot be generated without creating
+    the targeted resources first. They are left empty and returned, so the caller
+    can create the targets and :meth:`~PendingReference.resolve` them.
+
+    The attribute types are introspected only once per model, see :func:`~scim2_tester.plan.model_plan`.
+    Values are drawn from the configuration :attr:`~scim2_tester.CheckConfig.value_generator`,
+    or from an unseeded generator if there is no configuration.
+    """
+    values = conf.value_generator if conf is not None else ValueGenerator()
+    references = []
+    for field in model_plan(obj.__class__).iter_fields(field_names):
+        value: Any
+        if field.reference_names is not None:
+            model = model_from_reference_names(
+                conf, field.reference_names, different_than=obj.__class__
+            )
+            references.append(
+                PendingReference(obj, field.name, model, field.is_multiple)
+            )
             continue
 
-        is_multiple = obj.get_field_multiplicity(field_name)
-        field_type = obj.get_field_root_type(field_name)
-        if get_origin(field_type) == Annotated:
-            field_type = get_args(field_type)[0]
+        elif field.nested_model is not None:
+            value = field.nested_model()
+            references += generate_random_values(conf, value)
 
-        value: Any
-        if field_type is Meta:
-            value = None
-
-        elif field.examples:
-            value = random.choice(field.examples)
-
-        # RFC7643 §4.1.2 provides the following indications, however
-        # there is no way to guess the existence of such requirements
-        # just by looking at the object schema.
-        #     The value SHOULD be specified according to [RFC5321].
-        elif field_name == "value" and "email" in obj.__class__.__name__.lower():
-            value = f"{uuid.uuid4()}@{uuid.uuid4()}.com"
-
-        # RFC7643 §4.1.2 provides the following indications, however
-        # there is no way to guess the existence of such requirements
-        # just by looking at the object schema.
-        #     The value SHOULD be specified
-        #     according to the format defined in [RFC3966], e.g.,
-        #     'tel:+1-201-555-0123'.
-        elif field_name == "value" and "phone" in obj.__class__.__name__.lower():
-            value = "".join(str(random.choice(range(10))) for _ in range(10))
-
-        elif field_type is int:
-            value = uuid.uuid4().int
-
-        elif field_type is bool:
-            value = random.choice([True, False])
-
-        elif field_type is bytes:
-            value = base64.b64encode(str(uuid.uuid4()).encode("utf-8"))
-
-        elif get_origin(field_type) is Reference:
-            ref_type = get_args(field_type)[0]
-            if ref_type not in (ExternalReference, URIReference):
-                model = model_from_ref_type(
-                    conf, ref_type, different_than=obj.__class__
-                )
-                ref_obj, sub_garbages = create_minimal_object(conf, model)
-                value = ref_obj.meta.location
-                garbages += sub_garbages
+        elif field.generate is not None:
+            value = field.generate(values)
 
-            else:
-                value = f"https://{str(uuid.uuid4())}.test"
+        else:
+            continue
 
-        elif isclass(field_type) and issubclass(field_type, Enum):
-            value = random.choice(list(field_type))
+        if field.is_multiple:
+            setattr(obj, field.name, [value])
 
-        elif isclass(field_type) and issubclass(field_type, ComplexAttribute):
-            value, sub_garbages = fill_with_random_values(conf, field_type())
-            garbages += sub_garbages
+        else:
+            setattr(obj, field.name, value)
 
-        elif isclass(field_type) and issubclass(field_type, Extension):
-            value, sub_garbages = fill_with_random_values(conf, field_type())
-            garbages += sub_garbages
+    return references
 
-        else:
-            # Put emails so this will be accepted by EmailStr too
-            value = str(uuid.uuid4())
 
-        if is_multiple:
-            setattr(obj, field_name, [value])
+@steps
+def fill_with_random_values(
+    conf: CheckConfig, obj: Resource, field_names: list[str] | None = None
+) -> Steps[tuple[Resource, list[Resource]]]:
+    """Fill an object with random values generated according the attribute types.
+
+    The resources targeted by reference attributes are created on the fly,
+    and returned as garbages so they can be deleted afterwards.
+    If the server supports bulk operations, they are created with one bulk request
+    per dependency level instead of one request per resource.
+    If the configuration has a :attr:`~scim2_tester.CheckConfig.fixture_pool`,
+    the pooled resources are used instead, and no garbage is returned.
+    """
+    references = generate_random_values(conf, obj, field_names)
+    if references and conf.fixture_pool is not None:
+        for reference in references:
+            ref_obj = yield Fixture(conf, conf.fixture_pool, reference.model)
+            reference.resolve(ref_obj.meta.location)
+        return obj, []
+
+    if references and bulk_config(conf):
+        return obj, (yield from create_references_in_bulk(conf, references))
 
-        else:
-            setattr(obj, field_name, value)
+    garbages = []
+    for reference in references:
+        ref_obj, sub_garbages = yield from create_minimal_object.steps(
+            conf, reference.model
+        )
+        reference.resolve(ref_obj.meta.location)
+        garbages += sub_garbages + [ref_obj]
 
     return obj, garbages
+
+
+@dataclass
+class Fixture(Step):
+    """A step returning the object of a model from the :class:`~scim2_tester.fixtures.FixturePool`.
+
+    The pooled objects are minimal objects, and the objects they reference are pooled too,
+    so there is no garbage to keep.
+    """
+
+    conf: CheckConfig
+    pool: FixturePool
+    model: type[Resource]
+
+    def create(self) -> Steps[Resource]:
+        obj, _ = yield from create_minimal_object.steps(self.conf, self.model)
+        return obj
+
+    def run(self) -> Resource:
+        return self.pool.get(self.model, lambda: run_steps(self.create()))
+
+    async def run_async(self, semaphore: asyncio.Semaphore | None = None) -> Resource:
+        return await self.pool.get_async(
+            self.model, lambda: run_steps_async(self.create(), semaphore)
+        )
+
+
+def plan_references(
+    conf: CheckConfig, references: list[PendingReference]
+) -> list[list[tuple[PendingReference, Resource]]]:
+    """Generate the objects targeted by references, and the objects they reference themselves.
+
+    :return: The objects to create, grouped by dependency level.
+        The objects of a level only reference objects of the next levels.
+    """
+    levels = []
+    while references:
+        level = [(reference, reference.model()) for reference in references]
+        references = [
+            sub_reference
+            for _, target in level
+            for sub_reference in generate_random_values(
+                conf, target, minimal_field_names(target.__class__)
+            )
+        ]
+        levels.append(level)
+    return levels
+
+
+def create_references_in_bulk(
+    conf: CheckConfig, references: list[PendingReference]
+) -> Steps[list[Resource]]:
+    """Create the objects targeted by references with one bulk request per dependency level.
+
+    :return: The created objects, in creation order.
+    """
+    garbages: list[Resource] = []
+    for level in reversed(plan_references(conf, references)):
+        created = yield from bulk_create.steps(conf, [target for _, target in level])
+        garbages += created
+        for (reference, _), created_obj in zip(level, created, strict=False):
+            if not created_obj.meta or not created_obj.meta.location:
+                raise SCIMTesterError(
+                    f"No location for the created {created_obj.__class__.__name__} object with id {created_obj.id}",
+                    conf,
+                )
+
+            reference.resolve(created_obj.meta.location)
+    return garbages
@@ -0,0 +1,241 @@
+import statistics
+import time
+from dataclasses import dataclass
+from dataclasses import field
+
+from scim2_client import SCIMClientError
+from scim2_models import Resource
+from scim2_models import ResourceType
+from scim2_models import Returned
+from scim2_models import SearchRequest
+from scim2_models import Uniqueness
+
+from scim2_tester.cleanup import cleanup_journal
+from scim2_tester.plan import model_plan
+from scim2_tester.seed import SeedPool
+from scim2_tester.seed import run_seed
+from scim2_tester.seed import seeding_order
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import SCIMTesterError
+
+FILTER_PROBE_REPEAT = 3
+"""The number of times each filter is timed at each dataset size, the median latency is reported."""
+
+
+@dataclass
+class FilterPoint:
+    """The latency of a filter at a given dataset size."""
+
+    size: int
+    """The number of objects the probe had seeded when the filter was timed."""
+
+    latency: float | None = None
+    """The median duration of the filtered query, in seconds, or :data:`None` if it failed."""
+
+    results: int | None = None
+    """The number of objects matching the filter, as announced by the server."""
+
+    error: str | None = None
+    """Why the filtered query failed."""
+
+
+@dataclass
+class FilterCurve:
+    """The latency of a filter at increasing dataset sizes."""
+
+    resource_type: str
+    """The id of the filtered resource type."""
+
+    filter: str
+    """The filter expression."""
+
+    points: list[FilterPoint] = field(default_factory=list)
+    """The latency at every dataset size, by increasing size."""
+
+    @property
+    def slowdown(self) -> float | None:
+        """How many times the filter is slower at the largest size than at the smallest size."""
+        latencies = [point.latency for point in self.points if point.latency]
+        if len(latencies) < 2:
+            return None
+
+        return latencies[-1] / latencies[0]
+
+
+@dataclass
+class FilterProbeReport:
+    """The results of a filter probe."""
+
+    curves: dict[tuple[str, str], FilterCurve] = field(default_factory=dict)
+    """The latency curves, indexed by resource type id and filter expression."""
+
+    seed_errors: int = 0
+    """The number of seeding batches that could not be created entirely, see :attr:`~scim2_tester.seed.SeedReport.errors`."""
+
+    def record(self, resource_type: str, expression: str, point: FilterPoint) -> None:
+        key = (resource_type, expression)
+        if key not in self.curves:
+            self.curves[key] = FilterCurve(resource_type, expression)
+        self.curves[key].points.append(point)
+
+
+def filter_attributes(model: type[Resource]) -> list[tuple[str, bool]]:
+    """Return the attributes that can be filtered, and whether they are unique.
+
+    Those are the single-valued string attributes that are writable and returned by the server.
+    """
+    attributes = []
+    for name in model_plan(model).creation:
+        if (
+            model.get_field_root_type(name) is not str
+            or model.get_field_multiplicity(name)
+            or model.get_field_annotation(name, Returned) == Returned.never
+        ):
+            continue
+
+        unique = name == "external_id" or (
+            model.get_field_annotation(name, Uniqueness) == Uniqueness.server
+        )
+        attributes.append((name, unique))
+    return attributes
+
+
+def quote(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def derive_filters(model: type[Resource], sample: Resource) -> list[str]:
+    """Build filter expressions matching `sample`, from the attributes of its model.
+
+    Unique attributes like ``userName`` and ``externalId`` are filtered with ``eq``,
+    other string attributes with ``co`` and ``sw``.
+    The first two expressions are also combined with ``and`` and ``or``.
+    """
+    filters = []
+    for name, unique in filter_attributes(model):
+        value = getattr(sample, name, None)
+        if not isinstance(value, str) or not value:
+            continue
+
+        attribute = model.model_fields[name].serialization_alias or name
+        if unique:
+            filters.append(f"{attribute} eq {quote(value)}")
+
+        else:
+            filters.append(f"{attribute} co {quote(value[1:-1] or value)}")
+            filters.append(f"{attribute} sw {quote(value[:3])}")
+
+    if len(filters) >= 2:
+        filters.append(f"{filters[0]} and {filters[1]}")
+        filters.append(f"{filters[0]} or {filters[1]}")
+
+    return filters
+
+
+def time_filter(
+    conf: CheckConfig, model: type[Resource], expression: str, size: int, repeat: int
+) -> FilterPoint:
+    """Perform a filtered query `repeat` times, and return its median latency."""
+    latencies = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = conf.client.query(
+                model,
+                search_request=SearchRequest(filter=expression, count=conf.page_size),
+                expected_status_codes=conf.expected_status_codes or [200],
+            )
+            latencies.append(time.perf_counter() - start)
+
+    except SCIMClientError as exc:
+        if conf.raise_exceptions:
+            raise
+
+        return FilterPoint(size, error=str(exc))
+
+    return FilterPoint(size, statistics.median(latencies), response.total_results)
+
+
+def seeded_sample(conf: CheckConfig, model: type[Resource], since: int = 0) -> Resource:
+    """Return the last seeded object of a model, according to the journal.
+
+    :param since: The number of journal entries to skip, see :meth:`~scim2_tester.journal.Journal.leftovers`.
+    """
+    schema = model.model_fields["schemas"].default[0]
+    leftovers = conf.journal.leftovers(since) if conf.journal is not None else []
+    for entry in reversed(leftovers):
+        if entry.schema == schema:
+            return conf.client.query(model, entry.id)
+
+    raise SCIMTesterError(f"No seeded {model.__name__} object", conf)
+
+
+def probe_filters(
+    conf: CheckConfig,
+    sizes: list[int],
+    resource_types: list[ResourceType] | None = None,
+    repeat: int = FILTER_PROBE_REPEAT,
+    teardown: bool = True,
+) -> FilterProbeReport:
+    """Measure how the latency of filtered queries grows with the number of objects.
+
+    Filter expressions are derived from the attributes of every resource type with :func:`derive_filters`.
+    The resources are seeded with :func:`~scim2_tester.seed.run_seed` up to every size in turn,
+    the referenced resource types first,
+    and each filter is timed at every size.
+    Points are labelled with the number of objects actually seeded,
+    which is lower than the size if some seeding batches failed.
+    Filters whose latency grows with the size are likely on attributes the server does not index.
+
+    :param conf: The check configuration. The client resource types and models must have been discovered,
+        and :attr:`~scim2_tester.CheckConfig.journal` must be set.
+    :param sizes: The numbers of objects of every resource type at which filters are timed.
+    :param resource_types: The resource types to probe. Defaults to all the client resource types.
+    :param repeat: The number of times each filter is timed at each size.
+    :param teardown: Whether the resources seeded by the probe are deleted at the end of the probe.
+        The resources already in the journal are left untouched.
+    """
+    if conf.journal is None:
+        raise ValueError(
+            "Probing filters needs a journal to record the seeded resources"
+        )
+
+    resource_types = list(resource_types or conf.client.resource_types or [])
+    ordered = seeding_order(conf, resource_types)
+    report = FilterProbeReport()
+    seeded = {resource_type_id: 0 for resource_type_id, _, _ in ordered}
+    # The pool is shared so references target the objects seeded at the previous steps.
+    pool = SeedPool(conf.value_generator)
+    filters: dict[str, list[str]] = {}
+    # Only the resources seeded by the probe are sampled and deleted.
+    since = len(conf.journal.entries())
+    try:
+        for size in sorted(sizes):
+            for resource_type_id, resource_type, model in ordered:
+                if size > seeded[resource_type_id]:
+                    seed_report = run_seed(
+                        conf,
+                        counts={resource_type_id: size - seeded[resource_type_id]},
+                        resource_types=[resource_type],
+                        pool=pool,
+                    )
+                    seeded[resource_type_id] += seed_report.created[resource_type_id]
+                    report.seed_errors += seed_report.errors
+
+                if resource_type_id not in filters:
+                    filters[resource_type_id] = derive_filters(
+                        model, seeded_sample(conf, model, since)
+                    )
+
+                for expression in filters[resource_type_id]:
+                    point = time_filter(
+                        conf, model, expression, seeded[resource_type_id], repeat
+                    )
+                    report.record(resource_type_id, expression, point)
+
+    finally:
+        if teardown:
+            cleanup_journal(conf, conf.journal, since)
+
+    return report
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+from scim2_models import Resource
+
+
+class FixturePool:
+    """Share the resources targeted by references between checks.
+
+    The first time a reference to a model needs to be filled, a minimal object
+    is created, and it is then reused by all the checks using the pool,
+    across resource types and load iterations, instead of creating and deleting
+    a new object every time.
+    The pool can be shared between threads and between asynchronous tasks.
+    The pooled objects are deleted by :func:`~scim2_tester.cleanup.delete_fixtures`.
+    """
+
+    def __init__(self):
+        self.objects: list[Resource] = []
+        """The pooled objects, in creation order."""
+
+        self.fixtures: dict[type[Resource], Resource] = {}
+        self.lock = threading.Lock()
+        self.model_locks: dict[type[Resource], threading.Lock] = {}
+        self.async_model_locks: dict[type[Resource], asyncio.Lock] = {}
+
+    def add(self, model: type[Resource], obj: Resource) -> Resource:
+        with self.lock:
+            self.fixtures[model] = obj
+            self.objects.append(obj)
+        return obj
+
+    def get(self, model: type[Resource], create: Callable[[], Resource]) -> Resource:
+        """Return the pooled object of a model, and create it with `create` on first use."""
+        if (obj := self.fixtures.get(model)) is not None:
+            return obj
+
+        with self.lock:
+            model_lock = self.model_locks.setdefault(model, threading.Lock())
+
+        with model_lock:
+            if (obj := self.fixtures.get(model)) is not None:
+                return obj
+
+            return self.add(model, create())
+
+    async def get_async(
+        self, model: type[Resource], create: Callable[[], Awaitable[Resource]]
+    ) -> Resource:
+        """Asynchronous version of :meth:`get`."""
+        if (obj := self.fixtures.get(model)) is not None:
+            return obj
+
+        model_lock = self.async_model_locks.setdefault(model, asyncio.Lock())
+        async with model_lock:
+            if (obj := self.fixtures.get(model)) is not None:
+                return obj
+
+            return self.add(model, await create())
+
+    def clear(self) -> list[Resource]:
+        """Empty the pool, and return the objects it contained in creation order."""
+        with self.lock:
+            objects, self.objects = self.objects, []
+            self.fixtures.clear()
+        return objects
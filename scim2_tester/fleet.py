@@ -0,0 +1,275 @@
+import dataclasses
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from dataclasses import field
+from functools import partial
+
+from scim2_client.engines.httpx import SyncSCIMClient
+
+from scim2_tester.checker import iter_check_server
+from scim2_tester.load import OperationStats
+from scim2_tester.transport import TransportOptions
+from scim2_tester.utils import Retention
+from scim2_tester.utils import Status
+
+
+@dataclass
+class Tenant:
+    """A SCIM server to check in a fleet."""
+
+    url: str
+    """The base URL of the server."""
+
+    token: str | None = None
+    """The bearer token used to authenticate the requests."""
+
+    name: str = ""
+    """The name of the tenant in the reports, unique in a fleet. Defaults to :attr:`url`."""
+
+    def __post_init__(self):
+        if not self.name:
+            self.name = self.url
+
+
+def check_unique_names(tenants: list[Tenant]) -> None:
+    """Check that tenants can be told apart in the reports.
+
+    :raises ValueError: If several tenants have the same name.
+    """
+    names = [tenant.name for tenant in tenants]
+    if duplicates := sorted({name for name in names if names.count(name) > 1}):
+        raise ValueError(f"Duplicated tenant names: {', '.join(duplicates)}")
+
+
+def read_tenants(path: str | os.PathLike) -> list[Tenant]:
+    """Read a tenants file.
+
+    Each line is a JSON object with an ``url``, and optionally a ``token`` and a ``name``.
+    Empty lines are ignored.
+
+    :raises ValueError: If several tenants have the same name.
+    """
+    with open(path) as fd:
+        tenants = [Tenant(**json.loads(line)) for line in fd if line.strip()]
+    check_unique_names(tenants)
+    return tenants
+
+
+@dataclass
+class TenantReport:
+    """The outcome of the checks of a tenant."""
+
+    name: str
+    """The name of the tenant."""
+
+    successes: int = 0
+    """The number of successful checks."""
+
+    errors: list[str] = field(default_factory=list)
+    """The titles of the failed checks."""
+
+    skipped: int = 0
+    """The number of skipped checks."""
+
+    latencies: OperationStats = field(default_factory=lambda: OperationStats("checks"))
+    """The duration of every check, and the failed checks."""
+
+    requests: int = 0
+    """The number of HTTP requests performed."""
+
+    duration: float = 0.0
+    """The wall-clock duration of the checks of the tenant, in seconds."""
+
+    error: str | None = None
+    """Why the checks could not be completed, if they timed out or crashed."""
+
+    @property
+    def passed(self) -> bool:
+        """Whether all the checks have been run, and none of them failed."""
+        return self.error is None and not self.errors
+
+    def record(self, title: str, status: Status, duration: float | None) -> None:
+        if status == Status.SKIPPED:
+            self.skipped += 1
+            return
+
+        if status == Status.SUCCESS:
+            self.successes += 1
+        else:
+            self.errors.append(title)
+        self.latencies.latencies.append(duration or 0.0)
+        self.latencies.errors += status != Status.SUCCESS
+
+
+@dataclass
+class FleetReport:
+    """The results of the checks of a fleet of tenants."""
+
+    tenants: list[TenantReport] = field(default_factory=list)
+    """The report of every tenant, in the order of the tenants."""
+
+    duration: float = 0.0
+    """The wall-clock duration of the checks of the whole fleet, in seconds."""
+
+    @property
+    def passed(self) -> list[TenantReport]:
+        return [report for report in self.tenants if report.passed]
+
+    @property
+    def failed(self) -> list[TenantReport]:
+        return [report for report in self.tenants if not report.passed]
+
+    @property
+    def latencies(self) -> OperationStats:
+        """The duration of every check of every tenant."""
+        stats = OperationStats("checks")
+        for report in self.tenants:
+            stats.latencies += report.latencies.latencies
+            stats.errors += report.latencies.errors
+        return stats
+
+
+def check_tenant(
+    tenant: Tenant,
+    timeout: float | None = None,
+    max_workers: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+    transport: TransportOptions | None = None,
+) -> TenantReport:
+    """Check a tenant, and summarize its results.
+
+    The checks are stopped once `timeout` is elapsed, and the temporary resources are deleted.
+    This is a soft limit: the elapsed time is checked between results,
+    so the check in progress, and the cleanup, are completed before stopping.
+    The connection and read timeouts of `transport` are also limited to `timeout`,
+    so a server that does not answer cannot block the checks.
+    Unexpected exceptions are reported in :attr:`TenantReport.error` instead of being raised.
+    """
+    report = TenantReport(tenant.name)
+    start = time.perf_counter()
+    deadline = start + timeout if timeout is not None else None
+    try:
+        transport = transport or TransportOptions()
+        if timeout is not None:
+            transport = dataclasses.replace(
+                transport,
+                connect_timeout=min(timeout, transport.connect_timeout or timeout),
+                read_timeout=min(timeout, transport.read_timeout or timeout),
+            )
+        with transport.client(tenant.url, tenant.token, max_workers or 1) as client:
+            results = iter_check_server(
+                SyncSCIMClient(client),
+                max_workers=max_workers,
+                retention=Retention.SUMMARY,
+                include_checks=include_checks,
+                exclude_checks=exclude_checks,
+            )
+            for result in results:
+                report.record(result.title or "", result.status, result.duration)
+                report.requests += result.metrics.requests
+                if deadline is not None and time.perf_counter() > deadline:
+                    # Closing the iterator deletes the temporary resources.
+                    results.close()
+                    report.error = f"Timed out after {timeout}s"
+                    break
+
+    except Exception as exc:
+        report.error = f"{exc.__class__.__name__}: {exc}"
+
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def iter_fleet(
+    tenants: Iterable[Tenant],
+    processes: int | None = None,
+    timeout: float | None = None,
+    max_workers: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+    transport: TransportOptions | None = None,
+) -> Iterator[TenantReport]:
+    """Check tenants concurrently in a pool of processes, and yield their reports as soon as they are done.
+
+    Each tenant is checked by :func:`check_tenant` in a process started from scratch,
+    so tenants do not share any client, connection or state.
+    If a process crashes, the tenants it was checking are reported as failed.
+
+    :param tenants: The tenants to check.
+    :param processes: The number of processes. Defaults to the number of CPUs.
+    :param timeout: The maximum duration of the checks of a tenant, in seconds.
+        This is a soft limit, see :func:`check_tenant`.
+    :param max_workers: The number of threads used to check each tenant.
+        See :attr:`~scim2_tester.CheckConfig.max_workers`.
+    :param include_checks: The names or tags of the checks to run.
+        See :attr:`~scim2_tester.CheckConfig.include_checks`.
+    :param exclude_checks: The names or tags of the checks not to run.
+        See :attr:`~scim2_tester.CheckConfig.exclude_checks`.
+    :param transport: How the clients connect to the tenants.
+    """
+    check = partial(
+        check_tenant,
+        timeout=timeout,
+        max_workers=max_workers,
+        include_checks=include_checks,
+        exclude_checks=exclude_checks,
+        transport=transport,
+    )
+    # Forked processes would inherit the locks and connections of the threads of this process.
+    executor = ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        futures = {executor.submit(check, tenant): tenant for tenant in tenants}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:
+                yield TenantReport(
+                    futures[future].name,
+                    error=f"{exc.__class__.__name__}: {exc}",
+                )
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def run_fleet(
+    tenants: Iterable[Tenant],
+    processes: int | None = None,
+    timeout: float | None = None,
+    max_workers: int | None = None,
+    include_checks: list[str] | None = None,
+    exclude_checks: list[str] | None = None,
+    transport: TransportOptions | None = None,
+) -> FleetReport:
+    """Like :func:`iter_fleet`, but return an aggregated report once all the tenants are checked.
+
+    :raises ValueError: If several tenants have the same name.
+    """
+    tenants = list(tenants)
+    check_unique_names(tenants)
+    start = time.perf_counter()
+    reports = {
+        report.name: report
+        for report in iter_fleet(
+            tenants,
+            processes,
+            timeout,
+            max_workers,
+            include_checks,
+            exclude_checks,
+            transport,
+        )
+    }
+    return FleetReport(
+        tenants=[reports[tenant.name] for tenant in tenants],
+        duration=time.perf_counter() - start,
+    )
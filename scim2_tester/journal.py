@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from scim2_models import Resource
+
+
+class Event(str, Enum):
+    created = "created"
+    deleted = "deleted"
+
+
+@dataclass
+class JournalEntry:
+    """A resource creation or deletion, as recorded in a :class:`Journal`."""
+
+    event: Event
+    """Whether the resource has been created or deleted."""
+
+    schema: str
+    """The main schema of the resource, used to find its model back."""
+
+    id: str
+    """The id of the resource."""
+
+    location: str | None = None
+    """The location of the resource, for information."""
+
+    @classmethod
+    def from_resource(cls, event: Event, obj: Resource) -> "JournalEntry":
+        if obj.id is None:
+            raise ValueError(
+                f"Cannot record a {obj.__class__.__name__} object without id"
+            )
+
+        return cls(
+            event=event,
+            schema=obj.__class__.model_fields["schemas"].default[0],
+            id=obj.id,
+            location=obj.meta.location if obj.meta else None,
+        )
+
+
+class Journal:
+    """An append-only file recording the resources created and deleted on a server.
+
+    Each entry is a JSON line written as soon as the event happens,
+    so the journal is still accurate if the process is killed.
+    Resources that have been created but never deleted can be retrieved with :meth:`leftovers`
+    and purged with :func:`~scim2_tester.cleanup.cleanup_journal`.
+    The journal can be shared between threads.
+
+    :param path: The path of the journal file. It is created if it does not exist.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def append(self, entries: Iterable[JournalEntry]) -> None:
+        lines = "".join(json.dumps(asdict(entry)) + "\n" for entry in entries)
+        if not lines:
+            return
+
+        with self.lock, open(self.path, "a") as fd:
+            fd.write(lines)
+
+    def created(self, objects: Iterable[Resource]) -> None:
+        """Record the creation of resources."""
+        self.append(JournalEntry.from_resource(Event.created, obj) for obj in objects)
+
+    def deleted(self, objects: Iterable[Resource]) -> None:
+        """Record the deletion of resources."""
+        self.append(JournalEntry.from_resource(Event.deleted, obj) for obj in objects)
+
+    def entries(self) -> list[JournalEntry]:
+        """Read the journal entries.
+
+        A truncated last line, written by an interrupted process, is ignored.
+        """
+        if not self.path.exists():
+            return []
+
+        entries = []
+        with open(self.path) as fd:
+            for line in fd:
+                try:
+                    payload = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                entries.append(
+                    JournalEntry(**{**payload, "event": Event(payload["event"])})
+                )
+        return entries
+
+    def leftovers(self, since: int = 0) -> list[JournalEntry]:
+        """Return the resources that have been created but not deleted, in creation order.
+
+        :param since: The number of entries to skip, so only the resources created afterwards are returned.
+            For instance ``len(journal.entries())`` before an operation.
+        """
+        leftovers: dict[tuple[str, str], JournalEntry] = {}
+        for entry in self.entries()[since:]:
+            key = (entry.schema, entry.id)
+            if entry.event == Event.created:
+                leftovers[key] = entry
+            else:
+                leftovers.pop(key, None)
+        return list(leftovers.values())
@@ -0,0 +1,326 @@
+import dataclasses
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from dataclasses import field
+from itertools import count
+
+from scim2_client import SCIMClientError
+from scim2_models import Resource
+from scim2_models import ResourceType
+
+from scim2_tester.cleanup import delete_fixtures
+from scim2_tester.cleanup import delete_objects
+from scim2_tester.filling import fill_with_random_values
+from scim2_tester.fixtures import FixturePool
+from scim2_tester.resource import check_object_creation
+from scim2_tester.resource import check_object_deletion
+from scim2_tester.resource import check_object_query
+from scim2_tester.resource import check_object_replacement
+from scim2_tester.resource import creation_field_names
+from scim2_tester.resource import model_from_resource_type
+from scim2_tester.resource import replacement_field_names
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import SCIMTesterError
+from scim2_tester.utils import Status
+from scim2_tester.utils import clone_config
+
+LIFECYCLE = "lifecycle"
+
+
+@dataclass
+class OperationStats:
+    """Latencies and errors of one kind of operation during a load test."""
+
+    name: str
+    """The name of the operation, e.g. ``check_object_creation``."""
+
+    latencies: list[float] = field(default_factory=list)
+    """The duration in seconds of every operation."""
+
+    errors: int = 0
+    """The number of failed operations."""
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    def percentile(self, percent: int) -> float | None:
+        """Return the latency under which `percent`% of the operations have been performed."""
+        if not self.latencies:
+            return None
+
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[
+            percent - 1
+        ]
+
+    @property
+    def p50(self) -> float | None:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float | None:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float | None:
+        return self.percentile(99)
+
+
+@dataclass
+class LoadReport:
+    """The results of a load test."""
+
+    duration: float = 0.0
+    """The wall-clock duration of the load test, in seconds."""
+
+    operations: dict[str, OperationStats] = field(default_factory=dict)
+    """The statistics of every operation, indexed by operation name.
+
+    The :data:`~scim2_tester.load.LIFECYCLE` entry measures complete lifecycles,
+    including the creation of the shared referenced objects for the first lifecycles that need them.
+    """
+
+    cleanup_error: str | None = None
+    """Why the shared referenced objects could not be deleted at the end of the test, if they could not."""
+
+    @property
+    def iterations(self) -> int:
+        """The number of performed lifecycles."""
+        return self.operations[LIFECYCLE].count if LIFECYCLE in self.operations else 0
+
+    @property
+    def throughput(self) -> float:
+        """The number of lifecycles performed per second."""
+        return self.iterations / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """The proportion of lifecycles that had at least one failed operation."""
+        return self.operations[LIFECYCLE].error_rate if self.iterations else 0.0
+
+    def record(self, name: str, latency: float, success: bool) -> None:
+        stats = self.operations.setdefault(name, OperationStats(name))
+        stats.latencies.append(latency)
+        if not success:
+            stats.errors += 1
+
+
+def timed(
+    report: LoadReport,
+    lock: threading.Lock,
+    check: Callable[..., CheckResult],
+    *args,
+) -> CheckResult:
+    start = time.perf_counter()
+    result = check(*args)
+    latency = time.perf_counter() - start
+    with lock:
+        report.record(check.__name__, latency, result.status == Status.SUCCESS)
+    return result
+
+
+def run_lifecycle(
+    conf: CheckConfig,
+    resource_type: ResourceType,
+    report: LoadReport,
+    lock: threading.Lock,
+) -> bool:
+    """Create, query, replace and delete an object, and record the latency of each operation.
+
+    :return: Whether all the operations succeeded.
+    """
+    model = model_from_resource_type(conf, resource_type)
+    if not model:
+        raise SCIMTesterError(
+            f"No Schema matching the ResourceType {resource_type.id}", conf
+        )
+
+    garbages: list[Resource] = []
+    try:
+        success = run_operations(conf, model, garbages, report, lock)
+    except (SCIMClientError, SCIMTesterError):
+        success = False
+    finally:
+        try:
+            delete_objects(conf, garbages, missing_ok=True)
+        except (SCIMClientError, SCIMTesterError):
+            success = False
+
+    return success
+
+
+def run_operations(
+    conf: CheckConfig,
+    model: type[Resource],
+    garbages: list[Resource],
+    report: LoadReport,
+    lock: threading.Lock,
+) -> bool:
+    obj, obj_garbages = fill_with_random_values(
+        conf, model(), creation_field_names(model)
+    )
+    garbages += obj_garbages
+
+    result = timed(report, lock, check_object_creation, conf, obj)
+    created_obj = result.data
+    if result.status != Status.SUCCESS or not isinstance(created_obj, Resource):
+        return False
+
+    # The object is deleted during the cleanup if the lifecycle does not delete it.
+    garbages.append(created_obj)
+    results = [timed(report, lock, check_object_query, conf, created_obj)]
+
+    _, obj_garbages = fill_with_random_values(
+        conf, created_obj, replacement_field_names(model)
+    )
+    garbages += obj_garbages
+    results.append(timed(report, lock, check_object_replacement, conf, created_obj))
+    results.append(timed(report, lock, check_object_deletion, conf, created_obj))
+    if results[-1].status == Status.SUCCESS:
+        garbages.remove(created_obj)
+    return all(result.status == Status.SUCCESS for result in results)
+
+
+def run_load(
+    conf: CheckConfig,
+    resource_types: list[ResourceType] | None = None,
+    iterations: int | None = None,
+    duration: float | None = None,
+    workers: int = 1,
+    rate: float | None = None,
+    open_loop: bool = False,
+) -> LoadReport:
+    """Replay the creation, query, replacement and deletion lifecycle of resources concurrently.
+
+    Lifecycles are performed for each resource type in turn, until
+    :paramref:`iterations` lifecycles have been started, or :paramref:`duration` is elapsed.
+    Each worker thread performs its requests with its own copy of :attr:`~scim2_tester.CheckConfig.client`.
+    The resources targeted by references are shared by all the lifecycles,
+    with :attr:`~scim2_tester.CheckConfig.fixture_pool`, and deleted at the end of the test.
+
+    :param conf: The check configuration. The client resource types and models must have been discovered.
+    :param resource_types: The resource types to test. Defaults to all the client resource types.
+    :param iterations: The number of lifecycles to perform.
+    :param duration: The duration of the load test, in seconds.
+    :param workers: The number of concurrent worker threads.
+    :param rate: The target number of lifecycles started per second.
+        If :data:`None`, workers start new lifecycles as soon as they are available.
+    :param open_loop: If :data:`False`, lifecycles start when a worker is available,
+        so the actual rate lowers when the server slows down.
+        If :data:`True`, lifecycles are started at :paramref:`rate` whatever the number of pending lifecycles,
+        and the :data:`~scim2_tester.load.LIFECYCLE` latency includes the time spent waiting for a worker.
+    """
+    if iterations is None and duration is None:
+        raise ValueError("Either 'iterations' or 'duration' must be set")
+
+    if open_loop and not rate:
+        raise ValueError("An open-loop load test needs a 'rate'")
+
+    resource_types = list(resource_types or conf.client.resource_types or [])
+    if not resource_types:
+        raise SCIMTesterError("No resource type to test", conf)
+
+    if conf.fixture_pool is None:
+        conf = dataclasses.replace(conf, fixture_pool=FixturePool())
+
+    report = LoadReport()
+    lock = threading.Lock()
+    local = threading.local()
+    counter = count()
+    stopped = threading.Event()
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def scheduled_time(iteration: int) -> float:
+        return start + iteration / rate if rate else time.perf_counter()
+
+    def next_iteration() -> int | None:
+        if stopped.is_set():
+            return None
+
+        iteration = next(counter)
+        if iterations is not None and iteration >= iterations:
+            return None
+
+        if deadline is not None and scheduled_time(iteration) >= deadline:
+            return None
+
+        return iteration
+
+    def lifecycle(iteration: int, scheduled: float) -> None:
+        if not hasattr(local, "conf"):
+            local.conf = clone_config(conf)
+
+        resource_type = resource_types[iteration % len(resource_types)]
+        lifecycle_start = scheduled if open_loop else time.perf_counter()
+        success = run_lifecycle(local.conf, resource_type, report, lock)
+        latency = time.perf_counter() - lifecycle_start
+        with lock:
+            report.record(LIFECYCLE, latency, success)
+
+    def wait_until(moment: float) -> None:
+        delay = moment - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def closed_loop_worker(_) -> None:
+        while (iteration := next_iteration()) is not None:
+            scheduled = scheduled_time(iteration)
+            wait_until(scheduled)
+            lifecycle(iteration, scheduled)
+
+    def open_loop_futures(executor: ThreadPoolExecutor) -> set[Future]:
+        # Completed lifecycles are collected as they go so only the pending ones are kept.
+        futures: set[Future] = set()
+        while (iteration := next_iteration()) is not None:
+            scheduled = scheduled_time(iteration)
+            wait_until(scheduled)
+            futures.add(executor.submit(lifecycle, iteration, scheduled))
+            done, futures = wait(futures, timeout=0)
+            for future in done:
+                future.result()
+        return futures
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                if open_loop:
+                    futures = open_loop_futures(executor)
+
+                else:
+                    futures = {
+                        executor.submit(closed_loop_worker, worker)
+                        for worker in range(workers)
+                    }
+
+                for future in futures:
+                    future.result()
+
+            except BaseException:
+                # Workers finish their current lifecycle and start no new one.
+                stopped.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    finally:
+        report.duration = time.perf_counter() - start
+        try:
+            delete_fixtures(conf)
+        except (SCIMClientError, SCIMTesterError) as exc:
+            report.cleanup_error = str(exc)
+
+    return report
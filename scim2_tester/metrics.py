@@ -0,0 +1,143 @@
+import inspect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from scim2_client import SCIMClient
+
+# Measurements can be shared by several threads, see scim2_tester.utils.map_in_threads.
+_lock = threading.Lock()
+
+
+@dataclass
+class Metrics:
+    """Count the HTTP requests performed during a measurement."""
+
+    requests: int = 0
+    """The number of performed HTTP requests."""
+
+    bytes_sent: int = 0
+    """The size of the request bodies, in bytes."""
+
+    bytes_received: int = 0
+    """The size of the response bodies, in bytes."""
+
+    transport_time: float = 0.0
+    """The time spent waiting for responses, in seconds.
+
+    The rest of a check duration is spent in scim2-tester, scim2-client and scim2-models:
+    value generation, payloads serialization and validation, results building etc.
+    """
+
+    def add(self, other: "Metrics") -> None:
+        with _lock:
+            self.requests += other.requests
+            self.bytes_sent += other.bytes_sent
+            self.bytes_received += other.bytes_received
+            self.transport_time += other.transport_time
+
+
+_current_metrics: ContextVar[Metrics | None] = ContextVar(
+    "scim2_tester_metrics", default=None
+)
+
+
+@contextmanager
+def measure() -> Iterator[Metrics]:
+    """Count the HTTP requests performed in the context.
+
+    Measurements can be nested: requests are also counted by the enclosing measurements.
+    Contexts are isolated between threads and asynchronous tasks,
+    so concurrent measurements do not interfere.
+
+    The requests are counted only if the client has been instrumented with :func:`instrument_client`.
+    """
+    parent = _current_metrics.get()
+    metrics = Metrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+        if parent is not None:
+            parent.add(metrics)
+
+
+def record_request(bytes_sent: int = 0) -> None:
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        with _lock:
+            metrics.requests += 1
+            metrics.bytes_sent += bytes_sent
+
+
+def record_response(bytes_received: int = 0, transport_time: float = 0.0) -> None:
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        with _lock:
+            metrics.bytes_received += bytes_received
+            metrics.transport_time += transport_time
+
+
+def instrument_client(client: SCIMClient) -> None:
+    """Make the HTTP client underlying a SCIM client report its requests to :func:`measure`.
+
+    :class:`httpx.Client` and :class:`httpx.AsyncClient` are instrumented with event hooks,
+    and :class:`werkzeug.test.Client` by wrapping its :meth:`~werkzeug.test.Client.open` method.
+    Other HTTP clients are left untouched.
+    Instrumenting a client several times has no effect.
+    """
+    http_client = getattr(client, "client", None)
+    if http_client is None or getattr(http_client, "_scim2_tester_instrumented", False):
+        return
+
+    if hasattr(http_client, "event_hooks"):
+        instrument_httpx_client(http_client)
+
+    elif hasattr(http_client, "open") and hasattr(http_client, "application"):
+        instrument_werkzeug_client(http_client)
+
+    else:
+        return
+
+    http_client._scim2_tester_instrumented = True
+
+
+def instrument_httpx_client(http_client) -> None:
+    if inspect.iscoroutinefunction(http_client.send):
+
+        async def on_request(request):
+            record_request(len(request.content))
+
+        async def on_response(response):
+            await response.aread()
+            record_response(len(response.content), response.elapsed.total_seconds())
+
+    else:
+
+        def on_request(request):
+            record_request(len(request.content))
+
+        def on_response(response):
+            response.read()
+            record_response(len(response.content), response.elapsed.total_seconds())
+
+    http_client.event_hooks["request"].append(on_request)
+    http_client.event_hooks["response"].append(on_response)
+
+
+def instrument_werkzeug_client(http_client) -> None:
+    open_ = http_client.open
+
+    def instrumented_open(*args, **kwargs):
+        start = time.perf_counter()
+        response = open_(*args, **kwargs)
+        transport_time = time.perf_counter() - start
+        record_request(response.request.content_length or 0)
+        record_response(len(response.get_data()), transport_time)
+        return response
+
+    http_client.open = instrumented_open
@@ -0,0 +1,220 @@
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+
+from scim2_models import ListResponse
+from scim2_models import Resource
+from scim2_models import SearchRequest
+
+from .registry import register
+from .utils import CheckConfig
+from .utils import CheckResult
+from .utils import Status
+from .utils import Steps
+from .utils import asynchronous
+from .utils import checker
+from .utils import run_steps
+from .utils import run_steps_async
+
+WALK_ATTEMPTS = 3
+"""The number of times a pagination walk is attempted when objects are created or deleted during the walk."""
+
+
+@dataclass
+class Page:
+    """A page of a list response, as yielded by :func:`iter_pages`."""
+
+    start_index: int
+    """The requested 1-based index of the first result."""
+
+    response: ListResponse
+    """The list response."""
+
+    duration: float
+    """The time spent to retrieve the page, in seconds."""
+
+
+@dataclass
+class PageStats:
+    """A compact summary of a :class:`Page`."""
+
+    start_index: int
+    """The requested 1-based index of the first result."""
+
+    items: int
+    """The number of resources in the page."""
+
+    duration: float
+    """The time spent to retrieve the page, in seconds."""
+
+
+def page_search_request(conf: CheckConfig, start_index: int) -> SearchRequest:
+    return SearchRequest(start_index=start_index, count=conf.page_size)
+
+
+def next_start_index(page: Page) -> int | None:
+    """Return the index of the next page, or :data:`None` if the page is the last one."""
+    resources = page.response.resources or []
+    total_results = page.response.total_results
+    start_index = page.start_index + len(resources)
+    if not resources or total_results is None or start_index > total_results:
+        return None
+
+    return start_index
+
+
+def query_page(
+    conf: CheckConfig, model: type[Resource], start_index: int
+) -> Steps[Page]:
+    start = time.perf_counter()
+    response = yield conf.client.query(
+        model,
+        search_request=page_search_request(conf, start_index),
+        expected_status_codes=conf.expected_status_codes or [200],
+    )
+    return Page(start_index, response, time.perf_counter() - start)
+
+
+def iter_pages(
+    conf: CheckConfig, model: type[Resource], start_index: int = 1
+) -> Iterator[Page]:
+    """Query all the objects of one kind, page by page, with `startIndex` and `count`.
+
+    Pages of :attr:`~scim2_tester.CheckConfig.page_size` objects are requested one at a time,
+    so only one page is held in memory, and the iteration can be stopped as soon as an object is found.
+    """
+    next_index: int | None = start_index
+    while next_index is not None:
+        page = run_steps(query_page(conf, model, next_index))
+        yield page
+        next_index = next_start_index(page)
+
+
+async def iter_pages_async(
+    conf: CheckConfig, model: type[Resource], start_index: int = 1
+) -> AsyncIterator[Page]:
+    """Asynchronous version of :func:`iter_pages`."""
+    next_index: int | None = start_index
+    while next_index is not None:
+        page = await run_steps_async(query_page(conf, model, next_index))
+        yield page
+        next_index = next_start_index(page)
+
+
+@dataclass
+class PaginationWalk:
+    """Accumulate the pages of a walk, and check their consistency."""
+
+    pages: list[PageStats] = field(default_factory=list)
+    total_results: set[int | None] = field(default_factory=set)
+    ids: set[str] = field(default_factory=set)
+    duplicates: list[str] = field(default_factory=list)
+    truncated: bool = False
+    """Whether the walk stopped before the last page."""
+
+    def add(self, page: Page) -> None:
+        resources = page.response.resources or []
+        self.pages.append(PageStats(page.start_index, len(resources), page.duration))
+        self.total_results.add(page.response.total_results)
+        for resource in resources:
+            if resource.id in self.ids:
+                self.duplicates.append(resource.id)
+            self.ids.add(resource.id)
+
+    @property
+    def changed(self) -> bool:
+        """Whether `totalResults` changed during the walk, meaning objects were created or deleted."""
+        return len(self.total_results) > 1
+
+    def result(self, conf: CheckConfig, model: type[Resource]) -> CheckResult:
+        name = model.__name__
+        if self.changed:
+            totals = [
+                str(total)
+                for total in sorted(
+                    total for total in self.total_results if total is not None
+                )
+            ]
+            # Some servers omit totalResults on some pages only.
+            if None in self.total_results:
+                totals.append("missing")
+            return CheckResult(
+                conf,
+                status=Status.ERROR,
+                reason=f"Inconsistent totalResults across {name} pages: {', '.join(totals)}",
+                data=self.pages,
+            )
+
+        if self.duplicates:
+            return CheckResult(
+                conf,
+                status=Status.ERROR,
+                reason=f"{name} objects listed on several pages: {', '.join(self.duplicates)}",
+                data=self.pages,
+            )
+
+        (total_results,) = self.total_results
+        if not self.truncated and total_results != len(self.ids):
+            return CheckResult(
+                conf,
+                status=Status.ERROR,
+                reason=f"{len(self.ids)} {name} objects listed across pages, but totalResults is {total_results}",
+                data=self.pages,
+            )
+
+        slowest = max(self.pages, key=lambda page: page.duration)
+        first = self.pages[0]
+        slowdown = slowest.duration / first.duration if first.duration else 1
+        objects = (
+            f"the first {len(self.ids)} of {total_results}"
+            if self.truncated
+            else len(self.ids)
+        )
+        return CheckResult(
+            conf,
+            status=Status.SUCCESS,
+            reason=(
+                f"Successful walk through {objects} {name} objects in {len(self.pages)} pages, "
+                f"the slowest page at startIndex {slowest.start_index} took {slowest.duration:.3f}s, "
+                f"{slowdown:.1f}× the first page"
+            ),
+            data=self.pages,
+        )
+
+
+@register(requires=["check_object_creation"], tags=["resource", "pagination"])
+@checker
+def check_pagination(conf: CheckConfig, model: type[Resource]) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.4.2.4 <7644#section-3.4.2.4>`, list responses can be paginated with `startIndex` and `count`.
+
+    All the objects of one kind are walked through, page by page.
+    `totalResults` must be the same on every page, and every object must be listed exactly once.
+    The time spent to retrieve every page is stored in the result data,
+    so slowdowns of deep pages can be spotted.
+    The walk stops after :attr:`~scim2_tester.CheckConfig.max_walk_pages` pages.
+    """
+    for _ in range(WALK_ATTEMPTS):
+        walk = PaginationWalk()
+        start_index: int | None = 1
+        while start_index is not None:
+            if (
+                conf.max_walk_pages is not None
+                and len(walk.pages) >= conf.max_walk_pages
+            ):
+                walk.truncated = True
+                break
+
+            page = yield from query_page(conf, model, start_index)
+            walk.add(page)
+            start_index = next_start_index(page)
+
+        # Objects created or deleted by concurrent checks shift the pages.
+        if not walk.changed:
+            break
+
+    return walk.result(conf, model)
+
+
+check_pagination_async = asynchronous(check_pagination)
@@ -0,0 +1,327 @@
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from scim2_models import Context
+from scim2_models import PatchOp
+from scim2_models import PatchOperation
+from scim2_models import Resource
+from scim2_models import Returned
+from scim2_models import Uniqueness
+
+from scim2_tester.metrics import measure
+from scim2_tester.plan import model_plan
+from scim2_tester.raw import RawResponse
+from scim2_tester.raw import raw_request
+from scim2_tester.raw import resource_path
+from scim2_tester.registry import register
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Status
+from scim2_tester.utils import Steps
+from scim2_tester.utils import asynchronous
+from scim2_tester.utils import attribute_name
+from scim2_tester.utils import checker
+
+
+@dataclass
+class PatchCost:
+    """The cost of a PATCH request, next to the PUT request producing the same object."""
+
+    patch_size: int
+    """The size of the PATCH request body, in bytes."""
+
+    patch_time: float
+    """The duration of the PATCH request, in seconds."""
+
+    put_size: int
+    """The size of the equivalent PUT request body, in bytes."""
+
+    put_time: float
+    """The duration of the equivalent PUT request, in seconds."""
+
+    @property
+    def size_ratio(self) -> float:
+        """The size of the PATCH request, relatively to the PUT request."""
+        return self.patch_size / self.put_size if self.put_size else 1.0
+
+
+def patch_supported(conf: CheckConfig) -> bool:
+    """Whether the server announces PATCH support in its :class:`~scim2_models.ServiceProviderConfig`."""
+    service_provider_config = conf.client.service_provider_config
+    return bool(
+        service_provider_config
+        and service_provider_config.patch
+        and service_provider_config.patch.supported
+    )
+
+
+def replaced_field_name(model: type[Resource]) -> str | None:
+    """Return the single-valued string attribute patched with ``replace``, like ``displayName``."""
+    plan = model_plan(model)
+    candidates = [
+        field_name
+        for field_name in plan.replacement
+        if model.get_field_root_type(field_name) is str
+        and not model.get_field_multiplicity(field_name)
+        and field_name not in plan.required
+        and model.get_field_annotation(field_name, Returned) != Returned.never
+        and model.get_field_annotation(field_name, Uniqueness) != Uniqueness.server
+    ]
+    # externalId is set by clients, other attributes are more likely patched.
+    candidates.sort(key=lambda field_name: field_name == "external_id")
+    return candidates[0] if candidates else None
+
+
+def multi_valued_field_name(model: type[Resource]) -> str | None:
+    """Return the multi-valued attribute patched with ``add`` and ``remove``, like ``members`` or ``emails``.
+
+    Its elements must have a ``value`` sub-attribute, so they can be targeted with a value filter.
+    """
+    for field_name in model_plan(model).replacement:
+        root_type = model.get_field_root_type(field_name)
+        if (
+            field_name != "schemas"
+            and model.get_field_multiplicity(field_name)
+            and "value" in getattr(root_type, "model_fields", {})
+        ):
+            return field_name
+    return None
+
+
+def patch_field_names(model: type[Resource]) -> list[str]:
+    """Return the attributes that must be filled with random values for the PATCH checks."""
+    return [
+        field_name
+        for field_name in (replaced_field_name(model), multi_valued_field_name(model))
+        if field_name
+    ]
+
+
+def patch_payload(operation: PatchOperation) -> dict:
+    return PatchOp(operations=[operation]).model_dump()
+
+
+def element_values(obj: Resource, field_name: str) -> list:
+    return [element.value for element in getattr(obj, field_name, None) or []]
+
+
+PatchCheck = tuple[PatchOperation, Callable[[Resource], bool]]
+"""A PATCH operation, and how to verify the patched object."""
+
+
+def replace_operation(model: type[Resource], values: Resource) -> PatchCheck | None:
+    field_name = replaced_field_name(model)
+    if not field_name:
+        return None
+
+    return (
+        PatchOperation(
+            op=PatchOperation.Op.replace_,
+            path=attribute_name(model, field_name),
+            value=getattr(values, field_name),
+        ),
+        lambda patched: getattr(patched, field_name) == getattr(values, field_name),
+    )
+
+
+def add_operation(model: type[Resource], values: Resource) -> PatchCheck | None:
+    field_name = multi_valued_field_name(model)
+    if not field_name:
+        return None
+
+    added = element_values(values, field_name)
+    if not added:
+        return None
+
+    return (
+        PatchOperation(
+            op=PatchOperation.Op.add,
+            path=attribute_name(model, field_name),
+            value=[
+                element.model_dump(scim_ctx=Context.RESOURCE_REPLACEMENT_REQUEST)
+                for element in getattr(values, field_name)
+            ],
+        ),
+        lambda patched: set(added) <= set(element_values(patched, field_name)),
+    )
+
+
+def remove_operation(model: type[Resource], values: Resource) -> PatchCheck | None:
+    field_name = multi_valued_field_name(model)
+    if not field_name:
+        return None
+
+    added = element_values(values, field_name)
+    if not added:
+        return None
+
+    return (
+        PatchOperation(
+            op=PatchOperation.Op.remove,
+            path=f"{attribute_name(model, field_name)}[value eq {json.dumps(added[0])}]",
+        ),
+        lambda patched: added[0] not in element_values(patched, field_name),
+    )
+
+
+def patch_operations(
+    model: type[Resource], values: Resource
+) -> dict[str, PatchCheck | None]:
+    """Return the operation of every PATCH check, and how to verify the patched object.
+
+    The operations are :data:`None` if the model has no attribute to patch.
+    """
+    return {
+        "replace": replace_operation(model, values),
+        "add": add_operation(model, values),
+        "remove": remove_operation(model, values),
+    }
+
+
+def patch_result(
+    conf: CheckConfig,
+    obj: Resource,
+    operation: PatchOperation,
+    response: RawResponse,
+    applied: bool | None,
+    cost: PatchCost | None,
+) -> CheckResult:
+    name = obj.__class__.__name__
+    description = f"{operation.op.value if operation.op else ''} {operation.path}"
+    if response.status_code not in (200, 204):
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"Expected a 200 or 204 response to a PATCH {description} of a {name} object, got {response.status_code}",
+            data=response.payload,
+        )
+
+    if not applied or cost is None:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"The PATCH {description} of a {name} object with id {obj.id} was not applied",
+            data=cost,
+        )
+
+    return CheckResult(
+        conf,
+        status=Status.SUCCESS,
+        reason=(
+            f"Successful PATCH {description} of a {name} object with id {obj.id}: "
+            f"{cost.patch_size} bytes in {cost.patch_time * 1000:.1f}ms, "
+            f"against {cost.put_size} bytes in {cost.put_time * 1000:.1f}ms for the equivalent PUT"
+        ),
+        data=cost,
+    )
+
+
+def no_operation_result(conf: CheckConfig, obj: Resource, op: str) -> CheckResult:
+    return CheckResult(
+        conf,
+        status=Status.SUCCESS,
+        reason=f"No {obj.__class__.__name__} attribute to PATCH with {op}",
+    )
+
+
+def timed_patch(
+    conf: CheckConfig, obj: Resource, operation: PatchOperation
+) -> Steps[tuple[RawResponse, int, float]]:
+    with measure() as metrics:
+        start = time.perf_counter()
+        response = yield from raw_request.steps(
+            conf.client,
+            "PATCH",
+            resource_path(conf.client, obj),
+            payload=patch_payload(operation),
+        )
+        duration = time.perf_counter() - start
+    return response, metrics.bytes_sent, duration
+
+
+def apply_patch(
+    conf: CheckConfig,
+    obj: Resource,
+    operation: PatchOperation,
+    verify: Callable[[Resource], bool],
+) -> Steps[CheckResult]:
+    """PATCH an object, verify the result, and PUT the patched object to compare the costs."""
+    response, patch_size, patch_time = yield from timed_patch(conf, obj, operation)
+    if response.status_code not in (200, 204):
+        return patch_result(conf, obj, operation, response, None, None)
+
+    patched = yield conf.client.query(
+        obj.__class__, obj.id, expected_status_codes=conf.expected_status_codes or [200]
+    )
+    with measure() as put_metrics:
+        start = time.perf_counter()
+        yield conf.client.replace(
+            patched, expected_status_codes=conf.expected_status_codes or [200]
+        )
+        put_time = time.perf_counter() - start
+    cost = PatchCost(patch_size, patch_time, put_metrics.bytes_sent, put_time)
+    return patch_result(conf, obj, operation, response, verify(patched), cost)
+
+
+@register(
+    requires=["check_object_creation"],
+    after=["check_object_replacement", "check_conditional_replacement"],
+    tags=["resource", "patch"],
+)
+@checker
+def check_object_patch_replace(
+    conf: CheckConfig, obj: Resource, values: Resource
+) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.5.2.3 <7644#section-3.5.2.3>`, a PATCH ``replace`` operation replaces the value of an attribute.
+
+    A single-valued attribute like ``displayName`` is replaced with its value in `values`.
+    The size and duration of the request are stored in the result data, next to the equivalent PUT.
+    """
+    if not (operation := patch_operations(obj.__class__, values)["replace"]):
+        return no_operation_result(conf, obj, "replace")
+    return (yield from apply_patch(conf, obj, *operation))
+
+
+@register(
+    requires=["check_object_creation"],
+    after=["check_object_patch_replace"],
+    tags=["resource", "patch"],
+)
+@checker
+def check_object_patch_add(
+    conf: CheckConfig, obj: Resource, values: Resource
+) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.5.2.1 <7644#section-3.5.2.1>`, a PATCH ``add`` operation adds elements to a multi-valued attribute.
+
+    The elements of a multi-valued attribute like ``members`` in `values` are added,
+    without sending the elements already present.
+    The size and duration of the request are stored in the result data, next to the equivalent PUT.
+    """
+    if not (operation := patch_operations(obj.__class__, values)["add"]):
+        return no_operation_result(conf, obj, "add")
+    return (yield from apply_patch(conf, obj, *operation))
+
+
+@register(
+    requires=["check_object_creation", "check_object_patch_add"],
+    tags=["resource", "patch"],
+)
+@checker
+def check_object_patch_remove(
+    conf: CheckConfig, obj: Resource, values: Resource
+) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.5.2.2 <7644#section-3.5.2.2>`, a PATCH ``remove`` operation with a value filter removes matching elements.
+
+    The first element added by :func:`check_object_patch_add` is removed with a path like ``members[value eq "..."]``.
+    The size and duration of the request are stored in the result data, next to the equivalent PUT.
+    """
+    if not (operation := patch_operations(obj.__class__, values)["remove"]):
+        return no_operation_result(conf, obj, "remove")
+    return (yield from apply_patch(conf, obj, *operation))
+
+
+check_object_patch_replace_async = asynchronous(check_object_patch_replace)
+check_object_patch_add_async = asynchronous(check_object_patch_add)
+check_object_patch_remove_async = asynchronous(check_object_patch_remove)
@@ -0,0 +1,225 @@
+import base64
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+from functools import lru_cache
+from inspect import isclass
+from typing import Annotated
+from typing import Any
+from typing import get_args
+from typing import get_origin
+from weakref import WeakKeyDictionary
+
+from scim2_models import BaseModel
+from scim2_models import ComplexAttribute
+from scim2_models import Extension
+from scim2_models import ExternalReference
+from scim2_models import Meta
+from scim2_models import Mutability
+from scim2_models import Reference
+from scim2_models import Required
+from scim2_models import Resource
+from scim2_models import URIReference
+from scim2_models.utils import UNION_TYPES
+
+from scim2_tester.values import ValueGenerator
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """How to generate a random value for a model field.
+
+    Exactly one of :attr:`generate`, :attr:`reference_names` and :attr:`nested_model` is set.
+    """
+
+    name: str
+    """The name of the field."""
+
+    is_multiple: bool
+    """Whether the field is multi-valued."""
+
+    generate: Callable[[ValueGenerator], Any] | None = None
+    """Return a random value for the field, drawn from a :class:`~scim2_tester.values.ValueGenerator`."""
+
+    reference_names: tuple[str, ...] | None = None
+    """The names of the resources the field can reference, e.g. ``("User", "Group")``."""
+
+    nested_model: type[BaseModel] | None = None
+    """The complex attribute or extension model that must be filled recursively."""
+
+
+@dataclass(frozen=True)
+class ModelPlan:
+    """The fields of a model, introspected once and for all."""
+
+    fields: dict[str, FieldPlan] = field(default_factory=dict)
+    """The plans of the fields that can be filled, i.e. without default values, by field name."""
+
+    required: tuple[str, ...] = ()
+    """The names of the required fields."""
+
+    creation: tuple[str, ...] = ()
+    """The names of the fields that can be set at creation."""
+
+    replacement: tuple[str, ...] = ()
+    """The names of the fields that can be set at replacement."""
+
+    def iter_fields(
+        self, field_names: Iterable[str] | None = None
+    ) -> Iterable[FieldPlan]:
+        """Iterate over the plans of `field_names`, skipping the fields with default values.
+
+        All the fields are iterated if `field_names` is empty or :data:`None`,
+        for instance for models without required fields.
+        """
+        if not field_names:
+            return self.fields.values()
+
+        return (self.fields[name] for name in field_names if name in self.fields)
+
+
+_model_plans: WeakKeyDictionary[type[BaseModel], ModelPlan] = WeakKeyDictionary()
+
+
+def model_plan(model: type[BaseModel]) -> ModelPlan:
+    """Return the cached :class:`ModelPlan` of a model, and build it on first use."""
+    plan = _model_plans.get(model)
+    if plan is None:
+        plan = _model_plans[model] = build_model_plan(model)
+
+    return plan
+
+
+def build_model_plan(model: type[BaseModel]) -> ModelPlan:
+    fields = {
+        field_name: build_field_plan(model, field_name)
+        for field_name, field in model.model_fields.items()
+        if not field.default
+    }
+    mutabilities = {
+        field_name: model.get_field_annotation(field_name, Mutability)
+        for field_name in model.model_fields
+    }
+    return ModelPlan(
+        fields=fields,
+        required=tuple(
+            field_name
+            for field_name in model.model_fields
+            if model.get_field_annotation(field_name, Required) == Required.true
+        ),
+        creation=tuple(
+            field_name
+            for field_name, mutability in mutabilities.items()
+            if mutability
+            in (Mutability.read_write, Mutability.write_only, Mutability.immutable)
+        ),
+        replacement=tuple(
+            field_name
+            for field_name, mutability in mutabilities.items()
+            if mutability in (Mutability.read_write, Mutability.write_only)
+        ),
+    )
+
+
+def reference_names(ref_type: Any) -> tuple[str, ...]:
+    """Return ``("User", "Group")`` from ``Union[Literal['User'], Literal['Group']]``."""
+    if get_origin(ref_type) in UNION_TYPES:
+        return tuple(
+            name
+            for sub_ref_type in get_args(ref_type)
+            for name in reference_names(sub_ref_type)
+        )
+
+    return (get_args(ref_type)[0],)
+
+
+def build_field_plan(model: type[BaseModel], field_name: str) -> FieldPlan:
+    field = model.model_fields[field_name]
+    is_multiple = model.get_field_multiplicity(field_name)
+    field_type = model.get_field_root_type(field_name)
+    if get_origin(field_type) == Annotated:
+        field_type = get_args(field_type)[0]
+
+    def plan(generate: Callable[[ValueGenerator], Any]) -> FieldPlan:
+        return FieldPlan(field_name, is_multiple, generate=generate)
+
+    if field_type is Meta:
+        return plan(lambda values: None)
+
+    if field.examples:
+        examples = field.examples
+        return plan(lambda values: values.choice(examples))
+
+    # RFC7643 §4.1.2 provides the following indications, however
+    # there is no way to guess the existence of such requirements
+    # just by looking at the object schema.
+    #     The value SHOULD be specified according to [RFC5321].
+    if field_name == "value" and "email" in model.__name__.lower():
+        return plan(lambda values: f"{values.uuid()}@{values.uuid()}.com")
+
+    # RFC7643 §4.1.2 provides the following indications, however
+    # there is no way to guess the existence of such requirements
+    # just by looking at the object schema.
+    #     The value SHOULD be specified
+    #     according to the format defined in [RFC3966], e.g.,
+    #     'tel:+1-201-555-0123'.
+    if field_name == "value" and "phone" in model.__name__.lower():
+        return plan(lambda values: values.digits(10))
+
+    if field_type is int:
+        return plan(lambda values: values.uuid().int)
+
+    if field_type is bool:
+        return plan(lambda values: values.choice([True, False]))
+
+    if field_type is bytes:
+        return plan(lambda values: base64.b64encode(values.string().encode("utf-8")))
+
+    if get_origin(field_type) is Reference:
+        ref_type = get_args(field_type)[0]
+        if ref_type not in (ExternalReference, URIReference):
+            return FieldPlan(
+                field_name, is_multiple, reference_names=reference_names(ref_type)
+            )
+
+        return plan(lambda values: f"https://{values.uuid()}.test")
+
+    if isclass(field_type) and issubclass(field_type, Enum):
+        members = list(field_type)
+        return plan(lambda values: values.choice(members))
+
+    if isclass(field_type) and issubclass(field_type, ComplexAttribute | Extension):
+        return FieldPlan(field_name, is_multiple, nested_model=field_type)
+
+    # Put emails so this will be accepted by EmailStr too
+    return plan(lambda values: values.string())
+
+
+@dataclass(frozen=True)
+class ModelIndex:
+    """Lookup tables of a set of resource models."""
+
+    by_schema: dict[str, type[Resource]]
+    """The models indexed by their main schema URN."""
+
+    by_name: dict[str, type[Resource]]
+    """The models indexed by the last part of their main schema URN, e.g. ``User``."""
+
+    def get(self, name: str) -> type[Resource] | None:
+        """Get a model by its schema or its name."""
+        return self.by_schema.get(name) or self.by_name.get(name)
+
+
+@lru_cache(maxsize=32)
+def model_index(resource_models: tuple[type[Resource], ...]) -> ModelIndex:
+    """Return the cached :class:`ModelIndex` of a set of resource models."""
+    by_schema: dict[str, type[Resource]] = {}
+    by_name: dict[str, type[Resource]] = {}
+    for resource_model in resource_models:
+        schema = resource_model.model_fields["schemas"].default[0]
+        by_schema.setdefault(schema, resource_model)
+        by_name.setdefault(schema.split(":")[-1], resource_model)
+
+    return ModelIndex(by_schema, by_name)
@@ -0,0 +1,235 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from scim2_models import Resource
+from scim2_models import Returned
+
+from scim2_tester.plan import model_plan
+from scim2_tester.raw import RawResponse
+from scim2_tester.raw import raw_request
+from scim2_tester.raw import resource_path
+from scim2_tester.registry import register
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Status
+from scim2_tester.utils import Steps
+from scim2_tester.utils import asynchronous
+from scim2_tester.utils import attribute_name
+from scim2_tester.utils import checker
+
+
+@dataclass
+class ProjectionSavings:
+    """What projected queries saved compared to the full representation."""
+
+    bytes_saved: int
+    """The difference between the full and the projected response bodies sizes, in bytes."""
+
+    time_saved: float
+    """The difference between the full and the projected queries durations, in seconds."""
+
+    ratio: float
+    """The size of the projected responses, relatively to the full responses."""
+
+
+def returned_always(model: type[Resource]) -> set[str]:
+    return {
+        attribute_name(model, field_name)
+        for field_name in model.model_fields
+        if model.get_field_annotation(field_name, Returned) == Returned.always
+    }
+
+
+def projected_attributes(model: type[Resource]) -> list[str]:
+    """Return the attributes requested with `attributes`: ``id``, and the required attributes like ``userName``.
+
+    If no attribute is required, the first string attribute is requested, like ``displayName``.
+    """
+    plan = model_plan(model)
+    candidates = [
+        field_name
+        for field_name in plan.creation
+        if model.get_field_root_type(field_name) is str
+        and not model.get_field_multiplicity(field_name)
+        and model.get_field_annotation(field_name, Returned) != Returned.never
+    ]
+    # externalId is set by clients, other attributes better identify objects.
+    candidates.sort(key=lambda field_name: field_name == "external_id")
+    field_names = [
+        field_name for field_name in candidates if field_name in plan.required
+    ] or candidates[:1]
+    return ["id", *(attribute_name(model, field_name) for field_name in field_names)]
+
+
+def excluded_attributes(model: type[Resource]) -> list[str]:
+    """Return the attributes excluded with `excludedAttributes`: the multi-valued attributes like ``groups`` and ``members``."""
+    return [
+        attribute_name(model, field_name)
+        for field_name in model.model_fields
+        if field_name != "schemas"
+        and model.get_field_multiplicity(field_name)
+        and model.get_field_annotation(field_name, Returned)
+        not in (Returned.always, Returned.never)
+    ]
+
+
+def response_resources(response: RawResponse) -> list[dict[str, Any]]:
+    """Return the objects of an object or a list response."""
+    payload = response.payload or {}
+    if "Resources" in payload or "totalResults" in payload:
+        return payload.get("Resources") or []
+    return [payload]
+
+
+def projection_result(
+    conf: CheckConfig,
+    obj: Resource,
+    param: str,
+    attributes: list[str],
+    unexpected_attributes: Callable[[dict[str, Any]], list[str]],
+    full: list[tuple[RawResponse, float]],
+    projected: list[tuple[RawResponse, float]],
+) -> CheckResult:
+    name = obj.__class__.__name__
+    projection = f"{param}={','.join(attributes)}"
+    for response, _ in projected:
+        if response.status_code != 200:
+            return CheckResult(
+                conf,
+                status=Status.ERROR,
+                reason=f"Expected a 200 response to a {name} query with {projection}, got {response.status_code}",
+            )
+
+    full_size = sum(response.size for response, _ in full)
+    projected_size = sum(response.size for response, _ in projected)
+    savings = ProjectionSavings(
+        bytes_saved=full_size - projected_size,
+        time_saved=sum(duration for _, duration in full)
+        - sum(duration for _, duration in projected),
+        ratio=projected_size / full_size if full_size else 1.0,
+    )
+    unexpected = sorted(
+        {
+            key
+            for response, _ in projected
+            for resource in response_resources(response)
+            for key in unexpected_attributes(resource)
+        }
+    )
+    if unexpected:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"{name} queries with {projection} returned the {', '.join(unexpected)} attributes",
+            data=savings,
+        )
+
+    return CheckResult(
+        conf,
+        status=Status.SUCCESS,
+        reason=(
+            f"Successful {name} queries with {projection}, "
+            f"the responses are {savings.ratio:.0%} of the full representation, "
+            f"saving {savings.bytes_saved} bytes and {savings.time_saved * 1000:.1f}ms"
+        ),
+        data=savings,
+    )
+
+
+def projection_requests(
+    conf: CheckConfig, obj: Resource, params: dict[str, str]
+) -> list[tuple[str, dict[str, Any]]]:
+    """Return the object and list requests, with the projection `params`."""
+    list_params = {"count": conf.page_size}
+    return [
+        (resource_path(conf.client, obj), params),
+        (conf.client.resource_endpoint(obj.__class__), {**list_params, **params}),
+    ]
+
+
+def timed_queries(
+    conf: CheckConfig, obj: Resource, params: dict[str, str]
+) -> Steps[list[tuple[RawResponse, float]]]:
+    responses = []
+    for path, request_params in projection_requests(conf, obj, params):
+        start = time.perf_counter()
+        response = yield from raw_request.steps(
+            conf.client, "GET", path, params=request_params
+        )
+        responses.append((response, time.perf_counter() - start))
+    return responses
+
+
+def not_requested(model: type[Resource], attributes: list[str]):
+    allowed = {name.lower() for name in [*attributes, *returned_always(model)]}
+    allowed.add("schemas")
+    return lambda resource: [key for key in resource if key.lower() not in allowed]
+
+
+def not_excluded(attributes: list[str]):
+    excluded = {name.lower() for name in attributes}
+    return lambda resource: [key for key in resource if key.lower() in excluded]
+
+
+@register(requires=["check_object_creation"], tags=["resource", "projection"])
+@checker
+def check_attributes_projection(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.9 <7644#section-3.9>`, the `attributes` parameter overrides the attributes returned by default.
+
+    The object and the list of objects are queried with `attributes` set to ``id`` and the required attributes,
+    and must not return other attributes than those and the attributes that are always returned.
+    The payload size and latency reduction compared to the full representation are stored in the result data.
+    """
+    model = obj.__class__
+    attributes = projected_attributes(model)
+    full = yield from timed_queries(conf, obj, {})
+    projected = yield from timed_queries(
+        conf, obj, {"attributes": ",".join(attributes)}
+    )
+    return projection_result(
+        conf,
+        obj,
+        "attributes",
+        attributes,
+        not_requested(model, attributes),
+        full,
+        projected,
+    )
+
+
+@register(requires=["check_object_creation"], tags=["resource", "projection"])
+@checker
+def check_excluded_attributes(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
+    """As described in :rfc:`RFC7644 §3.9 <7644#section-3.9>`, the `excludedAttributes` parameter removes attributes returned by default.
+
+    The object and the list of objects are queried with the multi-valued attributes excluded,
+    like ``groups`` or ``members``, and must not return them.
+    The payload size and latency reduction compared to the full representation are stored in the result data.
+    """
+    attributes = excluded_attributes(obj.__class__)
+    if not attributes:
+        return CheckResult(
+            conf,
+            status=Status.SUCCESS,
+            reason=f"No {obj.__class__.__name__} attribute to exclude",
+        )
+
+    full = yield from timed_queries(conf, obj, {})
+    projected = yield from timed_queries(
+        conf, obj, {"excludedAttributes": ",".join(attributes)}
+    )
+    return projection_result(
+        conf,
+        obj,
+        "excludedAttributes",
+        attributes,
+        not_excluded(attributes),
+        full,
+        projected,
+    )
+
+
+check_attributes_projection_async = asynchronous(check_attributes_projection)
+check_excluded_attributes_async = asynchronous(check_excluded_attributes)
@@ -0,0 +1,101 @@
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from scim2_client import SCIMClient
+from scim2_client.errors import UnexpectedContentFormat
+from scim2_models import Resource
+
+from scim2_tester.utils import Steps
+from scim2_tester.utils import asynchronous
+from scim2_tester.utils import steps
+
+
+@dataclass
+class RawResponse:
+    """An HTTP response, independently of the client engine."""
+
+    status_code: int
+    """The HTTP status code."""
+
+    headers: Mapping[str, str]
+    """The response headers."""
+
+    payload: Any
+    """The decoded JSON body, or :data:`None` if the body is empty or is not JSON."""
+
+    size: int
+    """The size of the body, in bytes."""
+
+
+def resource_path(client: SCIMClient, obj: Resource) -> str:
+    """Return the endpoint of an object, relative to the server base URL."""
+    return f"{client.resource_endpoint(obj.__class__)}/{obj.id}"
+
+
+def endpoint_url(client: SCIMClient, endpoint: str) -> str:
+    make_url = getattr(client, "make_url", None)
+    return make_url(endpoint) if make_url else endpoint
+
+
+def is_json(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+def raw_response(response, body: bytes) -> RawResponse:
+    """Build a :class:`RawResponse`, decoding the body only if it is JSON.
+
+    Bodies of other content types, like HTML error pages, are not decoded.
+
+    :raises UnexpectedContentFormat: If a JSON body cannot be decoded.
+    """
+    payload = None
+    if body and is_json(response.headers.get("Content-Type", "")):
+        try:
+            payload = json.loads(body)
+        except ValueError as exc:
+            raise UnexpectedContentFormat(source=body.decode(errors="replace")) from exc
+
+    return RawResponse(
+        status_code=response.status_code,
+        headers=response.headers,
+        payload=payload,
+        size=len(body),
+    )
+
+
+@steps
+def raw_request(
+    client: SCIMClient,
+    method: str,
+    endpoint: str,
+    headers: dict[str, str] | None = None,
+    payload: Any = None,
+    params: dict[str, Any] | None = None,
+) -> Steps[RawResponse]:
+    """Perform an HTTP request with the HTTP client underlying a SCIM client, without checking the response.
+
+    This gives access to the protocol features scim2-client does not expose,
+    like response headers and bodiless responses.
+    :class:`httpx.Client`, :class:`httpx.AsyncClient` and :class:`werkzeug.test.Client` are supported.
+    """
+    http_client = getattr(client, "client", None)
+    if http_client is None:
+        raise TypeError(f"{client.__class__.__name__} has no underlying HTTP client")
+
+    url = endpoint_url(client, endpoint)
+    if hasattr(http_client, "application"):
+        response = http_client.open(
+            url, method=method, headers=headers, json=payload, query_string=params
+        )
+        return raw_response(response, response.get_data())
+
+    response = yield http_client.request(
+        method, url, headers=headers, json=payload, params=params
+    )
+    return raw_response(response, response.content)
+
+
+raw_request_async = asynchronous(raw_request)
@@ -0,0 +1,137 @@
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+DISCOVERY_DATA = ("service_provider_config", "resource_types", "resource_models")
+
+
+@dataclass(frozen=True)
+class CheckSpec:
+    """The declaration of a check, used to schedule and select it."""
+
+    name: str
+    """The name of the check, which is also the title of its results."""
+
+    requires: tuple[str, ...] = ()
+    """The checks that must succeed before this check runs.
+
+    This check is passed the data of their results, and it is skipped if one of them fails or is not run.
+    """
+
+    after: tuple[str, ...] = ()
+    """The checks that must be done before this check runs, whatever their status.
+
+    For instance, the checks reading an object must be done before the checks modifying it.
+    """
+
+    needs: tuple[str, ...] = ()
+    """The discovery data this check needs, amongst :data:`DISCOVERY_DATA`."""
+
+    produces: str | None = None
+    """The discovery data this check provides, amongst :data:`DISCOVERY_DATA`."""
+
+    tags: frozenset[str] = frozenset()
+    """Names of the groups of checks this check belongs to, to select several checks at once."""
+
+    description: str | None = None
+    """What the check does."""
+
+
+checks: dict[str, CheckSpec] = {}
+"""The registered checks, by name."""
+
+
+def register(
+    requires: Iterable[str] = (),
+    after: Iterable[str] = (),
+    needs: Iterable[str] = (),
+    produces: str | None = None,
+    tags: Iterable[str] = (),
+) -> Callable[[F], F]:
+    """Declare a check and how it depends on other checks."""
+
+    def decorate(func: F) -> F:
+        name = func.__name__
+        checks[name] = CheckSpec(
+            name,
+            requires=tuple(requires),
+            after=tuple(after),
+            needs=tuple(needs),
+            produces=produces,
+            tags=frozenset(tags),
+            description=func.__doc__,
+        )
+        return func
+
+    return decorate
+
+
+def needed_data(name: str) -> set[str]:
+    """Return the discovery data a check needs, including the data needed by the checks it requires."""
+    spec = checks[name]
+    data = set(spec.needs)
+    for required in spec.requires:
+        data |= needed_data(required)
+    return data
+
+
+def producer(data: str) -> str:
+    """Return the name of the check that provides some discovery data."""
+    return next(spec.name for spec in checks.values() if spec.produces == data)
+
+
+def matching_checks(patterns: Iterable[str]) -> set[str]:
+    """Return the names of the checks matching names or tags.
+
+    :raises ValueError: If a pattern matches no check.
+    """
+    names = set()
+    for pattern in patterns:
+        matches = {
+            spec.name
+            for spec in checks.values()
+            if pattern == spec.name or pattern in spec.tags
+        }
+        if not matches:
+            raise ValueError(f"No check is named or tagged {pattern!r}")
+        names |= matches
+    return names
+
+
+def select_checks(
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] = (),
+    available: Iterable[str] = (),
+) -> set[str]:
+    """Return the names of the checks to run.
+
+    The checks required by the included checks are included too,
+    as well as the checks providing the discovery data they need,
+    unless the data is already `available`.
+
+    :param include: Names or tags of the checks to run. All the checks are run if :data:`None`.
+    :param exclude: Names or tags of the checks not to run, even if other checks require them.
+    :param available: The discovery data already known.
+    """
+    excluded = matching_checks(exclude)
+    included = set(checks) if include is None else matching_checks(include)
+    selected = set()
+    pending = list(included - excluded)
+    while pending:
+        name = pending.pop()
+        if name in selected:
+            continue
+
+        selected.add(name)
+        pending += checks[name].requires
+        pending += [
+            producer(data)
+            for data in checks[name].needs
+            if data not in available
+            and any(spec.produces == data for spec in checks.values())
+        ]
+
+    return selected - excluded
@@ -0,0 +1,138 @@
+import abc
+import json
+import re
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import IO
+from typing import Any
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Status
+
+# Characters that XML 1.0 documents cannot contain, even escaped.
+_invalid_xml_chars = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def result_summary(result: CheckResult) -> dict[str, Any]:
+    """Return the fields of a result that can be serialized: everything but its data and description."""
+    return {
+        "title": result.title,
+        "resource_type": result.resource_type,
+        "status": result.status.name,
+        "reason": result.reason,
+        "duration": result.duration,
+        "requests": result.metrics.requests,
+        "bytes_sent": result.metrics.bytes_sent,
+        "bytes_received": result.metrics.bytes_received,
+        "transport_time": result.metrics.transport_time,
+    }
+
+
+class ReportWriter(abc.ABC):
+    """Write check results to a text file as soon as they are available.
+
+    Results are not kept in memory, so writers can be used for runs of any size.
+    The file is flushed after every result, so it can be followed while the checks run.
+    Writers do not close the file, but :meth:`close` must be called, or the writer used
+    as a context manager, to complete the report.
+
+    :param fd: The file the report is written to.
+    """
+
+    def __init__(self, fd: IO[str]):
+        self.fd = fd
+
+    @abc.abstractmethod
+    def write(self, result: CheckResult) -> None:
+        """Write a result to the report."""
+
+    def close(self) -> None:
+        """Complete the report."""
+        self.fd.flush()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JSONLinesWriter(ReportWriter):
+    """Write every result as a JSON line, as returned by :func:`result_summary`."""
+
+    def write(self, result: CheckResult) -> None:
+        self.fd.write(json.dumps(result_summary(result)) + "\n")
+        self.fd.flush()
+
+
+class JUnitWriter(ReportWriter):
+    """Write the results as a JUnit XML test suite, every check being a test case.
+
+    Test cases are named after the checks, and their class name includes
+    the resource type they were performed for, if any, e.g. ``scim2_tester.User``.
+    Failed checks are reported as failures, and skipped checks as skipped test cases.
+    The performed requests are reported in the test case output.
+    The number of tests and failures are not known before the end of the run,
+    so they are not written in the ``testsuite`` attributes.
+    """
+
+    def __init__(self, fd: IO[str], name: str = "scim2-tester"):
+        super().__init__(fd)
+        self.fd.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        self.fd.write(f"<testsuites>\n<testsuite name={quoteattr(name)}>\n")
+        self.fd.flush()
+
+    def write(self, result: CheckResult) -> None:
+        metrics = result.metrics
+        reason = _invalid_xml_chars.sub("", result.reason or "")
+        classname = (
+            f"scim2_tester.{result.resource_type}"
+            if result.resource_type
+            else "scim2_tester"
+        )
+        lines = [
+            f"<testcase classname={quoteattr(classname)} name={quoteattr(result.title or '')} "
+            f'time="{result.duration or 0.0:.6f}">'
+        ]
+        if result.status == Status.ERROR:
+            lines.append(
+                f"<failure message={quoteattr(reason)}>{escape(reason)}</failure>"
+            )
+        elif result.status == Status.SKIPPED:
+            lines.append(f"<skipped message={quoteattr(reason)}/>")
+        lines.append(
+            "<system-out>"
+            f"{metrics.requests} requests, {metrics.bytes_sent} bytes sent, "
+            f"{metrics.bytes_received} bytes received, "
+            f"{metrics.transport_time:.6f}s waiting for the server"
+            "</system-out>"
+        )
+        lines.append("</testcase>\n")
+        self.fd.write("\n".join(lines))
+        self.fd.flush()
+
+    def close(self) -> None:
+        self.fd.write("</testsuite>\n</testsuites>\n")
+        self.fd.flush()
+
+
+def iter_reported(
+    results: Iterator[CheckResult], writers: Iterable[ReportWriter]
+) -> Generator[CheckResult, None, None]:
+    """Yield results, after writing them with every writer.
+
+    If the iteration is stopped early, `results` is closed too,
+    so the temporary resources of :func:`~scim2_tester.iter_check_server` are deleted.
+    """
+    writers = list(writers)
+    try:
+        for result in results:
+            for writer in writers:
+                writer.write(result)
+            yield result
+    finally:
+        if hasattr(results, "close"):
+            results.close()
@@ -1,26 +1,104 @@
-from scim2_models import Mutability
+from collections.abc import Callable
+from collections.abc import Iterator
+from functools import partial
+from typing import Any
+from typing import cast
+
+from scim2_client import SCIMClientError
+from scim2_models import Context
+from scim2_models import ListResponse
 from scim2_models import Resource
 from scim2_models import ResourceType
 
+from scim2_tester.cleanup import delete_objects
+from scim2_tester.etag import check_conditional_query
+from scim2_tester.etag import check_conditional_replacement
+from scim2_tester.etag import etag_supported
 from scim2_tester.filling import fill_with_random_values
+from scim2_tester.metrics import Metrics
+from scim2_tester.metrics import instrument_client
+from scim2_tester.metrics import measure
+from scim2_tester.pagination import check_pagination
+from scim2_tester.pagination import next_start_index
+from scim2_tester.pagination import query_page
+from scim2_tester.patch import check_object_patch_add
+from scim2_tester.patch import check_object_patch_remove
+from scim2_tester.patch import check_object_patch_replace
+from scim2_tester.patch import patch_field_names
+from scim2_tester.patch import patch_supported
+from scim2_tester.plan import model_index
+from scim2_tester.plan import model_plan
+from scim2_tester.projection import check_attributes_projection
+from scim2_tester.projection import check_excluded_attributes
+from scim2_tester.registry import checks
+from scim2_tester.registry import register
+from scim2_tester.scheduler import Graph
+from scim2_tester.scheduler import Node
+from scim2_tester.scheduler import iter_graph
+from scim2_tester.scheduler import iter_graph_async
 from scim2_tester.utils import CheckConfig
 from scim2_tester.utils import CheckResult
+from scim2_tester.utils import RawPayload
+from scim2_tester.utils import SCIMTesterError
 from scim2_tester.utils import Status
+from scim2_tester.utils import Steps
+from scim2_tester.utils import StepsFunction
+from scim2_tester.utils import asynchronous
 from scim2_tester.utils import checker
+from scim2_tester.utils import journal_created
+from scim2_tester.utils import journal_deleted
 
 
 def model_from_resource_type(
     conf: CheckConfig, resource_type: ResourceType
 ) -> type[Resource] | None:
-    for resource_model in conf.client.resource_models:
-        if resource_model.model_fields["schemas"].default[0] == resource_type.schema_:
-            return resource_model
+    if resource_type.schema_ is None:
+        return None
 
-    return None
+    index = model_index(tuple(conf.client.resource_models or ()))
+    return index.by_schema.get(str(resource_type.schema_))
 
 
+def creation_field_names(model: type[Resource]) -> list[str]:
+    """Return the names of the fields that can be set at creation."""
+    return list(model_plan(model).creation)
+
+
+def replacement_field_names(model: type[Resource]) -> list[str]:
+    """Return the names of the fields that can be set at replacement."""
+    return list(model_plan(model).replacement)
+
+
+def list_response_ids(conf: CheckConfig, response) -> tuple[list[str], int | None]:
+    """Return the ids of the objects of a query response, and its total number of results."""
+    if conf.lazy_payloads:
+        ids = [resource.get("id") for resource in response.get("Resources", [])]
+        return ids, response.get("totalResults")
+
+    ids = [resource.id for resource in response.resources or []]
+    return ids, response.total_results
+
+
+def list_response_data(conf: CheckConfig, model: type[Resource], response) -> Any:
+    """Return the data to store in the result of a check performing a query.
+
+    With :attr:`~scim2_tester.CheckConfig.lazy_payloads`, the response is a raw payload
+    that is validated only when the result data is accessed.
+    """
+    if not conf.lazy_payloads:
+        return response
+
+    # Subscripting with a runtime model is not a valid type, so the class method is called instead.
+    response_model = cast(type[ListResponse], ListResponse.__class_getitem__(model))
+    parse = partial(
+        response_model.model_validate, scim_ctx=Context.RESOURCE_QUERY_RESPONSE
+    )
+    return RawPayload(response, parse)
+
+
+@register(needs=["resource_types", "resource_models"], tags=["resource", "crud"])
 @checker
-def check_object_creation(conf: CheckConfig, obj: type[Resource]) -> CheckResult:
+def check_object_creation(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
     """Perform an object creation.
 
     Todo:
@@ -28,9 +106,10 @@ def check_object_creation(conf: CheckConfig, obj: type[Resource]) -> CheckResult
       fields of the request object
 
     """
-    response = conf.client.create(
+    response = yield conf.client.create(
         obj, expected_status_codes=conf.expected_status_codes or [201]
     )
+    journal_created(conf, [response])
 
     return CheckResult(
         conf,
@@ -40,8 +119,9 @@ def check_object_creation(conf: CheckConfig, obj: type[Resource]) -> CheckResult
     )
 
 
+@register(requires=["check_object_creation"], tags=["resource", "crud"])
 @checker
-def check_object_query(conf: CheckConfig, obj: type[Resource]) -> CheckResult:
+def check_object_query(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
     """Perform an object query by knowing its id.
 
     Todo:
@@ -49,7 +129,7 @@ def check_object_query(conf: CheckConfig, obj: type[Resource]) -> CheckResult:
       fields of the request object
 
     """
-    response = conf.client.query(
+    response = yield conf.client.query(
         obj.__class__, obj.id, expected_status_codes=conf.expected_status_codes or [200]
     )
     return CheckResult(
@@ -60,40 +140,65 @@ def check_object_query(conf: CheckConfig, obj: type[Resource]) -> CheckResult:
     )
 
 
+@register(requires=["check_object_creation"], tags=["resource", "crud"])
 @checker
 def check_object_query_without_id(
-    conf: CheckConfig, obj: type[Resource]
-) -> CheckResult:
+    conf: CheckConfig, obj: Resource
+) -> Steps[CheckResult]:
     """Perform the query of all objects of one kind.
 
     Todo:
-      - look for the object across several pages
       - check if the fields of the result object are the same than the
       fields of the request object
 
     """
-    response = conf.client.query(
-        obj.__class__, expected_status_codes=conf.expected_status_codes or [200]
+    response = yield conf.client.query(
+        obj.__class__,
+        expected_status_codes=conf.expected_status_codes or [200],
+        check_response_payload=False if conf.lazy_payloads else None,
     )
-    found = any(obj.id == resource.id for resource in response.resources)
+    ids, total_results = list_response_ids(conf, response)
+    found = obj.id in ids
+    # The object may be on the next pages.
+    start_index: int | None = None
+    if total_results is not None and total_results > len(ids):
+        start_index = len(ids) + 1
+    while not found and start_index is not None:
+        page = yield from query_page(conf, obj.__class__, start_index)
+        found = any(obj.id == resource.id for resource in page.response.resources or [])
+        start_index = next_start_index(page)
+    data = list_response_data(conf, obj.__class__, response)
     if not found:
         return CheckResult(
             conf,
             status=Status.ERROR,
             reason=f"Could not find object {obj.__class__.__name__} with id : {obj.id}",
-            data=response,
+            data=data,
         )
 
     return CheckResult(
         conf,
         status=Status.SUCCESS,
         reason=f"Successful query of a {obj.__class__.__name__} object with id {obj.id}",
-        data=response,
+        data=data,
     )
 
 
+@register(
+    requires=["check_object_creation"],
+    # The object is modified once all the checks reading it are done.
+    after=[
+        "check_object_query",
+        "check_conditional_query",
+        "check_object_query_without_id",
+        "check_attributes_projection",
+        "check_excluded_attributes",
+        "check_pagination",
+    ],
+    tags=["resource", "crud"],
+)
 @checker
-def check_object_replacement(conf: CheckConfig, obj: type[Resource]) -> CheckResult:
+def check_object_replacement(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
     """Perform an object replacement.
 
     Todo:
@@ -101,7 +206,7 @@ def check_object_replacement(conf: CheckConfig, obj: type[Resource]) -> CheckRes
       fields of the request object
 
     """
-    response = conf.client.replace(
+    response = yield conf.client.replace(
         obj, expected_status_codes=conf.expected_status_codes or [200]
     )
     return CheckResult(
@@ -112,12 +217,23 @@ def check_object_replacement(conf: CheckConfig, obj: type[Resource]) -> CheckRes
     )
 
 
+@register(
+    requires=["check_object_creation"],
+    after=[
+        "check_object_replacement",
+        "check_conditional_replacement",
+        "check_object_patch_add",
+        "check_object_patch_remove",
+    ],
+    tags=["resource", "crud"],
+)
 @checker
-def check_object_deletion(conf: CheckConfig, obj: type[Resource]) -> CheckResult:
+def check_object_deletion(conf: CheckConfig, obj: Resource) -> Steps[CheckResult]:
     """Perform an object deletion."""
-    conf.client.delete(
+    yield conf.client.delete(
         obj.__class__, obj.id, expected_status_codes=conf.expected_status_codes or [204]
     )
+    journal_deleted(conf, [obj])
     return CheckResult(
         conf,
         status=Status.SUCCESS,
@@ -125,57 +241,211 @@ def check_object_deletion(conf: CheckConfig, obj: type[Resource]) -> CheckResult
     )
 
 
+LIFECYCLE_CHECKS = (
+    "check_object_creation",
+    "check_object_query",
+    "check_conditional_query",
+    "check_object_query_without_id",
+    "check_attributes_projection",
+    "check_excluded_attributes",
+    "check_pagination",
+    "check_object_replacement",
+    "check_conditional_replacement",
+    "check_object_patch_replace",
+    "check_object_patch_add",
+    "check_object_patch_remove",
+    "check_object_deletion",
+)
+"""The checks of the lifecycle of an object, in the order their results are returned."""
+
+
+def lifecycle_check_names(conf: CheckConfig) -> list[str]:
+    """Return the names of the lifecycle checks of the features the server supports."""
+    unsupported = set()
+    if not etag_supported(conf):
+        unsupported.add("etag")
+    if not patch_supported(conf):
+        unsupported.add("patch")
+    return [name for name in LIFECYCLE_CHECKS if not checks[name].tags & unsupported]
+
+
+def missing_model_graph(resource_type: ResourceType) -> Graph:
+    """Return a graph reporting that a resource type has no matching schema."""
+
+    def missing_model(conf: CheckConfig, data: dict[str, Any]) -> CheckResult:
+        return CheckResult(
+            conf,
+            status=Status.ERROR,
+            reason=f"No Schema matching the ResourceType {resource_type.id}",
+        )
+
+    return Graph(
+        [Node("check_object_creation", missing_model)], resource_type=resource_type.id
+    )
+
+
 def check_resource_type(
     conf: CheckConfig,
     resource_type: ResourceType,
 ) -> list[CheckResult]:
+    return list(iter_check_resource_type(conf, resource_type))
+
+
+def iter_check_resource_type(
+    conf: CheckConfig,
+    resource_type: ResourceType,
+) -> Iterator[CheckResult]:
+    """Like :func:`check_resource_type`, but yield the results as soon as they are available.
+
+    The last result is yielded once the temporary objects are deleted.
+    """
+    yield from iter_graph(conf, lifecycle_graph(conf, resource_type))
+
+
+def filling_error(
+    conf: CheckConfig,
+    name: str,
+    exc: SCIMClientError | SCIMTesterError,
+    metrics: Metrics,
+) -> CheckResult:
+    """Return the result of a check whose object could not be filled.
+
+    This happens when the objects targeted by its references cannot be created.
+    """
+    if conf.raise_exceptions:
+        raise exc
+
+    return CheckResult(
+        conf,
+        status=Status.ERROR,
+        title=name,
+        description=checks[name].description,
+        reason=f"Could not create the objects referenced by the {name} object: {exc}",
+        data=exc.source if isinstance(exc, SCIMClientError) else None,
+        metrics=metrics,
+    )
+
+
+def lifecycle_graph(conf: CheckConfig, resource_type: ResourceType) -> Graph:
+    """Return the checks creating, querying, replacing, patching and deleting an object of a resource type.
+
+    The temporary objects are deleted once the checks are done, even if a check raises an exception.
+    """
     model = model_from_resource_type(conf, resource_type)
     if not model:
-        return [
-            CheckResult(
-                conf,
-                status=Status.ERROR,
-                reason=f"No Schema matching the ResourceType {resource_type.id}",
+        return missing_model_graph(resource_type)
+
+    instrument_client(conf.client)
+    garbages: list[Resource] = []
+    patch_values: list[Resource] = []
+
+    def creation(conf: CheckConfig, data: dict[str, Any]) -> Steps[CheckResult]:
+        with measure() as fill_metrics:
+            try:
+                obj, obj_garbages = yield from fill_with_random_values.steps(
+                    conf, model(), creation_field_names(model)
+                )
+            except (SCIMClientError, SCIMTesterError) as exc:
+                return filling_error(conf, "check_object_creation", exc, fill_metrics)
+        garbages.extend(obj_garbages)
+        result = yield from check_object_creation.steps(conf, obj)
+        result.metrics.add(fill_metrics)
+        if result.status == Status.SUCCESS:
+            garbages.append(result.data)
+        return result
+
+    def replacement(conf: CheckConfig, data: dict[str, Any]) -> Steps[CheckResult]:
+        created_obj = data["check_object_creation"]
+        with measure() as fill_metrics:
+            try:
+                _, obj_garbages = yield from fill_with_random_values.steps(
+                    conf, created_obj, replacement_field_names(model)
+                )
+            except (SCIMClientError, SCIMTesterError) as exc:
+                return filling_error(
+                    conf, "check_object_replacement", exc, fill_metrics
+                )
+        garbages.extend(obj_garbages)
+        result = yield from check_object_replacement.steps(conf, created_obj)
+        result.metrics.add(fill_metrics)
+        return result
+
+    def conditional_replacement(
+        conf: CheckConfig, data: dict[str, Any]
+    ) -> Steps[CheckResult]:
+        replaced_obj = data["check_object_replacement"]
+        return check_conditional_replacement.steps(
+            conf,
+            data["check_object_creation"],
+            replaced_obj.meta and replaced_obj.meta.version,
+        )
+
+    def patch(check: StepsFunction) -> Callable:
+        # The PATCH checks share the same values, filled by the first one.
+        def run(conf: CheckConfig, data: dict[str, Any]) -> Steps[CheckResult]:
+            with measure() as fill_metrics:
+                if not patch_values:
+                    try:
+                        values, obj_garbages = yield from fill_with_random_values.steps(
+                            conf, model(), patch_field_names(model)
+                        )
+                    except (SCIMClientError, SCIMTesterError) as exc:
+                        return filling_error(conf, check.__name__, exc, fill_metrics)
+                    patch_values.append(values)
+                    garbages.extend(obj_garbages)
+            result = yield from check.steps(
+                conf, data["check_object_creation"], patch_values[0]
             )
-        ]
-
-    results = []
-    garbages = []
-    field_names = [
-        field_name
-        for field_name in model.model_fields.keys()
-        if model.get_field_annotation(field_name, Mutability)
-        in (Mutability.read_write, Mutability.write_only, Mutability.immutable)
+            result.metrics.add(fill_metrics)
+            return result
+
+        return run
+
+    def deletion(conf: CheckConfig, data: dict[str, Any]) -> Steps[CheckResult]:
+        created_obj = data["check_object_creation"]
+        # The object is not deleted again during the cleanup, even if the check failed.
+        # If it could not be deleted, it is left in the journal, if any.
+        garbages.remove(created_obj)
+        return (yield from check_object_deletion.steps(conf, created_obj))
+
+    def on_created_obj(check: StepsFunction) -> Callable:
+        return lambda conf, data: check.steps(conf, data["check_object_creation"])
+
+    runs: dict[str, Callable[[CheckConfig, dict[str, Any]], Any]] = {
+        "check_object_creation": creation,
+        "check_object_query": on_created_obj(check_object_query),
+        "check_conditional_query": on_created_obj(check_conditional_query),
+        "check_object_query_without_id": on_created_obj(check_object_query_without_id),
+        "check_attributes_projection": on_created_obj(check_attributes_projection),
+        "check_excluded_attributes": on_created_obj(check_excluded_attributes),
+        "check_pagination": lambda conf, data: check_pagination.steps(conf, model),
+        "check_object_replacement": replacement,
+        "check_conditional_replacement": conditional_replacement,
+        "check_object_patch_replace": patch(check_object_patch_replace),
+        "check_object_patch_add": patch(check_object_patch_add),
+        "check_object_patch_remove": patch(check_object_patch_remove),
+        "check_object_deletion": deletion,
+    }
+    return Graph(
+        [Node(name, runs[name]) for name in lifecycle_check_names(conf)],
+        cleanup=lambda conf: delete_objects.steps(conf, garbages, missing_ok=True),
+        resource_type=resource_type.id,
+    )
+
+
+check_object_creation_async = asynchronous(check_object_creation)
+check_object_query_async = asynchronous(check_object_query)
+check_object_query_without_id_async = asynchronous(check_object_query_without_id)
+check_object_replacement_async = asynchronous(check_object_replacement)
+check_object_deletion_async = asynchronous(check_object_deletion)
+
+
+async def check_resource_type_async(
+    conf: CheckConfig,
+    resource_type: ResourceType,
+) -> list[CheckResult]:
+    """Asynchronous version of :func:`check_resource_type`."""
+    return [
+        result
+        async for result in iter_graph_async(conf, lifecycle_graph(conf, resource_type))
     ]
-    obj, obj_garbages = fill_with_random_values(conf, model(), field_names)
-    garbages += obj_garbages
-
-    result = check_object_creation(conf, obj)
-    results.append(result)
-
-    if result.status == Status.SUCCESS:
-        created_obj = result.data
-        result = check_object_query(conf, created_obj)
-        results.append(result)
-
-        result = check_object_query_without_id(conf, created_obj)
-        results.append(result)
-
-        field_names = [
-            field_name
-            for field_name in model.model_fields.keys()
-            if model.get_field_annotation(field_name, Mutability)
-            in (Mutability.read_write, Mutability.write_only)
-        ]
-        _, obj_garbages = fill_with_random_values(conf, created_obj, field_names)
-        garbages += obj_garbages
-        result = check_object_replacement(conf, created_obj)
-        results.append(result)
-
-        result = check_object_deletion(conf, created_obj)
-        results.append(result)
-
-    for garbage in reversed(garbages):
-        conf.client.delete(garbage)
-
-    return results
@@ -1,15 +1,22 @@
-import uuid
+from functools import partial
 
 from scim2_models import Error
 from scim2_models import ResourceType
 
+from .registry import register
 from .utils import CheckConfig
 from .utils import CheckResult
+from .utils import Concurrently
 from .utils import Status
+from .utils import Steps
+from .utils import asynchronous
 from .utils import checker
+from .utils import steps
 
 
-def check_resource_types_endpoint(conf: CheckConfig) -> list[CheckResult]:
+@register(produces="resource_types", tags=["discovery"])
+@steps
+def check_resource_types_endpoint(conf: CheckConfig) -> Steps[list[CheckResult]]:
     """As described in RFC7644 §4 <rfc7644#section-4>`, `/ResourceTypes` is a mandatory endpoint, and should only be accessible by GET.
 
     .. todo::
@@ -20,21 +27,21 @@ def check_resource_types_endpoint(conf: CheckConfig) -> list[CheckResult]:
         - Check that a 403 response is returned if a filter is passed
         - Check that the `schema` attribute exists and is available.
     """
-    resource_types_result = check_query_all_resource_types(conf)
-    results = [resource_types_result]
-
+    resource_types_result = yield from check_query_all_resource_types.steps(conf)
+    calls = []
     if resource_types_result.status == Status.SUCCESS:
-        for resource_type in resource_types_result.data:
-            results.append(check_query_resource_type_by_id(conf, resource_type))
-
-    results.append(check_access_invalid_resource_type(conf))
+        calls = [
+            partial(check_query_resource_type_by_id.steps, resource_type=resource_type)
+            for resource_type in resource_types_result.data
+        ]
+    calls.append(check_access_invalid_resource_type.steps)
 
-    return results
+    return [resource_types_result, *(yield Concurrently(conf, calls))]
 
 
 @checker
-def check_query_all_resource_types(conf: CheckConfig) -> CheckResult:
-    response = conf.client.query(
+def check_query_all_resource_types(conf: CheckConfig) -> Steps[CheckResult]:
+    response = yield conf.client.query(
         ResourceType, expected_status_codes=conf.expected_status_codes or [200]
     )
     available = ", ".join([f"'{resource.name}'" for resource in response.resources])
@@ -47,8 +54,8 @@ def check_query_all_resource_types(conf: CheckConfig) -> CheckResult:
 @checker
 def check_query_resource_type_by_id(
     conf: CheckConfig, resource_type: ResourceType
-) -> CheckResult:
-    response = conf.client.query(
+) -> Steps[CheckResult]:
+    response = yield conf.client.query(
         ResourceType,
         resource_type.id,
         expected_status_codes=conf.expected_status_codes or [200],
@@ -63,9 +70,9 @@ def check_query_resource_type_by_id(
 
 
 @checker
-def check_access_invalid_resource_type(conf: CheckConfig) -> CheckResult:
-    probably_invalid_id = str(uuid.uuid4())
-    response = conf.client.query(
+def check_access_invalid_resource_type(conf: CheckConfig) -> Steps[CheckResult]:
+    probably_invalid_id = conf.value_generator.string()
+    response = yield conf.client.query(
         ResourceType,
         probably_invalid_id,
         expected_status_codes=conf.expected_status_codes or [404],
@@ -94,3 +101,6 @@ def check_access_invalid_resource_type(conf: CheckConfig) -> CheckResult:
         reason=f"/resource_types/{probably_invalid_id} invalid URL correctly returned a 404 error",
         data=response,
     )
+
+
+check_resource_types_endpoint_async = asynchronous(check_resource_types_endpoint)
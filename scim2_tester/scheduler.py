@@ -0,0 +1,436 @@
+import asyncio
+import contextvars
+import threading
+from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from scim2_tester.metrics import Metrics
+from scim2_tester.metrics import measure
+from scim2_tester.registry import checks
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Status
+from scim2_tester.utils import clone_config
+from scim2_tester.utils import hold_last_result
+from scim2_tester.utils import hold_last_result_async
+from scim2_tester.utils import record_cleanup_error
+from scim2_tester.utils import run_steps
+from scim2_tester.utils import run_steps_async
+
+
+@dataclass
+class Node:
+    """A check of a :class:`Graph`, bound to its arguments."""
+
+    name: str
+    """The name of the check, as registered in :data:`~scim2_tester.registry.checks`."""
+
+    run: Callable[[CheckConfig, dict[str, Any]], Any]
+    """Perform the check.
+
+    It is passed a configuration, and the data of the results of the checks it
+    :attr:`~scim2_tester.registry.CheckSpec.requires`, by name.
+    It returns a :class:`~scim2_tester.CheckResult`, a list of results whose first one is the check status,
+    or the :data:`~scim2_tester.utils.Steps` returning those, so the check is written once
+    for synchronous and asynchronous clients.
+    """
+
+
+@dataclass
+class Graph:
+    """Checks depending on each other, for instance the checks of the lifecycle of a resource type.
+
+    The dependencies between checks are declared with :func:`~scim2_tester.registry.register`.
+    The checks of different graphs are independent.
+    """
+
+    nodes: list[Node]
+    """The checks, in the order their results are returned."""
+
+    cleanup: Callable[[CheckConfig], Any] | None = None
+    """Called once all the checks are done, or interrupted.
+
+    It can return :data:`~scim2_tester.utils.Steps`, like :attr:`Node.run`.
+    Its requests are counted in the metrics of the last result.
+    """
+
+    resource_type: str | None = None
+    """The id of the resource type the checks are performed for, if any.
+
+    It is recorded in the :attr:`~scim2_tester.CheckResult.resource_type` of the results.
+    """
+
+
+@dataclass
+class GraphRun:
+    """The state of the checks of a :class:`Graph` during a run."""
+
+    graph: Graph
+
+    selected: set[str] | None = None
+    """The names of the checks to run. All the checks are run if :data:`None`."""
+
+    nodes: list[Node] = field(init=False)
+
+    outcomes: dict[str, tuple[Status, Any]] = field(init=False, default_factory=dict)
+    """The status of the checks done, and the data of their results if other checks require it."""
+
+    def __post_init__(self):
+        self.nodes = [
+            node
+            for node in self.graph.nodes
+            if self.selected is None or node.name in self.selected
+        ]
+        self.names = {node.name for node in self.nodes}
+        self.required = {
+            required
+            for node in self.nodes
+            for required in checks[node.name].requires
+            if required in self.names
+        }
+        self.prerequisites = {
+            node.name: self.previous_checks(node.name) for node in self.nodes
+        }
+
+    def previous_checks(self, name: str) -> list[str]:
+        """Return the checks of the run that must be done before a check.
+
+        The order is kept through the checks that are not run:
+        a check coming after an unselected check comes after the checks that one comes after.
+        """
+        previous = []
+        for dependency in (*checks[name].requires, *checks[name].after):
+            if dependency in self.names:
+                previous.append(dependency)
+            elif dependency in checks:
+                previous += self.previous_checks(dependency)
+        return list(dict.fromkeys(previous))
+
+    def skip_reason(self, node: Node) -> str | None:
+        """Return why a check cannot run, if one of the checks it requires did not succeed."""
+        for name in checks[node.name].requires:
+            if name not in self.names:
+                return f"Skipped because {name} was not run"
+
+            status, _ = self.outcomes.get(name, (Status.ERROR, None))
+            if status == Status.SKIPPED:
+                return f"Skipped because {name} was skipped"
+
+            if status != Status.SUCCESS:
+                return f"Skipped because {name} failed"
+
+        return None
+
+    def start(self, conf: CheckConfig, node: Node) -> Any:
+        """Run a check, or return a skipped result if its requirements are not met."""
+        if reason := self.skip_reason(node):
+            return skipped_result(conf, node.name, reason)
+
+        return node.run(
+            conf,
+            {
+                name: self.outcomes[name][1]
+                for name in checks[node.name].requires
+                if name in self.outcomes
+            },
+        )
+
+    def record(self, node: Node, result: CheckResult | list[CheckResult]) -> None:
+        """Store the outcome of a check, before its result is returned and possibly emptied."""
+        for item in as_list(result):
+            item.check = node.name
+            item.resource_type = self.graph.resource_type
+        first = result[0] if isinstance(result, list) else result
+        data = first.data if node.name in self.required else None
+        self.outcomes[node.name] = (first.status, data)
+
+
+def skipped_result(conf: CheckConfig, name: str, reason: str) -> CheckResult:
+    """Return the result of a check that has not been run."""
+    return CheckResult(
+        conf,
+        status=Status.SKIPPED,
+        title=name,
+        description=checks[name].description,
+        reason=reason,
+        duration=0.0,
+    )
+
+
+def skipped_graph(names: Iterable[str], reason: str) -> Graph:
+    """Return a graph of checks that are not run, for the same reason."""
+    return Graph([skipped_node(name, reason) for name in names])
+
+
+def skipped_node(name: str, reason: str) -> Node:
+    """Return a node of a check that is not run."""
+    return Node(name, lambda conf, data: skipped_result(conf, name, reason))
+
+
+def as_list(result: CheckResult | list[CheckResult]) -> list[CheckResult]:
+    return result if isinstance(result, list) else [result]
+
+
+def iter_graph(
+    conf: CheckConfig, graph: Graph, selected: set[str] | None = None
+) -> Iterator[CheckResult]:
+    """Run the checks of a graph one after the other, and yield their results.
+
+    The cleanup is performed before the last result is yielded,
+    or when the iteration is stopped early.
+    """
+    run = GraphRun(graph, selected)
+
+    def iter_results() -> Iterator[CheckResult]:
+        for node in run.nodes:
+            result = run_steps(run.start(conf, node))
+            run.record(node, result)
+            yield from as_list(result)
+
+    cleanup = graph.cleanup
+    if cleanup is None or not run.nodes:
+        yield from iter_results()
+    else:
+        yield from hold_last_result(iter_results(), lambda: run_steps(cleanup(conf)))
+
+
+def iter_graphs(
+    conf: CheckConfig, graphs: Iterable[Graph], selected: set[str] | None = None
+) -> Iterator[CheckResult]:
+    """Run the checks of several graphs, and yield their results in order.
+
+    If :attr:`~scim2_tester.CheckConfig.max_workers` is set,
+    every check is run in a thread as soon as the checks it depends on are done.
+    Otherwise, the checks are run one after the other.
+    """
+    if conf.max_workers:
+        yield from iter_graphs_in_threads(conf, graphs, selected)
+        return
+
+    for graph in graphs:
+        yield from iter_graph(conf, graph, selected)
+
+
+def iter_graphs_in_threads(
+    conf: CheckConfig, graphs: Iterable[Graph], selected: set[str] | None = None
+) -> Iterator[CheckResult]:
+    """Run the checks of several graphs in a pool of :attr:`~scim2_tester.CheckConfig.max_workers` threads.
+
+    A check is started as soon as the checks it depends on are done,
+    and the cleanup of a graph is performed as soon as all its checks are done.
+    Each thread gets its own copy of the configuration, like with :func:`~scim2_tester.utils.iter_in_threads`.
+    The results are yielded in order, as soon as they are available.
+    If the iteration is stopped early, the checks that have not started yet are not run,
+    and the graphs are cleaned up.
+    """
+    runs = [GraphRun(graph, selected) for graph in graphs]
+    runs = [run for run in runs if run.nodes]
+    futures: dict[tuple[int, str], Future] = {
+        (index, node.name): Future()
+        for index, run in enumerate(runs)
+        for node in run.nodes
+    }
+    cleanups: dict[int, Future] = {index: Future() for index in range(len(runs))}
+    waiting = {
+        (index, node.name): len(run.prerequisites[node.name])
+        for index, run in enumerate(runs)
+        for node in run.nodes
+    }
+    dependents: dict[tuple[int, str], list[Node]] = {key: [] for key in waiting}
+    remaining = {index: len(run.nodes) for index, run in enumerate(runs)}
+    for index, run in enumerate(runs):
+        for node in run.nodes:
+            for name in run.prerequisites[node.name]:
+                dependents[(index, name)].append(node)
+
+    local = threading.local()
+    lock = threading.Lock()
+    stopped = False
+    cleaned = set()
+    # Context variables, like the current measurement, are propagated to the threads.
+    context = contextvars.copy_context()
+    executor = ThreadPoolExecutor(max_workers=conf.max_workers)
+
+    def thread_conf() -> CheckConfig:
+        if not hasattr(local, "conf"):
+            local.conf = clone_config(conf)
+        return local.conf
+
+    def submit(func: Callable, *args) -> None:
+        if not stopped:
+            executor.submit(context.copy().run, func, *args)
+
+    def cleanup(index: int) -> None:
+        with lock:
+            if index in cleaned:
+                return
+            cleaned.add(index)
+
+        graph_cleanup = runs[index].graph.cleanup
+        try:
+            with measure() as metrics:
+                if graph_cleanup is not None:
+                    run_steps(graph_cleanup(thread_conf()))
+        except BaseException as exc:
+            cleanups[index].set_exception(exc)
+        else:
+            cleanups[index].set_result(metrics)
+
+    def execute(index: int, node: Node) -> None:
+        run = runs[index]
+        try:
+            result = run_steps(run.start(thread_conf(), node))
+            run.record(node, result)
+        except BaseException as exc:
+            futures[(index, node.name)].set_exception(exc)
+        else:
+            futures[(index, node.name)].set_result(result)
+
+        with lock:
+            ready = []
+            for dependent in dependents[(index, node.name)]:
+                waiting[(index, dependent.name)] -= 1
+                if waiting[(index, dependent.name)] == 0:
+                    ready.append(dependent)
+            remaining[index] -= 1
+            done = remaining[index] == 0
+
+            for dependent in ready:
+                submit(execute, index, dependent)
+            if done:
+                submit(cleanup, index)
+
+    try:
+        with lock:
+            for index, run in enumerate(runs):
+                for node in run.nodes:
+                    if not waiting[(index, node.name)]:
+                        submit(execute, index, node)
+
+        for index, run in enumerate(runs):
+            for node in run.nodes:
+                results = as_list(futures[(index, node.name)].result())
+                if node is run.nodes[-1]:
+                    try:
+                        metrics: Metrics = cleanups[index].result()
+                    except Exception as exc:
+                        record_cleanup_error(results[-1], exc)
+                    else:
+                        results[-1].metrics.add(metrics)
+                yield from results
+
+    finally:
+        with lock:
+            stopped = True
+        executor.shutdown(cancel_futures=True)
+        # Graphs interrupted before all their checks were done are cleaned up.
+        for index in range(len(runs)):
+            cleanup(index)
+
+
+async def iter_graph_async(
+    conf: CheckConfig,
+    graph: Graph,
+    selected: set[str] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> AsyncGenerator[CheckResult, None]:
+    """Asynchronous version of :func:`iter_graph`.
+
+    :param semaphore: If set, the number of requests performed at the same time is limited by this semaphore.
+    """
+    run = GraphRun(graph, selected)
+
+    async def iter_results() -> AsyncGenerator[CheckResult, None]:
+        for node in run.nodes:
+            result = await run_steps_async(run.start(conf, node), semaphore)
+            run.record(node, result)
+            for item in as_list(result):
+                yield item
+
+    cleanup = graph.cleanup
+    results: AsyncGenerator[CheckResult, None]
+    if cleanup is None or not run.nodes:
+        results = iter_results()
+    else:
+        results = hold_last_result_async(
+            iter_results(),
+            lambda: run_steps_async(cleanup(conf), semaphore),
+        )
+
+    try:
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
+
+
+async def iter_graphs_async(
+    conf: CheckConfig,
+    graphs: Iterable[Graph],
+    selected: set[str] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> AsyncGenerator[CheckResult, None]:
+    """Run the checks of several graphs concurrently, and yield their results in order.
+
+    Every check is started as soon as the checks it depends on are done,
+    and the cleanup of a graph is performed as soon as all its checks are done.
+    If the iteration is stopped early, the running checks are cancelled,
+    and the graphs are cleaned up.
+
+    :param semaphore: If set, the number of requests performed at the same time is limited by this semaphore.
+    """
+    runs = [GraphRun(graph, selected) for graph in graphs]
+    runs = [run for run in runs if run.nodes]
+    tasks: dict[tuple[int, str], asyncio.Future] = {}
+
+    async def execute(index: int, node: Node) -> Any:
+        run = runs[index]
+        prerequisites = [tasks[(index, name)] for name in run.prerequisites[node.name]]
+        if prerequisites:
+            await asyncio.wait(prerequisites)
+
+        result = await run_steps_async(run.start(conf, node), semaphore)
+        run.record(node, result)
+        return result
+
+    async def cleanup(index: int) -> Metrics:
+        run = runs[index]
+        await asyncio.wait([tasks[(index, node.name)] for node in run.nodes])
+        with measure() as metrics:
+            if run.graph.cleanup is not None:
+                await run_steps_async(run.graph.cleanup(conf), semaphore)
+        return metrics
+
+    for index, run in enumerate(runs):
+        for node in run.nodes:
+            tasks[(index, node.name)] = asyncio.ensure_future(execute(index, node))
+    cleanups = [asyncio.ensure_future(cleanup(index)) for index in range(len(runs))]
+
+    try:
+        for index, run in enumerate(runs):
+            for node in run.nodes:
+                results = as_list(await tasks[(index, node.name)])
+                if node is run.nodes[-1]:
+                    try:
+                        metrics = await cleanups[index]
+                    except Exception as exc:
+                        record_cleanup_error(results[-1], exc)
+                    else:
+                        results[-1].metrics.add(metrics)
+                for result in results:
+                    yield result
+
+    finally:
+        # Checks still running when the iteration stops are cancelled,
+        # and the graphs are cleaned up once their checks are cancelled.
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        await asyncio.gather(*cleanups, return_exceptions=True)
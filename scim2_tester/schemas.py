@@ -1,15 +1,22 @@
-import uuid
+from functools import partial
 
 from scim2_models import Error
 from scim2_models import Schema
 
+from .registry import register
 from .utils import CheckConfig
 from .utils import CheckResult
+from .utils import Concurrently
 from .utils import Status
+from .utils import Steps
+from .utils import asynchronous
 from .utils import checker
+from .utils import steps
 
 
-def check_schemas_endpoint(conf: CheckConfig) -> list[CheckResult]:
+@register(produces="resource_models", tags=["discovery"])
+@steps
+def check_schemas_endpoint(conf: CheckConfig) -> Steps[list[CheckResult]]:
     """As described in RFC7644 §4 <rfc7644#section-4>`, `/ResourceTypes` is a mandatory endpoint, and should only be accessible by GET.
 
     .. todo::
@@ -20,21 +27,21 @@ def check_schemas_endpoint(conf: CheckConfig) -> list[CheckResult]:
         - Check that a 403 response is returned if a filter is passed
         - Check that the 'ResourceType', 'ServiceProviderConfig' and 'Schema' schemas are provided.
     """
-    schemas_result = check_query_all_schemas(conf)
-    results = [schemas_result]
-
+    schemas_result = yield from check_query_all_schemas.steps(conf)
+    calls = []
     if schemas_result.status == Status.SUCCESS:
-        for resource_type in schemas_result.data:
-            results.append(check_query_schema_by_id(conf, resource_type))
-
-    results.append(check_access_invalid_schema(conf))
+        calls = [
+            partial(check_query_schema_by_id.steps, schema=schema)
+            for schema in schemas_result.data
+        ]
+    calls.append(check_access_invalid_schema.steps)
 
-    return results
+    return [schemas_result, *(yield Concurrently(conf, calls))]
 
 
 @checker
-def check_query_all_schemas(conf: CheckConfig) -> CheckResult:
-    response = conf.client.query(
+def check_query_all_schemas(conf: CheckConfig) -> Steps[CheckResult]:
+    response = yield conf.client.query(
         Schema, expected_status_codes=conf.expected_status_codes or [200]
     )
     available = ", ".join([f"'{resource.name}'" for resource in response.resources])
@@ -47,8 +54,8 @@ def check_query_all_schemas(conf: CheckConfig) -> CheckResult:
 
 
 @checker
-def check_query_schema_by_id(conf: CheckConfig, schema: Schema) -> CheckResult:
-    response = conf.client.query(
+def check_query_schema_by_id(conf: CheckConfig, schema: Schema) -> Steps[CheckResult]:
+    response = yield conf.client.query(
         Schema,
         schema.id,
         expected_status_codes=conf.expected_status_codes or [200],
@@ -63,9 +70,9 @@ def check_query_schema_by_id(conf: CheckConfig, schema: Schema) -> CheckResult:
 
 
 @checker
-def check_access_invalid_schema(conf: CheckConfig) -> CheckResult:
-    probably_invalid_id = str(uuid.uuid4())
-    response = conf.client.query(
+def check_access_invalid_schema(conf: CheckConfig) -> Steps[CheckResult]:
+    probably_invalid_id = conf.value_generator.string()
+    response = yield conf.client.query(
         Schema,
         probably_invalid_id,
         expected_status_codes=conf.expected_status_codes or [404],
@@ -94,3 +101,6 @@ def check_access_invalid_schema(conf: CheckConfig) -> CheckResult:
         reason=f"/Schemas/{probably_invalid_id} invalid URL correctly returned a 404 error",
         data=response,
     )
+
+
+check_schemas_endpoint_async = asynchronous(check_schemas_endpoint)
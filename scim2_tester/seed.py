@@ -0,0 +1,232 @@
+import dataclasses
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+
+from scim2_client import SCIMClientError
+from scim2_models import Meta
+from scim2_models import Resource
+from scim2_models import ResourceType
+
+from scim2_tester.bulk import PartialCreationError
+from scim2_tester.bulk import bulk_config
+from scim2_tester.bulk import bulk_create
+from scim2_tester.filling import fill_with_random_values
+from scim2_tester.filling import generate_random_values
+from scim2_tester.fixtures import FixturePool
+from scim2_tester.resource import creation_field_names
+from scim2_tester.resource import model_from_resource_type
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import SCIMTesterError
+from scim2_tester.utils import iter_in_threads
+from scim2_tester.utils import journal_created
+from scim2_tester.values import ValueGenerator
+
+SEED_BATCH_SIZE = 100
+"""The number of objects generated and created by each seeding task."""
+
+SEED_WORKERS = 8
+"""The number of seeding threads when :attr:`~scim2_tester.CheckConfig.max_workers` is not set."""
+
+SEED_REFERENCE_SAMPLE = 10000
+"""The number of seeded objects of each kind that references can target."""
+
+
+class SeedPool(FixturePool):
+    """A fixture pool whose references target random seeded objects.
+
+    Only the locations of the first :data:`SEED_REFERENCE_SAMPLE` seeded objects
+    of each kind are kept, so memory stays bounded whatever the seed size.
+    References to a kind that has not been seeded yet target a regular fixture.
+
+    :param value_generator: The generator choosing the targeted objects.
+    """
+
+    def __init__(self, value_generator: ValueGenerator):
+        super().__init__()
+        self.value_generator = value_generator
+        self.seeded: dict[type[Resource], list[Resource]] = {}
+
+    def add_seeded(self, objects: list[Resource]) -> None:
+        with self.lock:
+            for obj in objects:
+                samples = self.seeded.setdefault(obj.__class__, [])
+                if len(samples) < SEED_REFERENCE_SAMPLE and obj.meta:
+                    samples.append(
+                        obj.__class__(id=obj.id, meta=Meta(location=obj.meta.location))
+                    )
+
+    def get(self, model, create):
+        if samples := self.seeded.get(model):
+            return self.value_generator.choice(samples)
+
+        return super().get(model, create)
+
+
+@dataclass
+class SeedReport:
+    """The results of a seeding."""
+
+    duration: float = 0.0
+    """The wall-clock duration of the seeding, in seconds."""
+
+    created: dict[str, int] = field(default_factory=dict)
+    """The number of created objects, indexed by resource type id."""
+
+    errors: int = 0
+    """The number of batches that could not be created entirely.
+
+    The objects of those batches that were created are counted in :attr:`created`.
+    """
+
+    @property
+    def throughput(self) -> float:
+        """The number of objects created per second."""
+        return sum(self.created.values()) / self.duration if self.duration else 0.0
+
+
+def seeding_order(
+    conf: CheckConfig, resource_types: list[ResourceType]
+) -> list[tuple[str, ResourceType, type[Resource]]]:
+    """Order resource types so the resources they reference are seeded first.
+
+    Circular references cannot be ordered, the remaining resource types are seeded in their original order.
+
+    :return: The id, the resource type and the model of every resource type.
+    """
+    remaining = {}
+    for resource_type in resource_types:
+        if resource_type.id is None:
+            raise SCIMTesterError(
+                f"No id for the ResourceType {resource_type.name}", conf
+            )
+
+        model = model_from_resource_type(conf, resource_type)
+        if model is None:
+            raise SCIMTesterError(
+                f"No Schema matching the ResourceType {resource_type.id}", conf
+            )
+
+        references = generate_random_values(conf, model(), creation_field_names(model))
+        remaining[resource_type.id] = (
+            resource_type,
+            model,
+            {reference.model for reference in references} - {model},
+        )
+
+    ordered = []
+    while remaining:
+        pending_models = {model for _, model, _ in remaining.values()}
+        ready = [
+            resource_type_id
+            for resource_type_id, (_, _, referenced) in remaining.items()
+            if not referenced & pending_models
+        ] or list(remaining)
+        for resource_type_id in ready:
+            resource_type, model, _ = remaining.pop(resource_type_id)
+            ordered.append((resource_type_id, resource_type, model))
+
+    return ordered
+
+
+def batches(total: int, batch_size: int) -> Iterator[int]:
+    """Split `total` objects in batches of at most `batch_size` objects."""
+    for start in range(0, total, batch_size):
+        yield min(batch_size, total - start)
+
+
+def create_batch(conf: CheckConfig, model: type[Resource], size: int) -> list[Resource]:
+    """Generate `size` random objects and create them, with a bulk request if the server supports it.
+
+    :raises PartialCreationError: If some objects could not be created, with the objects that were created.
+    """
+    objects = [
+        fill_with_random_values(conf, model(), creation_field_names(model))[0]
+        for _ in range(size)
+    ]
+    if bulk_config(conf):
+        return bulk_create(conf, objects)
+
+    created: list[Resource] = []
+    for obj in objects:
+        try:
+            created_obj = conf.client.create(obj)
+        except SCIMClientError as exc:
+            raise PartialCreationError(str(exc), conf, created) from exc
+
+        journal_created(conf, [created_obj])
+        created.append(created_obj)
+    return created
+
+
+def run_seed(
+    conf: CheckConfig,
+    count: int = 0,
+    counts: dict[str, int] | None = None,
+    resource_types: list[ResourceType] | None = None,
+    batch_size: int = SEED_BATCH_SIZE,
+    pool: SeedPool | None = None,
+) -> SeedReport:
+    """Populate a server with large volumes of random resources.
+
+    Objects are generated with :func:`~scim2_tester.filling.fill_with_random_values`,
+    and created in batches by a pool of :attr:`~scim2_tester.CheckConfig.max_workers` threads,
+    with bulk requests if the server supports them.
+    Resource types are seeded one after the other, the referenced ones first,
+    so references target random seeded objects, for instance groups members target seeded users.
+    Every created object is recorded in the :attr:`~scim2_tester.CheckConfig.journal`,
+    so the seed can be deleted afterwards with :func:`~scim2_tester.cleanup.cleanup_journal`.
+
+    :param conf: The check configuration. The client resource types and models must have been discovered,
+        and :attr:`~scim2_tester.CheckConfig.journal` must be set.
+    :param count: The number of objects to create for every resource type.
+    :param counts: The number of objects to create by resource type id, e.g. ``{"User": 100000}``.
+        The resource types that are not listed get :paramref:`count` objects.
+    :param resource_types: The resource types to seed. Defaults to all the client resource types.
+    :param batch_size: The number of objects created by each task.
+    :param pool: The pool of the objects targeted by references.
+        Passing the pool of a previous seeding lets references target the objects it created.
+    """
+    if conf.journal is None:
+        raise ValueError("Seeding needs a journal to record the created resources")
+
+    resource_types = list(resource_types or conf.client.resource_types or [])
+    if not resource_types:
+        raise SCIMTesterError("No resource type to seed", conf)
+
+    if pool is None:
+        pool = SeedPool(conf.value_generator)
+    conf = dataclasses.replace(
+        conf, max_workers=conf.max_workers or SEED_WORKERS, fixture_pool=pool
+    )
+    report = SeedReport()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def seed_batch(conf: CheckConfig, task: tuple[str, type[Resource], int]):
+        resource_type_id, model, size = task
+        try:
+            created = create_batch(conf, model, size)
+        except (SCIMClientError, SCIMTesterError) as exc:
+            if conf.raise_exceptions:
+                raise
+
+            created = exc.created if isinstance(exc, PartialCreationError) else []
+            with lock:
+                report.errors += 1
+
+        pool.add_seeded(created)
+        with lock:
+            report.created[resource_type_id] += len(created)
+
+    for resource_type_id, _, model in seeding_order(conf, resource_types):
+        report.created[resource_type_id] = 0
+        total = (counts or {}).get(resource_type_id, count)
+        tasks = ((resource_type_id, model, size) for size in batches(total, batch_size))
+        for _ in iter_in_threads(conf, seed_batch, tasks):
+            pass
+
+    report.duration = time.perf_counter() - start
+    return report
@@ -1,22 +1,31 @@
 from scim2_models import ServiceProviderConfig
 
+from .registry import register
 from .utils import CheckConfig
 from .utils import CheckResult
 from .utils import Status
+from .utils import Steps
+from .utils import asynchronous
 from .utils import checker
 
 
+@register(produces="service_provider_config", tags=["discovery"])
 @checker
 def check_service_provider_config_endpoint(
     conf: CheckConfig,
-) -> CheckResult:
+) -> Steps[CheckResult]:
     """As described in RFC7644 §4 <rfc7644#section-4>`, `/ServiceProviderConfig` is a mandatory endpoint, and should only be accessible by GET.
 
     .. todo::
 
         Check thet POST/PUT/PATCH/DELETE methods on the endpoint
     """
-    response = conf.client.query(
+    response = yield conf.client.query(
         ServiceProviderConfig, expected_status_codes=conf.expected_status_codes or [200]
     )
     return CheckResult(conf, status=Status.SUCCESS, data=response)
+
+
+check_service_provider_config_endpoint_async = asynchronous(
+    check_service_provider_config_endpoint
+)
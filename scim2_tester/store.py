@@ -0,0 +1,111 @@
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Status
+
+
+@dataclass
+class StoredResult:
+    """A check result, as saved in a :class:`ResultStore`."""
+
+    title: str | None
+    """The title of the check."""
+
+    status: Status
+    """The status of the check."""
+
+    reason: str | None = None
+    """Why it failed, or how it succeed."""
+
+    duration: float | None = None
+    """The wall-clock duration of the check, in seconds."""
+
+    check: str | None = None
+    """The name of the registered check that produced the result.
+
+    Defaults to :attr:`title` for results saved without it.
+    """
+
+    def __post_init__(self):
+        if self.check is None:
+            self.check = self.title
+
+    @classmethod
+    def from_result(cls, result: CheckResult) -> "StoredResult":
+        return cls(
+            title=result.title,
+            status=result.status,
+            reason=result.reason,
+            duration=result.duration,
+            check=result.check,
+        )
+
+
+class ResultStore:
+    """A file saving the results of a run, so a later run can only check what failed.
+
+    Each result is a JSON line. The results of the checks that are run again
+    replace the results saved for these checks, and the other results are kept.
+    Results are identified by the registered check that produced them,
+    so the sub-check results of a check are replaced together.
+
+    :param path: The path of the results file. It is created if it does not exist.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+
+    def results(self) -> list[StoredResult]:
+        """Read the saved results."""
+        if not self.path.exists():
+            return []
+
+        results = []
+        with open(self.path) as fd:
+            for line in fd:
+                payload = json.loads(line)
+                results.append(
+                    StoredResult(**{**payload, "status": Status[payload["status"]]})
+                )
+        return results
+
+    def save(self, results: Iterable[CheckResult | StoredResult]) -> None:
+        """Save results, replacing the results previously saved for the same checks.
+
+        The file is replaced at once, so an interrupted save does not lose the previous results.
+        """
+        new = [
+            result
+            if isinstance(result, StoredResult)
+            else StoredResult.from_result(result)
+            for result in results
+        ]
+        names = {result.check for result in new}
+        kept = [result for result in self.results() if result.check not in names]
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as fd:
+            for result in [*kept, *new]:
+                fd.write(json.dumps({**asdict(result), "status": result.status.name}))
+                fd.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def failed_checks(self) -> list[str]:
+        """Return the names of the registered checks that failed or were skipped, in the order they were run.
+
+        A check run for several resource types is returned if it failed for one of them,
+        and a check is returned if one of its sub-checks failed.
+        Results that do not name their check cannot be run again, and are ignored.
+        """
+        return list(
+            dict.fromkeys(
+                result.check
+                for result in self.results()
+                if result.status != Status.SUCCESS and result.check is not None
+            )
+        )
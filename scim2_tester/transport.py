@@ -0,0 +1,116 @@
+import functools
+import ssl
+from dataclasses import dataclass
+
+import httpx
+
+
+@functools.cache
+def ssl_context() -> ssl.SSLContext:
+    """Return the TLS configuration shared by all the clients of the process.
+
+    Loading the certificate authorities takes tens of milliseconds,
+    so they are loaded once instead of once per client.
+    """
+    return httpx.create_ssl_context()
+
+
+def require_http2() -> None:
+    """Check that the HTTP/2 dependencies are installed.
+
+    :raises ImportError: If they are not.
+    """
+    try:
+        import h2  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "HTTP/2 needs the 'http2' extra: pip install scim2-tester[http2]"
+        ) from exc
+
+
+@dataclass
+class TransportOptions:
+    """How the HTTP clients connect to the servers.
+
+    The same options build synchronous and asynchronous clients.
+    Threads checking a server concurrently, see :attr:`~scim2_tester.CheckConfig.max_workers`,
+    share the connection pool of the client, so the pool should allow that many connections.
+    """
+
+    max_connections: int | None = 100
+    """The maximum number of connections to the server. If :data:`None`, there is no limit."""
+
+    max_keepalive_connections: int | None = None
+    """The maximum number of idle connections kept open.
+
+    If :data:`None`, this is the number of concurrent checks, and at least 20,
+    so concurrent checks reuse their connections instead of negotiating new TCP and TLS sessions.
+    """
+
+    keepalive_expiry: float | None = 5.0
+    """The number of seconds idle connections are kept open. ``0`` disables keep-alive."""
+
+    http2: bool = False
+    """Whether to use HTTP/2 when the server supports it.
+
+    Concurrent requests are multiplexed over a single connection.
+    This needs the ``http2`` extra: ``pip install scim2-tester[http2]``.
+    """
+
+    connect_timeout: float | None = 5.0
+    """The maximum number of seconds to establish a connection."""
+
+    read_timeout: float | None = 5.0
+    """The maximum number of seconds to wait for a response, or for a connection of the pool."""
+
+    def limits(self, concurrency: int = 1) -> httpx.Limits:
+        """Return the connection pool limits for a number of concurrent checks."""
+        keepalive = self.max_keepalive_connections
+        if keepalive is None:
+            keepalive = max(concurrency, 20)
+            if self.max_connections is not None:
+                keepalive = min(keepalive, self.max_connections)
+
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    def client_kwargs(self, base_url: str, token: str | None, concurrency: int) -> dict:
+        if self.http2:
+            require_http2()
+
+        return {
+            "base_url": base_url,
+            "headers": {"Authorization": f"Bearer {token}"} if token else None,
+            "limits": self.limits(concurrency),
+            "timeout": self.timeout(),
+            "http2": self.http2,
+            "verify": ssl_context(),
+        }
+
+    def client(
+        self, base_url: str, token: str | None = None, concurrency: int = 1
+    ) -> httpx.Client:
+        """Build a client for a server.
+
+        :param base_url: The base URL of the server.
+        :param token: If set, the bearer token used to authenticate the requests.
+        :param concurrency: The number of checks performing requests at the same time,
+            for instance :attr:`~scim2_tester.CheckConfig.max_workers`.
+        """
+        return httpx.Client(**self.client_kwargs(base_url, token, concurrency))
+
+    def async_client(
+        self, base_url: str, token: str | None = None, concurrency: int = 1
+    ) -> httpx.AsyncClient:
+        """Like :meth:`client`, but build an asynchronous client.
+
+        :param concurrency: The number of checks performing requests at the same time,
+            for instance the ``max_concurrency`` of :func:`~scim2_tester.check_server_async`.
+        """
+        return httpx.AsyncClient(**self.client_kwargs(base_url, token, concurrency))
@@ -1,16 +1,62 @@
+import abc
+import asyncio
+import contextvars
+import copy
+import dataclasses
 import functools
+import inspect
+import threading
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from dataclasses import field
 from enum import Enum
 from enum import auto
 from typing import Any
+from typing import Protocol
+from typing import TypeVar
+from typing import cast
 
 from scim2_client import SCIMClient
 from scim2_client import SCIMClientError
+from scim2_models import Resource
+
+from scim2_tester.fixtures import FixturePool
+from scim2_tester.journal import Journal
+from scim2_tester.metrics import Metrics
+from scim2_tester.metrics import instrument_client
+from scim2_tester.metrics import measure
+from scim2_tester.values import ValueGenerator
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 class Status(Enum):
     SUCCESS = auto()
     ERROR = auto()
+    SKIPPED = auto()
+
+
+class Retention(Enum):
+    """What :class:`~scim2_tester.CheckResult` objects keep once they are returned."""
+
+    ALL = auto()
+    """Keep everything."""
+
+    FAILURES = auto()
+    """Keep the :attr:`~scim2_tester.CheckResult.data` of the failed checks only."""
+
+    SUMMARY = auto()
+    """Drop the :attr:`~scim2_tester.CheckResult.data` and :attr:`~scim2_tester.CheckResult.description` of all the checks."""
 
 
 @dataclass
@@ -26,6 +72,63 @@ class CheckConfig:
     expected_status_codes: list[int] | None = None
     """The expected response status codes."""
 
+    max_workers: int | None = None
+    """The number of threads used to check independent resource types concurrently.
+
+    If :data:`None`, resource types are checked sequentially.
+    Each thread performs its requests with its own copy of :attr:`client`.
+    """
+
+    journal: Journal | None = None
+    """If set, every resource created and deleted by the checks is recorded in this journal.
+
+    Resources left over by interrupted runs can be deleted with :func:`~scim2_tester.cleanup.cleanup_journal`.
+    """
+
+    fixture_pool: FixturePool | None = None
+    """If set, the resources targeted by references are created once and shared between checks.
+
+    If :data:`None`, they are created for every object that needs them, and deleted after each resource type check.
+    """
+
+    page_size: int = 50
+    """The number of objects requested per page when walking through list responses."""
+
+    max_walk_pages: int | None = 20
+    """The maximum number of pages requested by :func:`~scim2_tester.pagination.check_pagination`.
+
+    Walking through all the objects of large servers takes long,
+    and the walk is attempted again when objects are created or deleted concurrently.
+    If :data:`None`, all the pages are walked through.
+    """
+
+    retention: Retention = Retention.ALL
+    """What the returned results keep, to bound the memory used by large servers and long runs."""
+
+    lazy_payloads: bool = False
+    """Whether list responses are stored as raw payloads, and validated only when the result data is accessed.
+
+    This saves the validation cost of the payloads nobody reads.
+    """
+
+    value_generator: ValueGenerator = field(default_factory=ValueGenerator)
+    """The generator of the random values of the created objects.
+
+    Its :attr:`~scim2_tester.values.ValueGenerator.seed` reproduces the values of a run.
+    """
+
+    include_checks: list[str] | None = None
+    """The names or tags of the checks to run, see :data:`~scim2_tester.registry.checks`.
+
+    The checks they require are run too. If :data:`None`, all the checks are run.
+    """
+
+    exclude_checks: list[str] | None = None
+    """The names or tags of the checks not to run.
+
+    The checks requiring them are skipped.
+    """
+
 
 class SCIMTesterError(Exception):
     """Exception raised when a check failed and the `raise_exceptions` config parameter is :data:`True`."""
@@ -39,6 +142,36 @@ class SCIMTesterError(Exception):
         return self.message
 
 
+@dataclass
+class RawPayload:
+    """A response payload that is parsed only when :attr:`CheckResult.data` is accessed."""
+
+    payload: Any
+    """The response payload, as returned by the server."""
+
+    parse: Callable[[Any], Any]
+    """The function that parses the payload."""
+
+
+class LazyData:
+    """Descriptor parsing :class:`RawPayload` values on first access."""
+
+    def __set_name__(self, owner, name):
+        self.name = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return None
+
+        value = obj.__dict__.get(self.name)
+        if isinstance(value, RawPayload):
+            value = obj.__dict__[self.name] = value.parse(value.payload)
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+
 @dataclass
 class CheckResult:
     """Store a check result."""
@@ -55,41 +188,430 @@ class CheckResult:
     reason: str | None = None
     """Why it failed, or how it succeed."""
 
-    data: Any | None = None
+    data: Any | None = LazyData()
     """Any related data that can help to debug."""
 
+    duration: float | None = None
+    """The wall-clock duration of the check, in seconds."""
+
+    check: str | None = None
+    """The name of the registered check that produced the result, see :data:`~scim2_tester.registry.checks`.
+
+    Checks performing several sub-checks, like :func:`~scim2_tester.schemas.check_schemas_endpoint`,
+    produce results titled after their sub-checks.
+    """
+
+    resource_type: str | None = None
+    """The id of the resource type the check was performed for, if any."""
+
+    metrics: Metrics = field(default_factory=Metrics)
+    """The HTTP requests performed by the check.
+
+    This includes the requests performed to create and delete temporary objects,
+    for instance the objects targeted by references.
+    """
+
     def __post_init__(self):
         if self.conf.raise_exceptions and self.status == Status.ERROR:
             raise SCIMTesterError(self.reason, self)
 
+    def retain(self) -> "CheckResult":
+        """Drop what the configuration :attr:`~scim2_tester.CheckConfig.retention` does not keep."""
+        if self.conf.retention == Retention.SUMMARY or (
+            self.conf.retention == Retention.FAILURES and self.status == Status.SUCCESS
+        ):
+            self.data = None
+
+        if self.conf.retention == Retention.SUMMARY:
+            self.description = None
+
+        return self
+
+
+class Step(abc.ABC):
+    """A step of :data:`Steps` performed differently with synchronous and asynchronous clients.
+
+    For instance :class:`Concurrently` performs steps in threads or in asynchronous tasks.
+    """
+
+    @abc.abstractmethod
+    def run(self) -> Any:
+        """Perform the step with a synchronous client, and return its value."""
+
+    @abc.abstractmethod
+    async def run_async(self, semaphore: asyncio.Semaphore | None = None) -> Any:
+        """Perform the step with an asynchronous client, and return its value."""
+
+
+Steps = Generator[Any, Any, T]
+"""The body of a check, written once for synchronous and asynchronous clients.
+
+It is a generator yielding the values returned by the client methods,
+and it is sent back the outcome of those values::
+
+    response = yield conf.client.query(User, user_id)
+
+With a synchronous client the value is the response itself, and is sent back as is.
+With an asynchronous client the value is an awaitable, and it is awaited before being sent back.
+Exceptions are raised at the ``yield`` in both cases.
+Steps can also yield a :class:`Step`, and delegate to other steps with ``yield from``.
+The steps are performed by :func:`run_steps` and :func:`run_steps_async`.
+"""
+
+
+class StepsFunction(Protocol[T]):
+    """A function decorated with :func:`steps`."""
+
+    __name__: str
+    __qualname__: str
+
+    steps: Callable[..., Steps[T]]
+    """The undecorated :data:`Steps` function."""
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T: ...
+
+
+def run_steps(steps: Steps[T]) -> T:
+    """Perform steps with a synchronous client, and return their value.
+
+    Values that are not generators are returned as is.
+    """
+    if not isinstance(steps, Generator):
+        return steps
+
+    send, value = steps.send, None
+    while True:
+        try:
+            step = send(value)
+        except StopIteration as stop:
+            return stop.value
+
+        send = steps.send
+        if not isinstance(step, Step):
+            value = step
+            continue
+
+        try:
+            value = step.run()
+        except BaseException as exc:
+            value, send = exc, steps.throw
+
+
+async def run_steps_async(
+    steps: Steps[T] | Awaitable[T], semaphore: asyncio.Semaphore | None = None
+) -> T:
+    """Perform steps with an asynchronous client, and return their value.
+
+    Awaitables are awaited, and other values that are not generators are returned as is.
+
+    :param semaphore: If set, the number of requests performed at the same time is limited by this semaphore.
+    """
+    if isinstance(steps, Awaitable):
+        return await bounded(semaphore, steps)
+
+    if not isinstance(steps, Generator):
+        return steps
+
+    send, value = steps.send, None
+    while True:
+        try:
+            step = send(value)
+        except StopIteration as stop:
+            return stop.value
+
+        send = steps.send
+        try:
+            if isinstance(step, Step):
+                value = await step.run_async(semaphore)
+            elif inspect.isawaitable(step):
+                value = await bounded(semaphore, step)
+            else:
+                value = step
+        # Cancellations are raised in the steps too, so they can clean up.
+        except BaseException as exc:
+            value, send = exc, steps.throw
+
+
+def steps(func: Callable[..., Steps[T]]) -> StepsFunction[T]:
+    """Decorate a :data:`Steps` function, so calling it performs its steps with a synchronous client.
+
+    The undecorated function is available as the ``steps`` attribute of the decorated function,
+    so other steps can delegate to it with ``yield from``,
+    and :func:`asynchronous` makes the version for asynchronous clients.
+    """
+
+    @functools.wraps(func)
+    def wrapped(*args, **kwargs):
+        return run_steps(func(*args, **kwargs))
+
+    steps_function = cast(StepsFunction[T], wrapped)
+    steps_function.steps = func
+    return steps_function
+
+
+def asynchronous(func: StepsFunction[T]) -> Callable[..., Awaitable[T]]:
+    """Return the version of a function decorated with :func:`steps` or :func:`checker` for asynchronous clients."""
+
+    @functools.wraps(func)
+    async def wrapped(*args, **kwargs):
+        return await run_steps_async(func.steps(*args, **kwargs))
+
+    wrapped.__name__ = f"{func.__name__}_async"
+    wrapped.__qualname__ = f"{func.__qualname__}_async"
+    return wrapped
+
+
+@dataclass
+class Concurrently(Step):
+    """A step performing several steps concurrently, and returning their values in order.
+
+    With a synchronous client, the steps are performed in :attr:`max_workers` threads
+    with :func:`map_in_threads`, or one after the other if it is :data:`None`.
+    With an asynchronous client, they are performed in concurrent tasks.
+    """
+
+    conf: CheckConfig
+
+    calls: Sequence[Callable[[CheckConfig], Steps]]
+    """The functions returning the steps, passed the configuration to use."""
+
+    max_workers: int | None = None
+
+    def run(self) -> list:
+        if not self.max_workers or len(self.calls) < 2:
+            return [run_steps(call(self.conf)) for call in self.calls]
+
+        conf = dataclasses.replace(self.conf, max_workers=self.max_workers)
+        return map_in_threads(
+            conf, lambda conf, call: run_steps(call(conf)), self.calls
+        )
+
+    async def run_async(self, semaphore: asyncio.Semaphore | None = None) -> list:
+        return await asyncio.gather(
+            *(run_steps_async(call(self.conf), semaphore) for call in self.calls)
+        )
+
 
 def checker(func):
     """Decorate checker methods.
 
     - It adds a title and a description to the returned result, extracted from the method name and its docstring.
     - It catches SCIMClient errors.
+    - It measures the check duration and the HTTP requests performed.
+    - It accepts :data:`Steps` functions, decorated with :func:`steps`,
+      so the same check can be performed with synchronous and asynchronous clients.
+    - It accepts coroutine functions, for checks written for asynchronous clients only.
+      The ``_async`` suffix of their names is not part of the title.
     """
 
+    def client_error_result(conf: CheckConfig, exc: SCIMClientError) -> CheckResult:
+        if conf.raise_exceptions:
+            raise exc
+
+        reason = f"{exc} {exc.__cause__}" if exc.__cause__ else str(exc)
+        return CheckResult(conf, status=Status.ERROR, reason=reason, data=exc.source)
+
+    title = func.__name__.removesuffix("_async")
+
+    def decorate(result, metrics: Metrics, duration: float):
+        first_result = result if isinstance(result, CheckResult) else result[0]
+        first_result.title = title
+        first_result.description = func.__doc__
+        first_result.duration = duration
+        first_result.metrics = metrics
+        return result
+
+    if inspect.isgeneratorfunction(func):
+
+        @functools.wraps(func)
+        def wrapped_steps(conf: CheckConfig, *args, **kwargs):
+            instrument_client(conf.client)
+            start = time.perf_counter()
+            with measure() as metrics:
+                try:
+                    result = yield from func(conf, *args, **kwargs)
+                except SCIMClientError as exc:
+                    result = client_error_result(conf, exc)
+            return decorate(result, metrics, time.perf_counter() - start)
+
+        return steps(wrapped_steps)
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrapped_async(conf: CheckConfig, *args, **kwargs):
+            instrument_client(conf.client)
+            start = time.perf_counter()
+            with measure() as metrics:
+                try:
+                    result = await func(conf, *args, **kwargs)
+                except SCIMClientError as exc:
+                    result = client_error_result(conf, exc)
+            return decorate(result, metrics, time.perf_counter() - start)
+
+        return wrapped_async
+
     @functools.wraps(func)
     def wrapped(conf: CheckConfig, *args, **kwargs):
-        try:
-            result = func(conf, *args, **kwargs)
-        except SCIMClientError as exc:
-            if conf.raise_exceptions:
-                raise
-
-            reason = f"{exc} {exc.__cause__}" if exc.__cause__ else str(exc)
-            result = CheckResult(
-                conf, status=Status.ERROR, reason=reason, data=exc.source
-            )
-
-        # decorate results
-        if isinstance(result, CheckResult):
-            result.title = func.__name__
-            result.description = func.__doc__
-        else:
-            result[0].title = func.__name__
-            result[0].description = func.__doc__
-        return result
+        instrument_client(conf.client)
+        start = time.perf_counter()
+        with measure() as metrics:
+            try:
+                result = func(conf, *args, **kwargs)
+            except SCIMClientError as exc:
+                result = client_error_result(conf, exc)
+        return decorate(result, metrics, time.perf_counter() - start)
 
     return wrapped
+
+
+def journal_created(conf: CheckConfig, objects: Iterable[Resource]) -> None:
+    """Record the creation of resources in the configuration journal, if any."""
+    if conf.journal is not None:
+        conf.journal.created(objects)
+
+
+def journal_deleted(conf: CheckConfig, objects: Iterable[Resource]) -> None:
+    """Record the deletion of resources in the configuration journal, if any."""
+    if conf.journal is not None:
+        conf.journal.deleted(objects)
+
+
+def attribute_name(model: type[Resource], field_name: str) -> str:
+    """Return the SCIM name of a model field, like ``displayName`` for ``display_name``."""
+    return model.model_fields[field_name].serialization_alias or field_name
+
+
+def clone_config(conf: CheckConfig) -> CheckConfig:
+    """Copy a configuration, with its own copy of the SCIM client."""
+    return dataclasses.replace(conf, client=copy.copy(conf.client))
+
+
+def iter_in_threads(
+    conf: CheckConfig, func: Callable[[CheckConfig, T], R], items: Iterable[T]
+) -> Iterator[R]:
+    """Call ``func(conf, item)`` for every item in a pool of :attr:`~CheckConfig.max_workers` threads.
+
+    Each thread gets its own copy of the configuration and of the SCIM client,
+    so the client state is never shared between threads.
+    The underlying HTTP client is shared though, so its connection pool can be reused.
+    The requests performed in the threads are counted by the current :func:`~scim2_tester.metrics.measure`.
+    The results are yielded in the order of the items, as soon as they are available.
+    If the iteration is stopped early, the calls that have not started yet are cancelled.
+    """
+    local = threading.local()
+
+    def call(item: T) -> R:
+        if not hasattr(local, "conf"):
+            local.conf = clone_config(conf)
+        return func(local.conf, item)
+
+    # Context variables, like the current measurement, are propagated to the threads.
+    executor = ThreadPoolExecutor(max_workers=conf.max_workers)
+    try:
+        futures = [
+            executor.submit(contextvars.copy_context().run, call, item)
+            for item in items
+        ]
+        for future in futures:
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def map_in_threads(
+    conf: CheckConfig, func: Callable[[CheckConfig, T], R], items: Iterable[T]
+) -> list[R]:
+    """Like :func:`iter_in_threads`, but return all the results at once."""
+    return list(iter_in_threads(conf, func, items))
+
+
+def record_cleanup_error(result: CheckResult | None, exc: Exception) -> None:
+    """Record in the last result of checks that their temporary objects could not be deleted.
+
+    The exception is raised instead if there is no result,
+    or if the configuration :attr:`~CheckConfig.raise_exceptions` is set.
+    """
+    if result is None or result.conf.raise_exceptions:
+        raise exc
+
+    reason = f"Could not delete the temporary objects: {exc}"
+    result.status = Status.ERROR
+    result.reason = f"{result.reason}\n{reason}" if result.reason else reason
+
+
+def hold_last_result(
+    results: Iterator[CheckResult], cleanup: Callable[[], None]
+) -> Iterator[CheckResult]:
+    """Yield results, except the last one that is yielded after calling `cleanup`.
+
+    The requests performed by `cleanup` are added to the last result metrics,
+    and its errors are recorded with :func:`record_cleanup_error`.
+    `cleanup` is also called if the iteration raises an exception or is stopped early.
+    """
+    last = None
+    try:
+        for result in results:
+            if last is not None:
+                yield last
+            last = result
+
+    finally:
+        if hasattr(results, "close"):
+            results.close()
+        with measure() as cleanup_metrics:
+            try:
+                cleanup()
+            except Exception as exc:
+                record_cleanup_error(last, exc)
+        if last is not None:
+            last.metrics.add(cleanup_metrics)
+
+    if last is not None:
+        yield last
+
+
+async def hold_last_result_async(
+    results: AsyncIterator[CheckResult], cleanup: Callable[[], Awaitable[None]]
+) -> AsyncGenerator[CheckResult, None]:
+    """Asynchronous version of :func:`hold_last_result`."""
+    last = None
+    try:
+        async for result in results:
+            if last is not None:
+                yield last
+            last = result
+
+    finally:
+        if hasattr(results, "aclose"):
+            await results.aclose()
+        with measure() as cleanup_metrics:
+            try:
+                await cleanup()
+            except Exception as exc:
+                record_cleanup_error(last, exc)
+        if last is not None:
+            last.metrics.add(cleanup_metrics)
+
+    if last is not None:
+        yield last
+
+
+async def bounded(semaphore: asyncio.Semaphore | None, awaitable: Awaitable) -> Any:
+    """Await an object, with a limited concurrency if a semaphore is passed."""
+    if semaphore is None:
+        return await awaitable
+
+    try:
+        await semaphore.acquire()
+    except BaseException:
+        # Coroutines cancelled while waiting will never run, they are closed
+        # so they do not warn that they were never awaited.
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+
+    try:
+        return await awaitable
+    finally:
+        semaphore.release()
@@ -0,0 +1,66 @@
+import itertools
+import random
+import threading
+import uuid
+from collections.abc import Sequence
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class ValueGenerator:
+    """Generate the random values of the checks, reproducibly.
+
+    Values come from a :class:`random.Random` generator seeded with :attr:`seed`,
+    so a run can be replayed with the values that made a server fail.
+    Every thread draws from its own generator, derived from :attr:`seed` and the order in which threads start drawing,
+    so runs are reproducible as long as the values are generated by the same threads in the same order,
+    which is always the case for sequential runs.
+
+    Unlike :func:`uuid.uuid4`, which reads from :func:`os.urandom` for every value,
+    generating values needs no system call.
+    :meth:`uuid` values embed a counter shared by all the threads,
+    so they are unique for a generator even when generated concurrently.
+
+    :param seed: The seed of the generator. A random seed is drawn if :data:`None`.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self.seed: int = random.SystemRandom().getrandbits(32) if seed is None else seed
+        """The seed of the generator, to pass to a new generator to reproduce a run."""
+
+        self._counter = itertools.count()
+        self._streams = itertools.count()
+        self._local = threading.local()
+
+    @property
+    def random(self) -> random.Random:
+        """The :class:`random.Random` generator of the current thread."""
+        generator = getattr(self._local, "random", None)
+        if generator is None:
+            # itertools.count is atomic, so every thread gets a different stream.
+            generator = self._local.random = random.Random(
+                f"{self.seed}-{next(self._streams)}"
+            )
+        return generator
+
+    def uuid(self) -> uuid.UUID:
+        """Return a version 4 UUID, unique for this generator.
+
+        The 96 first bits are random and the 32 last bits are a counter,
+        so values sort randomly but never repeat.
+        """
+        bits = self.random.getrandbits(96) << 32 | next(self._counter) & 0xFFFFFFFF
+        return uuid.UUID(int=bits, version=4)
+
+    def string(self) -> str:
+        """Return a unique string, formatted like a UUID."""
+        return str(self.uuid())
+
+    def digits(self, length: int) -> str:
+        """Return a string of `length` random digits."""
+        return "".join(self.random.choices("0123456789", k=length))
+
+    def choice(self, sequence: Sequence[T]) -> T:
+        """Return a random element of `sequence`."""
+        return self.random.choice(sequence)
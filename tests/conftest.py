@@ -1,8 +1,15 @@
+import threading
+
 import pytest
 from httpx import Client
 from scim2_client.engines.httpx import SyncSCIMClient
 from scim2_models import Group
 from scim2_models import User
+from scim2_server.backend import InMemoryBackend
+from scim2_server.provider import SCIMProvider
+from scim2_server.utils import load_default_resource_types
+from scim2_server.utils import load_default_schemas
+from werkzeug.serving import make_server
 
 from scim2_tester.utils import CheckConfig
 
@@ -18,3 +25,28 @@ def scim_client(httpserver):
 @pytest.fixture
 def check_config(scim_client):
     return CheckConfig(scim_client)
+
+
+@pytest.fixture
+def scim2_server():
+    backend = InMemoryBackend()
+    app = SCIMProvider(backend)
+
+    for schema in load_default_schemas().values():
+        app.register_schema(schema)
+
+    for resource_type in load_default_resource_types().values():
+        app.register_resource_type(resource_type)
+
+    return app
+
+
+@pytest.fixture
+def scim2_server_url(scim2_server):
+    """Serve the SCIM server over HTTP, for clients that cannot call WSGI applications."""
+    server = make_server("localhost", 0, scim2_server, threaded=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+    thread.join()
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from httpx import AsyncClient
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_client.engines.werkzeug import TestSCIMClient
+from scim2_models import Bulk
+from scim2_models import BulkOperation
+from scim2_models import BulkRequest
+from scim2_models import BulkResponse
+from scim2_models import Group
+from scim2_models import User
+from werkzeug.serving import make_server
+from werkzeug.test import Client
+from werkzeug.wrappers import Request
+from werkzeug.wrappers import Response
+
+from scim2_tester import Status
+from scim2_tester import check_server
+from scim2_tester import check_server_async
+from scim2_tester.bulk import bulk_create
+from scim2_tester.bulk import split_operations
+from scim2_tester.checker import check_bulk_endpoint
+from scim2_tester.cleanup import cleanup_journal
+from scim2_tester.filling import fill_with_random_values
+from scim2_tester.journal import Journal
+from scim2_tester.resource import creation_field_names
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import SCIMTesterError
+
+
+class BulkMiddleware:
+    """Add RFC7644 §3.7 bulk operations support to a SCIM server."""
+
+    def __init__(self, app, max_operations=2, max_payload_size=1048576):
+        self.app = app
+        self.fail = False
+        self.fail_once = set()
+        self.omit_location = False
+        self.client = Client(app)
+        self.max_operations = max_operations
+        self.max_payload_size = max_payload_size
+        self.bulk_requests = []
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        if request.path == "/Bulk":
+            response = self.bulk(request)
+
+        elif request.path == "/ServiceProviderConfig":
+            response = self.client.get(request.path)
+            payload = response.get_json()
+            payload["bulk"] = Bulk(
+                supported=True,
+                max_operations=self.max_operations,
+                max_payload_size=self.max_payload_size,
+            ).model_dump()
+            response.set_data(json.dumps(payload))
+
+        else:
+            return self.app(environ, start_response)
+
+        return response(environ, start_response)
+
+    def bulk(self, request):
+        bulk_request = BulkRequest.model_validate(request.get_json(force=True))
+        self.bulk_requests.append(bulk_request)
+        assert len(bulk_request.operations) <= self.max_operations
+
+        operations = []
+        for operation in bulk_request.operations:
+            if self.fail or operation.method.value in self.fail_once:
+                self.fail_once.discard(operation.method.value)
+                operations.append(
+                    BulkOperation(
+                        method=operation.method, bulk_id=operation.bulk_id, status=409
+                    )
+                )
+                continue
+
+            response = self.client.open(
+                operation.path,
+                method=operation.method.value,
+                json=operation.data,
+                content_type="application/scim+json",
+            )
+            operations.append(
+                BulkOperation(
+                    method=operation.method,
+                    bulk_id=operation.bulk_id,
+                    location=response.headers.get("Location")
+                    or (response.get_json() or {}).get("meta", {}).get("location")
+                    if response.status_code == 201 and not self.omit_location
+                    else None,
+                    status=response.status_code,
+                )
+            )
+
+        return Response(
+            json.dumps(BulkResponse(operations=operations).model_dump()),
+            content_type="application/scim+json",
+        )
+
+
+@pytest.fixture
+def bulk_server(scim2_server):
+    return BulkMiddleware(scim2_server)
+
+
+@pytest.fixture
+def bulk_client(bulk_server):
+    client = TestSCIMClient(Client(bulk_server))
+    client.discover()
+    return client
+
+
+def test_split_operations():
+    """Test that bulk requests respect the server limits."""
+    operations = [{"method": "DELETE", "path": f"/Users/{i}"} for i in range(5)]
+    batches = list(split_operations(Bulk(supported=True, max_operations=2), operations))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    operation_size = len(json.dumps(operations[0]))
+    bulk = Bulk(supported=True, max_operations=10, max_payload_size=250)
+    batches = list(split_operations(bulk, operations))
+    assert sum(len(batch) for batch in batches) == 5
+    assert all(
+        len(json.dumps(BulkRequest(operations=[]).model_dump()))
+        + len(batch) * (operation_size + 1)
+        <= 250
+        for batch in batches
+    )
+
+
+def test_bulk_create(bulk_server, bulk_client):
+    """Test that objects are created in batches of at most maxOperations."""
+    conf = CheckConfig(bulk_client)
+    users = [User(user_name=f"user{i}") for i in range(3)]
+    created = bulk_create(conf, users)
+
+    assert [len(request.operations) for request in bulk_server.bulk_requests] == [2, 1]
+    assert all(user.id for user in created)
+    assert all(user.meta.location for user in created)
+
+
+def test_bulk_create_without_location(bulk_server, bulk_client):
+    """Test that successful operations without location nor response are reported."""
+    bulk_server.omit_location = True
+    conf = CheckConfig(bulk_client)
+    with pytest.raises(
+        SCIMTesterError, match="neither the created object nor its location"
+    ):
+        bulk_create(conf, [User(user_name="bjensen")])
+
+
+def test_references_created_in_bulk(bulk_server, bulk_client):
+    """Test that the objects targeted by references are created with bulk requests."""
+    conf = CheckConfig(bulk_client)
+    group, garbages = fill_with_random_values(
+        conf, Group(), creation_field_names(Group)
+    )
+
+    assert len(bulk_server.bulk_requests) == 1
+    assert [garbage.__class__.__name__ for garbage in garbages] == [
+        "User[EnterpriseUser]"
+    ]
+    assert group.members[0].ref == garbages[0].meta.location
+
+
+def test_check_bulk_endpoint(bulk_client):
+    result = check_bulk_endpoint(CheckConfig(bulk_client), User)
+    assert result.status == Status.SUCCESS
+
+
+def test_check_bulk_endpoint_error(bulk_server, bulk_client):
+    """Test that failed bulk operations are reported."""
+    bulk_server.fail = True
+    result = check_bulk_endpoint(CheckConfig(bulk_client), User)
+    assert result.status == Status.ERROR
+
+
+def test_check_bulk_endpoint_deletion_error(bulk_server, bulk_client):
+    """Test that the created object is deleted if its bulk deletion fails."""
+    bulk_server.fail_once = {"DELETE"}
+    result = check_bulk_endpoint(CheckConfig(bulk_client), User)
+    assert result.status == Status.ERROR
+    assert Client(bulk_server).get("/Users").get_json()["totalResults"] == 0
+
+
+def test_references_bulk_creation_error(bulk_server, bulk_client):
+    """Test that failing to create the referenced objects is reported as a check error."""
+    bulk_server.fail = True
+    results = check_server(bulk_client, share_fixtures=False)
+    creations = [
+        result for result in results if result.title == "check_object_creation"
+    ]
+    assert Status.ERROR in [result.status for result in creations]
+    assert "Could not create the objects referenced" in creations[-1].reason
+
+
+def test_bulk_scim2_server(bulk_server, bulk_client):
+    """Test that lifecycles use bulk requests for references and cleanup."""
+    results = check_server(bulk_client, raise_exceptions=True)
+    assert "check_bulk_endpoint" in [result.title for result in results]
+    assert all(result.status == Status.SUCCESS for result in results)
+
+    creations = [
+        request
+        for request in bulk_server.bulk_requests
+        if request.operations[0].method == BulkOperation.Method.post
+    ]
+    deletions = [
+        request
+        for request in bulk_server.bulk_requests
+        if request.operations[0].method == BulkOperation.Method.delete
+    ]
+    assert creations
+    assert deletions
+
+
+def test_bulk_scim2_server_async(bulk_server):
+    server = make_server("localhost", 0, bulk_server, threaded=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    async def run():
+        async with AsyncClient(
+            base_url=f"http://localhost:{server.server_port}"
+        ) as http_client:
+            client = AsyncSCIMClient(http_client)
+            return await check_server_async(client, raise_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        server.shutdown()
+        thread.join()
+
+    assert "check_bulk_endpoint" in [result.title for result in results]
+    assert all(result.status == Status.SUCCESS for result in results)
+    assert bulk_server.bulk_requests
+
+
+def test_bulk_journal_cleanup(bulk_server, bulk_client, tmp_path):
+    """Test that journal leftovers are deleted with bulk requests."""
+    journal = Journal(tmp_path / "journal.jsonl")
+    conf = CheckConfig(bulk_client, journal=journal)
+    user_model = bulk_client.get_resource_model("User")
+    created = bulk_create(conf, [user_model(user_name=f"user{i}") for i in range(3)])
+    assert len(journal.leftovers()) == 3
+
+    bulk_client.delete(user_model, created[0].id)
+    assert cleanup_journal(conf, journal).remaining == []
+    assert journal.leftovers() == []
+    assert bulk_server.bulk_requests[-1].operations[0].method == "DELETE"
@@ -0,0 +1,86 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import scim2_tester
+from scim2_tester import checker
+from scim2_tester.cli import main
+
+IMPORT_TIME_BUDGET = 0.2
+"""The maximum duration of the package and command line imports, in seconds."""
+
+HEAVY_MODULES = ["httpx", "pydantic", "scim2_client", "scim2_models"]
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import scim2_tester
+import scim2_tester.cli
+duration = time.perf_counter() - start
+print(json.dumps({{
+    "duration": duration,
+    "imported": [module for module in {HEAVY_MODULES!r} if module in sys.modules],
+}}))
+"""
+
+
+def test_import_time_budget():
+    """Test that importing the package and the command line does not load the dependencies."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    report = json.loads(output)
+    assert report["imported"] == []
+    assert report["duration"] < IMPORT_TIME_BUDGET
+
+
+def test_lazy_attributes():
+    assert scim2_tester.check_server is checker.check_server
+    assert "CheckConfig" in dir(scim2_tester)
+    with pytest.raises(AttributeError):
+        scim2_tester.unknown_attribute  # noqa: B018
+
+
+def test_help(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--help"])
+    assert exc_info.value.code == 0
+    assert "--fail-fast" in capsys.readouterr().out
+
+
+def test_check_server(scim2_server_url, capsys):
+    main([scim2_server_url, "--retention", "summary"])
+    output = capsys.readouterr().out
+    assert "SUCCESS check_object_creation" in output
+    assert "ERROR" not in output
+
+
+@pytest.mark.parametrize(
+    "arguments,message",
+    [
+        (["--seed-resources", "many"], "'many' is not a positive integer"),
+        (["--seed-count", "User=many"], "'many' is not a positive integer"),
+        (["--seed-count", "User"], "'User' is not RESOURCE_TYPE=COUNT"),
+        (["--filter-probe", "10,0"], "'0' is not a positive integer"),
+        (["--max-workers", "0"], "'0' is not a positive integer"),
+        (["--load-workers", "-1"], "'-1' is not a positive integer"),
+        (["--load-iterations", "0"], "'0' is not a positive integer"),
+        (["--fleet-processes", "0"], "'0' is not a positive integer"),
+        (["--max-connections", "0"], "'0' is not a positive integer"),
+        (["--max-keepalive-connections", "-2"], "'-2' is not a positive integer"),
+        (["--load-duration", "0"], "'0' is not a positive number"),
+        (["--load-rate", "-1.5"], "'-1.5' is not a positive number"),
+        (["--tenant-timeout", "nan"], "'nan' is not a positive number"),
+    ],
+)
+def test_invalid_numbers(arguments, message, capsys):
+    """Test that invalid numbers are reported as usage errors."""
+    with pytest.raises(SystemExit) as exc_info:
+        main(["https://scim.example", "--journal", "journal.jsonl", *arguments])
+    assert exc_info.value.code == 2
+    assert message in capsys.readouterr().err
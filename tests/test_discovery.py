@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import threading
+
+import pytest
+from httpx import AsyncClient
+from scim2_client import UnexpectedStatusCode
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_client.engines.werkzeug import TestSCIMClient
+from scim2_models import Schema
+from werkzeug.serving import make_server
+from werkzeug.test import Client
+from werkzeug.wrappers import Request
+from werkzeug.wrappers import Response
+
+from scim2_tester.discovery import DiscoveryCache
+from scim2_tester.discovery import build_resource_models
+
+DISCOVERY_PATHS = ("/ServiceProviderConfig", "/ResourceTypes", "/Schemas")
+
+
+class ETagMiddleware:
+    """Add ETags and conditional requests support to the discovery endpoints of a SCIM server."""
+
+    def __init__(self, app):
+        self.app = app
+        self.client = Client(app)
+        self.requests = []
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        if request.path not in DISCOVERY_PATHS:
+            return self.app(environ, start_response)
+
+        response = self.client.get(request.path, query_string=request.query_string)
+        etag = f'W/"{hashlib.sha256(response.get_data()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = Response(status=304)
+        response.headers["ETag"] = etag
+        self.requests.append((request.path, response.status_code))
+        return response(environ, start_response)
+
+
+def test_build_resource_models(scim2_server):
+    """Test that models are built once for identical resource types and schemas."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    schemas = client.query(Schema).resources
+    models = build_resource_models(client, client.resource_types, schemas)
+    assert len(models) == 2
+    assert build_resource_models(client, client.resource_types, schemas) is models
+
+
+def test_discovery_cache(scim2_server, tmp_path):
+    """Test that unchanged documents are not downloaded again by warm runs."""
+    app = ETagMiddleware(scim2_server)
+    cache = DiscoveryCache(tmp_path / "cache")
+
+    cold_client = TestSCIMClient(Client(app))
+    cache.discover(cold_client)
+    assert [status for _, status in app.requests] == [200, 200, 200]
+    assert cold_client.service_provider_config
+    assert {rt.id for rt in cold_client.resource_types} == {"User", "Group"}
+
+    app.requests.clear()
+    warm_client = TestSCIMClient(Client(app))
+    cache.discover(warm_client)
+    assert [status for _, status in app.requests] == [304, 304, 304]
+    assert warm_client.service_provider_config == cold_client.service_provider_config
+    assert warm_client.resource_types == cold_client.resource_types
+    assert warm_client.resource_models is cold_client.resource_models
+    assert warm_client.get_resource_model("User")
+
+
+def test_discovery_cache_without_etag(scim2_server, tmp_path):
+    """Test that documents are fetched again when the server does not send ETags."""
+    cache = DiscoveryCache(tmp_path / "cache")
+    cache.discover(TestSCIMClient(Client(scim2_server)))
+    client = TestSCIMClient(Client(scim2_server))
+    cache.discover(client)
+    assert {rt.id for rt in client.resource_types} == {"User", "Group"}
+
+
+def test_discovery_cache_corrupted(scim2_server, tmp_path):
+    """Test that an unreadable cache entry is ignored."""
+    cache = DiscoveryCache(tmp_path)
+    client = TestSCIMClient(Client(scim2_server))
+    cache.entry_path("").write_text("{")
+    cache.discover(client)
+    assert client.resource_models
+
+
+class StatusMiddleware:
+    """Answer a discovery endpoint with a fixed status code and no body."""
+
+    def __init__(self, app, path, status_code):
+        self.app = app
+        self.path = path
+        self.status_code = status_code
+
+    def __call__(self, environ, start_response):
+        if Request(environ).path != self.path:
+            return self.app(environ, start_response)
+
+        return Response(status=self.status_code)(environ, start_response)
+
+
+@pytest.mark.parametrize("status_code", [304, 500])
+def test_discovery_cache_unexpected_status(scim2_server, tmp_path, status_code):
+    """Test that failed discovery responses raise, and are not cached."""
+    cache = DiscoveryCache(tmp_path)
+    app = StatusMiddleware(scim2_server, "/Schemas", status_code)
+    with pytest.raises(UnexpectedStatusCode):
+        cache.discover(TestSCIMClient(Client(app)))
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.fixture
+def etag_server_url(scim2_server):
+    app = ETagMiddleware(scim2_server)
+    server = make_server("localhost", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield f"http://localhost:{server.server_port}", app
+    server.shutdown()
+    thread.join()
+
+
+def test_discovery_cache_async(etag_server_url, tmp_path):
+    url, app = etag_server_url
+    cache = DiscoveryCache(tmp_path)
+
+    async def run():
+        async with AsyncClient(base_url=url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            await cache.discover_async(client)
+            return client
+
+    for _ in range(2):
+        assert asyncio.run(run()).get_resource_model("Group")
+
+    assert [status for _, status in app.requests] == [200] * 3 + [304] * 3
@@ -0,0 +1,102 @@
+from scim2_models import Error
+from scim2_models import Meta
+from scim2_models import User
+
+from scim2_tester.etag import ConditionalSavings
+from scim2_tester.etag import check_conditional_query
+from scim2_tester.etag import check_conditional_replacement
+from scim2_tester.utils import Status
+
+ETAG = 'W/"1"'
+
+
+def user_json(version=ETAG):
+    return User(
+        id="1", user_name="bjensen", meta=Meta(resource_type="User", version=version)
+    ).model_dump()
+
+
+def test_conditional_query(httpserver, check_config):
+    """Test that the savings of a conditional query are reported."""
+    httpserver.expect_request(
+        "/Users/1", headers={"If-None-Match": ETAG}
+    ).respond_with_data(status=304)
+    httpserver.expect_request("/Users/1").respond_with_json(
+        user_json(), content_type="application/scim+json", headers={"ETag": ETAG}
+    )
+
+    result = check_conditional_query(check_config, User(id="1"))
+    assert result.status == Status.SUCCESS
+    assert isinstance(result.data, ConditionalSavings)
+    assert result.data.bytes_saved > 0
+    assert result.metrics.requests == 2
+
+
+def test_conditional_query_ignored(httpserver, check_config):
+    """Test that servers ignoring If-None-Match are reported."""
+    httpserver.expect_request("/Users/1").respond_with_json(
+        user_json(), content_type="application/scim+json", headers={"ETag": ETAG}
+    )
+
+    result = check_conditional_query(check_config, User(id="1"))
+    assert result.status == Status.ERROR
+    assert "got 200" in result.reason
+
+
+def test_conditional_query_without_etag(httpserver, check_config):
+    httpserver.expect_request("/Users/1").respond_with_json(
+        user_json(version=None), content_type="application/scim+json"
+    )
+
+    result = check_conditional_query(check_config, User(id="1"))
+    assert result.status == Status.ERROR
+    assert "No ETag" in result.reason
+
+
+def test_conditional_replacement_stale_accepted(httpserver, check_config):
+    """Test that servers accepting replacements with a stale If-Match are reported."""
+    httpserver.expect_request("/Users/1", method="PUT").respond_with_json(
+        user_json(version='W/"3"'), content_type="application/scim+json"
+    )
+
+    obj = User(id="1", user_name="bjensen", meta=Meta(version=ETAG))
+    result = check_conditional_replacement(check_config, obj, 'W/"2"')
+    assert result.status == Status.ERROR
+
+
+def test_conditional_replacement(httpserver, check_config):
+    httpserver.expect_request(
+        "/Users/1", method="PUT", headers={"If-Match": ETAG}
+    ).respond_with_json(
+        Error(status=412, detail="Stale version").model_dump(),
+        status=412,
+        content_type="application/scim+json",
+    )
+    httpserver.expect_request("/Users/1", method="PUT").respond_with_json(
+        user_json(version='W/"3"'), content_type="application/scim+json"
+    )
+
+    obj = User(id="1", user_name="bjensen", meta=Meta(version=ETAG))
+    result = check_conditional_replacement(check_config, obj, 'W/"2"')
+    assert result.status == Status.SUCCESS
+
+
+def test_conditional_replacement_stale_other_error(httpserver, check_config):
+    """Test that servers answering a stale If-Match with another error than 412 are reported."""
+    httpserver.expect_request("/Users/1", method="PUT").respond_with_json(
+        Error(status=500, detail="Internal error").model_dump(),
+        status=500,
+        content_type="application/scim+json",
+    )
+
+    obj = User(id="1", user_name="bjensen", meta=Meta(version=ETAG))
+    result = check_conditional_replacement(check_config, obj, 'W/"2"')
+    assert result.status == Status.ERROR
+    assert "returned a 500 error instead of 412" in result.reason
+
+
+def test_conditional_replacement_unchanged_version(check_config):
+    obj = User(id="1", user_name="bjensen", meta=Meta(version=ETAG))
+    result = check_conditional_replacement(check_config, obj, ETAG)
+    assert result.status == Status.ERROR
+    assert "did not change" in result.reason
@@ -0,0 +1,114 @@
+from scim2_client.engines.werkzeug import TestSCIMClient
+from scim2_models import Group
+from scim2_models import User
+from werkzeug.test import Client
+
+from scim2_tester.filters import derive_filters
+from scim2_tester.filters import filter_attributes
+from scim2_tester.filters import probe_filters
+from scim2_tester.journal import Journal
+from scim2_tester.seed import run_seed
+from scim2_tester.utils import CheckConfig
+
+from .test_seed import FailingCreationMiddleware
+
+
+def test_filter_attributes():
+    """Test that only writable and returned single-valued strings are filtered."""
+    assert ("user_name", True) in filter_attributes(User)
+    assert ("external_id", True) in filter_attributes(User)
+    assert ("display_name", False) in filter_attributes(User)
+    assert all(name not in ("id", "password") for name, _ in filter_attributes(User))
+    assert filter_attributes(Group) == [("external_id", True), ("display_name", False)]
+
+
+def test_derive_filters():
+    user = User(user_name="bjensen", display_name='Babs "Barbara" Jensen')
+    assert derive_filters(User, user) == [
+        'userName eq "bjensen"',
+        'displayName co "abs \\"Barbara\\" Jense"',
+        'displayName sw "Bab"',
+        'userName eq "bjensen" and displayName co "abs \\"Barbara\\" Jense"',
+        'userName eq "bjensen" or displayName co "abs \\"Barbara\\" Jense"',
+    ]
+
+
+def test_probe_filters(scim2_server, tmp_path):
+    """Test that every filter is timed at every size, and the seed is deleted."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    conf = CheckConfig(client, journal=Journal(tmp_path / "journal.jsonl"))
+    report = probe_filters(conf, sizes=[10, 5], repeat=1)
+
+    assert {resource_type for resource_type, _ in report.curves} == {"User", "Group"}
+    for curve in report.curves.values():
+        assert [point.size for point in curve.points] == [5, 10]
+        assert all(point.latency or point.error for point in curve.points)
+
+    eq_curves = [
+        curve
+        for (_, expression), curve in report.curves.items()
+        if " eq " in expression
+    ]
+    assert eq_curves
+    assert all(point.results == 1 for curve in eq_curves for point in curve.points)
+
+    assert conf.journal.leftovers() == []
+    assert client.query(client.get_resource_model("User")).total_results == 0
+
+
+def test_probe_filters_keeps_previous_seed(scim2_server, tmp_path):
+    """Test that the resources seeded before the probe are not deleted with the probe seed."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    conf = CheckConfig(client, journal=Journal(tmp_path / "journal.jsonl"))
+    user_resource_type = next(
+        resource_type
+        for resource_type in client.resource_types
+        if resource_type.id == "User"
+    )
+    run_seed(conf, count=3, resource_types=[user_resource_type])
+    previous = conf.journal.leftovers()
+
+    probe_filters(conf, sizes=[5], resource_types=[user_resource_type], repeat=1)
+
+    assert conf.journal.leftovers() == previous
+    assert client.query(client.get_resource_model("User")).total_results == len(
+        previous
+    )
+
+
+def test_probe_filters_shared_pool(scim2_server, tmp_path):
+    """Test that the seeded groups members target the users seeded at the previous steps."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    conf = CheckConfig(client, journal=Journal(tmp_path / "journal.jsonl"))
+    probe_filters(conf, sizes=[3], repeat=1, teardown=False)
+
+    # The only unseeded user is the fixture targeted by the first users managers.
+    users = client.query(client.get_resource_model("User")).resources
+    assert len(users) == 4
+    user_locations = {user.meta.location for user in users}
+    groups = client.query(client.get_resource_model("Group")).resources
+    assert all(
+        member.ref in user_locations for group in groups for member in group.members
+    )
+
+
+def test_probe_filters_seed_errors(scim2_server, tmp_path):
+    """Test that points are labelled with the number of objects actually seeded."""
+    client = TestSCIMClient(Client(FailingCreationMiddleware(scim2_server, 3)))
+    client.discover()
+    conf = CheckConfig(client, journal=Journal(tmp_path / "journal.jsonl"))
+    user_resource_type = next(
+        resource_type
+        for resource_type in client.resource_types
+        if resource_type.id == "User"
+    )
+    report = probe_filters(
+        conf, sizes=[3], resource_types=[user_resource_type], repeat=1
+    )
+
+    assert report.seed_errors == 1
+    for curve in report.curves.values():
+        assert [point.size for point in curve.points] == [1]
@@ -0,0 +1,46 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from scim2_models import Group
+from scim2_models import User
+
+from scim2_tester.fixtures import FixturePool
+
+
+def test_fixture_pool_threads():
+    """Test that pooled objects are created once, even by concurrent threads."""
+    pool = FixturePool()
+    created = []
+
+    def create():
+        created.append(User(id=str(len(created)), user_name="bjensen"))
+        return created[-1]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        users = list(executor.map(lambda _: pool.get(User, create), range(8)))
+
+    assert len(created) == 1
+    assert all(user is created[0] for user in users)
+
+    group = pool.get(Group, lambda: Group(id="group", display_name="group"))
+    assert pool.clear() == [created[0], group]
+    assert pool.objects == []
+    assert pool.get(User, create) is created[1]
+
+
+def test_fixture_pool_tasks():
+    """Test that pooled objects are created once, even by concurrent tasks."""
+    pool = FixturePool()
+    created = []
+
+    async def create():
+        await asyncio.sleep(0)
+        created.append(User(id=str(len(created)), user_name="bjensen"))
+        return created[-1]
+
+    async def run():
+        return await asyncio.gather(*(pool.get_async(User, create) for _ in range(8)))
+
+    users = asyncio.run(run())
+    assert len(created) == 1
+    assert all(user is created[0] for user in users)
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from scim2_tester.cli import main
+from scim2_tester.fleet import Tenant
+from scim2_tester.fleet import check_tenant
+from scim2_tester.fleet import read_tenants
+from scim2_tester.fleet import run_fleet
+from scim2_tester.transport import TransportOptions
+
+
+def test_read_tenants(tmp_path):
+    path = tmp_path / "tenants.jsonl"
+    path.write_text(
+        json.dumps({"url": "https://a.example", "token": "secret", "name": "a"})
+        + "\n\n"
+        + json.dumps({"url": "https://b.example"})
+        + "\n"
+    )
+    assert read_tenants(path) == [
+        Tenant("https://a.example", "secret", "a"),
+        Tenant("https://b.example", None, "https://b.example"),
+    ]
+
+
+def test_duplicated_tenant_names(tmp_path):
+    """Test that tenants with the same name are rejected, as their reports would be mixed."""
+    path = tmp_path / "tenants.jsonl"
+    path.write_text(
+        json.dumps({"url": "https://a.example", "name": "a"})
+        + "\n"
+        + json.dumps({"url": "https://b.example", "name": "a"})
+    )
+    with pytest.raises(ValueError, match="Duplicated tenant names: a"):
+        read_tenants(path)
+
+    with pytest.raises(ValueError, match="Duplicated tenant names: https://a.example"):
+        run_fleet([Tenant("https://a.example"), Tenant("https://a.example")])
+
+
+def test_check_tenant_timeout(scim2_server_url):
+    """Test that the checks of a tenant are stopped after the timeout."""
+    report = check_tenant(Tenant(scim2_server_url), timeout=0)
+
+    assert report.error == "Timed out after 0s"
+    assert not report.passed
+    assert report.successes + len(report.errors) + report.skipped == 1
+
+
+def test_check_tenant_closes_client(scim2_server_url, monkeypatch):
+    """Test that the connections of a tenant are closed once it is checked."""
+    clients = []
+    build_client = TransportOptions.client
+
+    def client(self, *args, **kwargs):
+        clients.append(build_client(self, *args, **kwargs))
+        return clients[-1]
+
+    monkeypatch.setattr(TransportOptions, "client", client)
+    report = check_tenant(Tenant(scim2_server_url), include_checks=["discovery"])
+
+    assert report.passed
+    assert [client.is_closed for client in clients] == [True]
+
+
+def test_run_fleet(scim2_server_url):
+    """Test that a failing tenant does not prevent the other tenants from being checked."""
+    report = run_fleet(
+        [
+            Tenant(scim2_server_url, name="healthy"),
+            Tenant("http://invalid.test", name="unreachable"),
+        ],
+        processes=2,
+        timeout=30,
+    )
+
+    healthy, unreachable = report.tenants
+    assert healthy.name == "healthy"
+    assert healthy.passed
+    assert healthy.successes > 0
+    assert healthy.requests > 0
+    assert healthy.latencies.p50 is not None
+    assert not unreachable.passed
+    assert unreachable.errors
+    assert report.passed == [healthy]
+    assert report.failed == [unreachable]
+    assert report.latencies.count == healthy.latencies.count + len(unreachable.errors)
+
+
+def test_fleet_cli(scim2_server_url, tmp_path, capsys):
+    path = tmp_path / "tenants.jsonl"
+    path.write_text(json.dumps({"url": scim2_server_url, "name": "healthy"}))
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--fleet", str(path), "--fleet-processes", "1", "--include", "crud"])
+    assert exc_info.value.code == 0
+    output = capsys.readouterr().out
+    assert "PASSED healthy" in output
+    assert "1/1 tenants passed" in output
+
+
+def test_missing_host():
+    with pytest.raises(SystemExit) as exc_info:
+        main([])
+    assert exc_info.value.code == 2
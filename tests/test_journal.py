@@ -0,0 +1,198 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_client.engines.werkzeug import TestSCIMClient
+from scim2_models import Error
+from scim2_models import Group
+from scim2_models import GroupMember
+from scim2_models import Meta
+from scim2_models import User
+from werkzeug.test import Client
+from werkzeug.wrappers import Request
+from werkzeug.wrappers import Response
+
+from scim2_tester import CheckConfig
+from scim2_tester import Status
+from scim2_tester import check_server
+from scim2_tester import check_server_async
+from scim2_tester.cleanup import cleanup_journal
+from scim2_tester.cleanup import deletion_levels
+from scim2_tester.journal import Event
+from scim2_tester.journal import Journal
+from scim2_tester.resource import check_resource_type
+
+
+def test_journal_leftovers(tmp_path):
+    """Test that only created and undeleted resources are leftovers."""
+    journal = Journal(tmp_path / "journal.jsonl")
+    assert journal.leftovers() == []
+
+    alice = User(id="alice", user_name="alice")
+    bob = User(id="bob", user_name="bob")
+    journal.created([alice, bob])
+    journal.deleted([alice])
+    with open(journal.path, "a") as fd:
+        fd.write('{"event": "crea')
+
+    assert [entry.event for entry in journal.entries()] == [
+        Event.created,
+        Event.created,
+        Event.deleted,
+    ]
+    assert [entry.id for entry in journal.leftovers()] == ["bob"]
+
+
+def test_deletion_levels():
+    """Test that referencing objects are deleted before the referenced ones."""
+    user = User(
+        id="user", user_name="user", meta=Meta(location="http://scim.test/Users/user")
+    )
+    group = Group(
+        id="group",
+        display_name="group",
+        members=[GroupMember(value="user", ref="http://scim.test/Users/user")],
+        meta=Meta(location="http://scim.test/Groups/group"),
+    )
+    other = User(
+        id="other",
+        user_name="other",
+        meta=Meta(location="http://scim.test/Users/other"),
+    )
+
+    assert list(deletion_levels([user, group, other])) == [[group, other], [user]]
+
+
+def test_check_server_journal(scim2_server, tmp_path):
+    """Test that all the resources created by the checks are recorded and deleted."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    journal = Journal(tmp_path / "journal.jsonl")
+    results = check_server(client, raise_exceptions=True, journal=journal)
+
+    assert all(result.status == Status.SUCCESS for result in results)
+    assert journal.entries()
+    assert journal.leftovers() == []
+
+
+def test_check_server_journal_async(scim2_server_url, tmp_path):
+    journal = Journal(tmp_path / "journal.jsonl")
+
+    async def run():
+        async with AsyncClient(base_url=scim2_server_url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            return await check_server_async(
+                client, raise_exceptions=True, journal=journal
+            )
+
+    results = asyncio.run(run())
+    assert all(result.status == Status.SUCCESS for result in results)
+    assert journal.entries()
+    assert journal.leftovers() == []
+
+
+def test_interrupted_run_cleanup(scim2_server, tmp_path, monkeypatch):
+    """Test that the resources left over by an interrupted run are deleted."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    journal = Journal(tmp_path / "journal.jsonl")
+    conf = CheckConfig(client, journal=journal)
+
+    # Simulate an interruption before the resources deletion
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(client, "delete", interrupt)
+    resource_type = next(rt for rt in client.resource_types if rt.id == "Group")
+    with pytest.raises(KeyboardInterrupt):
+        check_resource_type(conf, resource_type)
+    monkeypatch.undo()
+
+    leftovers = journal.leftovers()
+    assert {entry.schema.split(":")[-1] for entry in leftovers} == {"User", "Group"}
+
+    # Some resources may have been deleted by other means
+    user_entry = next(entry for entry in leftovers if entry.schema.endswith("User"))
+    user_model = client.get_resource_model("User")
+    client.delete(user_model, user_entry.id)
+
+    assert cleanup_journal(conf, journal).remaining == []
+    assert journal.leftovers() == []
+    assert client.query(client.get_resource_model("Group")).total_results == 0
+
+
+class DeletionMiddleware:
+    """Record the deletion requests, and refuse the deletion of some paths."""
+
+    def __init__(self, app):
+        self.app = app
+        self.deletions = []
+        self.refused = set()
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        if request.method == "DELETE":
+            self.deletions.append(request.path)
+            if request.path in self.refused:
+                response = Response(
+                    json.dumps(Error(status=409, detail="Refused").model_dump()),
+                    status=409,
+                    content_type="application/scim+json",
+                )
+                return response(environ, start_response)
+
+        return self.app(environ, start_response)
+
+
+@pytest.fixture
+def deletion_server(scim2_server):
+    return DeletionMiddleware(scim2_server)
+
+
+@pytest.fixture
+def journaled_objects(deletion_server, tmp_path):
+    client = TestSCIMClient(Client(deletion_server))
+    client.discover()
+    journal = Journal(tmp_path / "journal.jsonl")
+    conf = CheckConfig(client, max_workers=4, journal=journal)
+    user_model = client.get_resource_model("User")
+    group_model = client.get_resource_model("Group")
+    member_model = group_model.get_field_root_type("members")
+    users = [client.create(user_model(user_name=f"user{i}")) for i in range(3)]
+    journal.created(users)
+    group = client.create(
+        group_model(
+            display_name="group",
+            members=[
+                member_model(value=user.id, ref=user.meta.location) for user in users
+            ],
+        )
+    )
+    journal.created([group])
+    return conf, users, group
+
+
+def test_cleanup_journal_order(deletion_server, journaled_objects):
+    """Test that the referencing resources are deleted before the referenced ones."""
+    conf, users, group = journaled_objects
+    report = cleanup_journal(conf, conf.journal)
+
+    assert report.remaining == []
+    assert report.errors == []
+    assert deletion_server.deletions[0] == f"/Groups/{group.id}"
+    assert sorted(deletion_server.deletions[1:]) == sorted(
+        f"/Users/{user.id}" for user in users
+    )
+
+
+def test_cleanup_journal_errors(deletion_server, journaled_objects):
+    """Test that the reasons why resources could not be deleted are reported."""
+    conf, users, _ = journaled_objects
+    deletion_server.refused = {f"/Users/{users[0].id}"}
+    report = cleanup_journal(conf, conf.journal)
+
+    assert [obj.id for obj in report.remaining] == [users[0].id]
+    assert len(report.errors) == 1
+    assert "Refused" in report.errors[0]
@@ -0,0 +1,130 @@
+import pytest
+from scim2_client.engines.werkzeug import TestSCIMClient
+from werkzeug.test import Client
+
+from scim2_tester.load import LIFECYCLE
+from scim2_tester.load import OperationStats
+from scim2_tester.load import run_load
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import SCIMTesterError
+from scim2_tester.utils import Status
+
+
+@pytest.fixture
+def load_config(scim2_server):
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    return CheckConfig(client)
+
+
+def test_load_iterations(load_config):
+    """Test that a given number of lifecycles are performed and measured."""
+    report = run_load(load_config, iterations=6, workers=3)
+
+    assert report.iterations == 6
+    assert report.error_rate == 0
+    assert report.throughput > 0
+    assert set(report.operations) == {
+        LIFECYCLE,
+        "check_object_creation",
+        "check_object_query",
+        "check_object_replacement",
+        "check_object_deletion",
+    }
+    for stats in report.operations.values():
+        assert stats.count == 6
+        assert stats.p50 <= stats.p95 <= stats.p99
+
+    # The shared referenced objects are deleted at the end of the test
+    client = load_config.client
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
+
+
+def test_load_duration_with_rate(load_config):
+    """Test that lifecycles are started at the requested rate during the requested duration."""
+    report = run_load(load_config, duration=0.5, rate=10, workers=2)
+    assert report.iterations == 5
+
+
+def test_load_open_loop(load_config):
+    """Test that open-loop lifecycles are started whatever the number of available workers."""
+    report = run_load(load_config, iterations=4, rate=100, workers=1, open_loop=True)
+    assert report.iterations == 4
+    assert report.error_rate == 0
+
+
+def test_load_errors(load_config):
+    """Test that failed operations are counted."""
+    group_resource_type = next(
+        resource_type
+        for resource_type in load_config.client.resource_types
+        if resource_type.id == "Group"
+    )
+    group_resource_type.endpoint = "/Invalid"
+    report = run_load(load_config, resource_types=[group_resource_type], iterations=2)
+
+    assert report.error_rate == 1
+    assert report.operations["check_object_creation"].errors == 2
+
+
+def test_load_failed_deletion(load_config, monkeypatch):
+    """Test that the objects the lifecycle failed to delete are deleted afterwards."""
+
+    def check_object_deletion(conf, obj):
+        return CheckResult(conf, status=Status.ERROR, reason="Injected error")
+
+    monkeypatch.setattr(
+        "scim2_tester.load.check_object_deletion", check_object_deletion
+    )
+    report = run_load(load_config, iterations=2)
+
+    assert report.operations["check_object_deletion"].errors == 2
+    client = load_config.client
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
+
+
+def test_load_exception(load_config, monkeypatch):
+    """Test that the created objects are deleted when a lifecycle raises an exception."""
+
+    def check_object_query(conf, obj):
+        raise RuntimeError("Injected error")
+
+    monkeypatch.setattr("scim2_tester.load.check_object_query", check_object_query)
+    with pytest.raises(RuntimeError):
+        run_load(load_config, iterations=4, workers=2)
+
+    client = load_config.client
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
+
+
+def test_load_cleanup_error(load_config, monkeypatch):
+    """Test that failing to delete the shared objects is reported instead of raised."""
+
+    def delete_fixtures(conf):
+        raise SCIMTesterError("Injected error", conf)
+
+    monkeypatch.setattr("scim2_tester.load.delete_fixtures", delete_fixtures)
+    report = run_load(load_config, iterations=2)
+
+    assert report.iterations == 2
+    assert report.cleanup_error == "Injected error"
+
+
+def test_load_bad_parameters(load_config):
+    with pytest.raises(ValueError):
+        run_load(load_config)
+
+    with pytest.raises(ValueError):
+        run_load(load_config, iterations=1, open_loop=True)
+
+
+def test_percentiles():
+    stats = OperationStats("foo", latencies=[float(i) for i in range(1, 101)])
+    assert stats.p50 == pytest.approx(50.5)
+    assert stats.p99 == pytest.approx(99.01)
+    assert OperationStats("foo", latencies=[1.0]).p95 == 1.0
+    assert OperationStats("foo").p50 is None
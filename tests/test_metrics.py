@@ -0,0 +1,113 @@
+import asyncio
+import json
+import re
+
+from httpx import AsyncClient
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_client.engines.werkzeug import TestSCIMClient
+from scim2_models import Error
+from werkzeug.test import Client
+
+from scim2_tester import check_server
+from scim2_tester import check_server_async
+from scim2_tester.checker import check_random_url
+from scim2_tester.metrics import measure
+from scim2_tester.metrics import record_request
+
+
+def lifecycle_results(results):
+    """Return the results of the last resource lifecycle, by check title."""
+    titles = [result.title for result in results]
+    start = len(titles) - titles[::-1].index("check_object_creation") - 1
+    return {result.title: result for result in results[start:]}
+
+
+def test_check_metrics(httpserver, check_config):
+    """Test that the requests performed by a check are measured."""
+    payload = Error(status=404, detail="Endpoint Not Found").model_dump()
+    httpserver.expect_request(re.compile(r".*")).respond_with_json(
+        payload,
+        status=404,
+        content_type="application/scim+json",
+    )
+
+    result = check_random_url(check_config)
+
+    assert result.duration > 0
+    assert result.metrics.requests == 1
+    assert result.metrics.bytes_sent == 0
+    assert result.metrics.bytes_received == len(json.dumps(payload, indent=4))
+    assert 0 < result.metrics.transport_time <= result.duration
+
+
+def test_hidden_requests_metrics(scim2_server):
+    """Test that the temporary objects creation and deletion requests are measured."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    results = check_server(client, raise_exceptions=True, share_fixtures=False)
+
+    assert all(result.duration is not None for result in results)
+    assert all(result.metrics.requests >= 1 for result in results)
+    assert all(result.metrics.transport_time > 0 for result in results)
+
+    # Groups members reference a temporary User that is created and deleted
+    group_results = lifecycle_results(results)
+    creation = group_results["check_object_creation"]
+    query = group_results["check_object_query"]
+    conditional_query = group_results["check_conditional_query"]
+    pagination = group_results["check_pagination"]
+    replacement = group_results["check_object_replacement"]
+    deletion = group_results["check_object_deletion"]
+    assert creation.metrics.requests == 2
+    assert creation.metrics.bytes_sent > 0
+    assert query.metrics.requests == 1
+    assert query.metrics.bytes_received > 0
+    assert conditional_query.metrics.requests == 2
+    assert conditional_query.data.bytes_saved == query.metrics.bytes_received
+    assert pagination.metrics.requests == 1
+    assert replacement.metrics.requests == 2
+    # The members added by PATCH reference another temporary User.
+    assert deletion.metrics.requests == 4
+
+
+def test_shared_fixtures_metrics(scim2_server):
+    """Test that the shared fixtures are created and deleted once."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    results = check_server(client, raise_exceptions=True)
+
+    # The User referenced by Group members has already been created
+    # for the enterprise User manager, and is deleted after the last check.
+    group_results = lifecycle_results(results)
+    creation = group_results["check_object_creation"]
+    replacement = group_results["check_object_replacement"]
+    deletion = group_results["check_object_deletion"]
+    assert creation.metrics.requests == 1
+    assert replacement.metrics.requests == 1
+    assert deletion.metrics.requests == 2
+
+
+def test_async_metrics(scim2_server_url):
+    """Test that the requests performed by asynchronous checks are measured."""
+
+    async def run():
+        async with AsyncClient(base_url=scim2_server_url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            return await check_server_async(client, raise_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(result.metrics.requests >= 1 for result in results)
+    assert results[-1].metrics.requests == 2
+
+
+def test_nested_measures():
+    """Test that nested measures report to the enclosing measures."""
+    with measure() as outer:
+        record_request(10)
+        with measure() as inner:
+            record_request(5)
+
+    assert inner.requests == 1
+    assert inner.bytes_sent == 5
+    assert outer.requests == 2
+    assert outer.bytes_sent == 15
@@ -1,6 +1,9 @@
+import asyncio
 import re
 
+from httpx import AsyncClient
 from httpx import Client
+from scim2_client.engines.httpx import AsyncSCIMClient
 from scim2_client.engines.httpx import SyncSCIMClient
 from scim2_models import Context
 from scim2_models import Error
@@ -9,9 +12,12 @@ from scim2_models import User
 
 from scim2_tester.checker import check_schemas_endpoint
 from scim2_tester.checker import check_server
+from scim2_tester.checker import check_server_async
 from scim2_tester.resource import check_object_query
 from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
 from scim2_tester.utils import Status
+from scim2_tester.utils import checker
 
 
 def test_unreachable_host():
@@ -20,10 +26,55 @@ def test_unreachable_host():
     scim = SyncSCIMClient(client)
     results = check_server(scim)
 
-    assert all(result.status == Status.ERROR for result in results)
+    errors = [result for result in results if result.status == Status.ERROR]
+    skipped = [result for result in results if result.status == Status.SKIPPED]
+    assert errors
     assert all(
-        "Network error happened during request" in result.reason for result in results
+        "Network error happened during request" in result.reason for result in errors
     )
+    # The checks needing the discovered resources are skipped.
+    assert len(errors) + len(skipped) == len(results)
+    assert "check_object_creation" in [result.title for result in skipped]
+    assert all(result.reason.startswith("Skipped because") for result in skipped)
+
+
+def test_unreachable_host_async():
+    """Test reaching a invalid URL with an asynchronous client."""
+    client = AsyncClient(base_url="https://invalid.test")
+    scim = AsyncSCIMClient(client)
+    results = asyncio.run(check_server_async(scim))
+
+    errors = [result for result in results if result.status == Status.ERROR]
+    skipped = [result for result in results if result.status == Status.SKIPPED]
+    assert errors
+    assert all(
+        "Network error happened during request" in result.reason for result in errors
+    )
+    # The checks needing the discovered resources are skipped.
+    assert len(errors) + len(skipped) == len(results)
+    assert "check_object_creation" in [result.title for result in skipped]
+    assert all(result.reason.startswith("Skipped because") for result in skipped)
+
+
+def test_coroutine_checker():
+    """Test that coroutine checks are awaited, and that their client errors are stored in a result."""
+
+    @checker
+    async def check_user_query_async(conf: CheckConfig) -> CheckResult:
+        """Query an user."""
+        await conf.client.query(User, "unknown")
+        return CheckResult(conf, status=Status.SUCCESS)
+
+    client = AsyncClient(base_url="https://invalid.test")
+    scim = AsyncSCIMClient(client, resource_models=(User,))
+    scim.register_naive_resource_types()
+    result = asyncio.run(check_user_query_async(CheckConfig(scim)))
+
+    assert result.status == Status.ERROR
+    assert "Network error happened during request" in result.reason
+    assert result.title == "check_user_query"
+    assert result.description == "Query an user."
+    assert result.duration is not None
 
 
 def test_bad_authentication(httpserver):
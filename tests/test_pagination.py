@@ -0,0 +1,124 @@
+import asyncio
+
+from httpx import AsyncClient
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_models import ListResponse
+from scim2_models import User
+from werkzeug.wrappers import Response
+
+from scim2_tester.pagination import Page
+from scim2_tester.pagination import PageStats
+from scim2_tester.pagination import PaginationWalk
+from scim2_tester.pagination import check_pagination
+from scim2_tester.pagination import check_pagination_async
+from scim2_tester.pagination import iter_pages
+from scim2_tester.resource import check_object_query_without_id
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import Status
+
+
+def paginated_handler(users, page_size=None, duplicate=False):
+    """Serve users page by page, with an optional default page size and a duplicated user on each page."""
+
+    def handler(request):
+        start_index = int(request.args.get("startIndex", 1))
+        count = int(request.args.get("count", page_size or len(users)))
+        resources = users[start_index - 1 : start_index - 1 + count]
+        if duplicate and resources:
+            resources = [users[0], *resources[1:]]
+        response = ListResponse[User](
+            total_results=len(users), start_index=start_index, resources=resources
+        )
+        return Response(
+            response.model_dump_json(),
+            content_type="application/scim+json",
+        )
+
+    return handler
+
+
+def test_iter_pages(httpserver, check_config):
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(5)]
+    httpserver.expect_request("/Users").respond_with_handler(paginated_handler(users))
+    check_config.page_size = 2
+
+    pages = list(iter_pages(check_config, User))
+    assert [page.start_index for page in pages] == [1, 3, 5]
+    assert [len(page.response.resources) for page in pages] == [2, 2, 1]
+
+
+def test_check_pagination(httpserver, check_config):
+    """Test that all the objects are listed once across pages."""
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(5)]
+    httpserver.expect_request("/Users").respond_with_handler(paginated_handler(users))
+    check_config.page_size = 2
+
+    result = check_pagination(check_config, User)
+    assert result.status == Status.SUCCESS
+    assert [page.items for page in result.data] == [2, 2, 1]
+    assert all(isinstance(page, PageStats) for page in result.data)
+
+
+def test_check_pagination_max_pages(httpserver, check_config):
+    """Test that the walk stops after a maximum number of pages."""
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(5)]
+    httpserver.expect_request("/Users").respond_with_handler(paginated_handler(users))
+    check_config.page_size = 2
+    check_config.max_walk_pages = 2
+
+    result = check_pagination(check_config, User)
+    assert result.status == Status.SUCCESS
+    assert [page.items for page in result.data] == [2, 2]
+    assert "the first 4 of 5 User objects" in result.reason
+
+
+def test_check_pagination_duplicates(httpserver, check_config):
+    """Test that objects listed on several pages are reported."""
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(4)]
+    httpserver.expect_request("/Users").respond_with_handler(
+        paginated_handler(users, duplicate=True)
+    )
+    check_config.page_size = 2
+
+    result = check_pagination(check_config, User)
+    assert result.status == Status.ERROR
+    assert "listed on several pages" in result.reason
+
+
+def test_pagination_walk_missing_total(check_config):
+    """Test that pages missing totalResults are reported."""
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(4)]
+    walk = PaginationWalk()
+    walk.add(Page(1, ListResponse[User](total_results=4, resources=users[:2]), 0.1))
+    walk.add(Page(3, ListResponse[User](resources=users[2:]), 0.1))
+
+    result = walk.result(check_config, User)
+    assert result.status == Status.ERROR
+    assert result.reason == "Inconsistent totalResults across User pages: 4, missing"
+
+
+def test_query_without_id_next_pages(httpserver, check_config):
+    """Test that objects are looked for beyond the first page."""
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(5)]
+    httpserver.expect_request("/Users").respond_with_handler(
+        paginated_handler(users, page_size=2)
+    )
+
+    result = check_object_query_without_id(check_config, users[-1])
+    assert result.status == Status.SUCCESS
+    assert result.metrics.requests == 2
+
+
+def test_check_pagination_async(httpserver):
+    users = [User(id=str(i), user_name=f"user{i}") for i in range(3)]
+    httpserver.expect_request("/Users").respond_with_handler(paginated_handler(users))
+
+    async def run():
+        async with AsyncClient(base_url=httpserver.url_for("/")) as http_client:
+            client = AsyncSCIMClient(http_client, resource_models=[User])
+            client.register_naive_resource_types()
+            return await check_pagination_async(CheckConfig(client, page_size=2), User)
+
+    result = asyncio.run(run())
+    assert result.status == Status.SUCCESS
+    assert [page.items for page in result.data] == [2, 1]
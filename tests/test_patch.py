@@ -0,0 +1,90 @@
+from scim2_models import Error
+from scim2_models import Group
+from scim2_models import GroupMember
+from scim2_models import User
+
+from scim2_tester.patch import check_object_patch_add
+from scim2_tester.patch import check_object_patch_replace
+from scim2_tester.patch import multi_valued_field_name
+from scim2_tester.patch import patch_field_names
+from scim2_tester.patch import patch_operations
+from scim2_tester.patch import replaced_field_name
+from scim2_tester.utils import Status
+
+
+def test_patch_field_names():
+    assert replaced_field_name(Group) == "display_name"
+    assert multi_valued_field_name(Group) == "members"
+    assert patch_field_names(User) == ["display_name", "emails"]
+
+
+def test_patch_operations():
+    values = Group(display_name="group", members=[GroupMember(value="1")])
+    operations = patch_operations(Group, values)
+    replace, _ = operations["replace"]
+    assert (replace.op.value, replace.path, replace.value) == (
+        "replace",
+        "displayName",
+        "group",
+    )
+    add, _ = operations["add"]
+    assert (add.op.value, add.path, add.value) == ("add", "members", [{"value": "1"}])
+    remove, verify = operations["remove"]
+    assert remove.path == 'members[value eq "1"]'
+    assert verify(Group(members=[GroupMember(value="2")]))
+    assert not verify(values)
+
+
+def test_patch_ignored(httpserver, check_config):
+    """Test that PATCH requests that are not applied are reported."""
+    group = Group(id="1", display_name="group", members=[GroupMember(value="2")])
+    httpserver.expect_request("/Groups/1", method="PATCH").respond_with_data(status=204)
+    httpserver.expect_request("/Groups/1").respond_with_json(
+        group.model_dump(), content_type="application/scim+json"
+    )
+
+    values = Group(members=[GroupMember(value="3")])
+    result = check_object_patch_add(check_config, group, values)
+    assert result.status == Status.ERROR
+    assert "was not applied" in result.reason
+
+
+def test_patch_unsupported(httpserver, check_config):
+    httpserver.expect_request("/Groups/1", method="PATCH").respond_with_json(
+        Error(status=501, detail="Not implemented").model_dump(),
+        status=501,
+        content_type="application/scim+json",
+    )
+
+    group = Group(id="1", display_name="group")
+    result = check_object_patch_replace(check_config, group, Group(display_name="new"))
+    assert result.status == Status.ERROR
+    assert "got 501" in result.reason
+
+
+def test_patch_html_response(httpserver, check_config):
+    """Test that non-JSON responses are reported and not decoded."""
+    httpserver.expect_request("/Groups/1", method="PATCH").respond_with_data(
+        "<html><body>Method Not Allowed</body></html>",
+        status=405,
+        content_type="text/html",
+    )
+
+    group = Group(id="1", display_name="group")
+    result = check_object_patch_replace(check_config, group, Group(display_name="new"))
+    assert result.status == Status.ERROR
+    assert "got 405" in result.reason
+    assert result.data is None
+
+
+def test_patch_invalid_json_response(httpserver, check_config):
+    """Test that JSON responses that cannot be decoded are reported as errors."""
+    httpserver.expect_request("/Groups/1", method="PATCH").respond_with_data(
+        "{invalid", status=200, content_type="application/scim+json"
+    )
+
+    group = Group(id="1", display_name="group")
+    result = check_object_patch_replace(check_config, group, Group(display_name="new"))
+    assert result.status == Status.ERROR
+    assert result.reason.startswith("Unexpected response content format")
+    assert result.data == "{invalid"
@@ -0,0 +1,74 @@
+from scim2_models import Group
+from scim2_models import GroupMember
+from scim2_models import ListResponse
+from scim2_models import User
+from werkzeug.wrappers import Response
+
+from scim2_tester.projection import ProjectionSavings
+from scim2_tester.projection import check_attributes_projection
+from scim2_tester.projection import check_excluded_attributes
+from scim2_tester.projection import excluded_attributes
+from scim2_tester.projection import projected_attributes
+from scim2_tester.utils import Status
+
+MEMBERS = [GroupMember(value=str(i), display=f"user{i}") for i in range(100)]
+
+
+def test_projected_attributes():
+    assert projected_attributes(User) == ["id", "userName"]
+    assert projected_attributes(Group) == ["id", "displayName"]
+
+
+def test_excluded_attributes():
+    assert excluded_attributes(Group) == ["members"]
+    assert "groups" in excluded_attributes(User)
+
+
+def group_handler(honour_projection):
+    """Serve a group with many members, honouring excludedAttributes or not."""
+
+    def handler(request):
+        group = Group(id="1", display_name="group", members=MEMBERS)
+        if honour_projection and request.args.get("excludedAttributes") == "members":
+            group.members = None
+        payload = group.model_dump_json()
+        if request.path == "/Groups":
+            payload = ListResponse[Group](
+                total_results=1, resources=[group]
+            ).model_dump_json()
+        return Response(payload, content_type="application/scim+json")
+
+    return handler
+
+
+def test_excluded_attributes_honoured(httpserver, check_config):
+    """Test that the payload size reduction is reported."""
+    httpserver.expect_request("/Groups/1").respond_with_handler(group_handler(True))
+    httpserver.expect_request("/Groups").respond_with_handler(group_handler(True))
+
+    result = check_excluded_attributes(check_config, Group(id="1"))
+    assert result.status == Status.SUCCESS
+    assert isinstance(result.data, ProjectionSavings)
+    assert result.data.bytes_saved > 0
+    assert result.data.ratio < 0.1
+    assert result.metrics.requests == 4
+
+
+def test_excluded_attributes_ignored(httpserver, check_config):
+    """Test that servers ignoring excludedAttributes are reported."""
+    httpserver.expect_request("/Groups/1").respond_with_handler(group_handler(False))
+    httpserver.expect_request("/Groups").respond_with_handler(group_handler(False))
+
+    result = check_excluded_attributes(check_config, Group(id="1"))
+    assert result.status == Status.ERROR
+    assert "members" in result.reason
+
+
+def test_attributes_projection_ignored(httpserver, check_config):
+    """Test that servers returning unrequested attributes are reported."""
+    httpserver.expect_request("/Groups/1").respond_with_handler(group_handler(True))
+    httpserver.expect_request("/Groups").respond_with_handler(group_handler(True))
+
+    result = check_attributes_projection(check_config, Group(id="1"))
+    assert result.status == Status.ERROR
+    assert "members" in result.reason
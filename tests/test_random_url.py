@@ -5,6 +5,7 @@ from scim2_models import User
 
 from scim2_tester.checker import check_random_url
 from scim2_tester.utils import Status
+from scim2_tester.values import ValueGenerator
 
 
 def test_random_url(httpserver, check_config):
@@ -49,3 +50,17 @@ def test_random_url_not_404(httpserver, check_config):
 
     assert result.status == Status.ERROR
     assert "did return an object, but the status code is 200" in result.reason
+
+
+def test_random_url_reproducible(httpserver, check_config):
+    """Test that the random URL comes from the value generator, so runs can be replayed."""
+    check_config.value_generator = ValueGenerator(42)
+    httpserver.expect_request(f"/{ValueGenerator(42).string()}").respond_with_json(
+        Error(status=404, detail="Endpoint Not Found").model_dump(),
+        status=404,
+        content_type="application/scim+json",
+    )
+
+    result = check_random_url(check_config)
+
+    assert result.status == Status.SUCCESS
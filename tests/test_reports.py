@@ -0,0 +1,121 @@
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from scim2_tester import CheckResult
+from scim2_tester import Status
+from scim2_tester.cli import main
+from scim2_tester.metrics import Metrics
+from scim2_tester.reports import JSONLinesWriter
+from scim2_tester.reports import JUnitWriter
+from scim2_tester.reports import ReportWriter
+from scim2_tester.reports import iter_reported
+
+
+def results(conf):
+    return [
+        CheckResult(
+            conf,
+            status=Status.SUCCESS,
+            title="check_object_creation",
+            resource_type="User",
+            duration=0.5,
+            metrics=Metrics(requests=2, bytes_sent=10, bytes_received=20),
+        ),
+        CheckResult(
+            conf,
+            status=Status.ERROR,
+            title="check_object_query",
+            reason="Unexpected <value>\x1b",
+            duration=0.25,
+        ),
+        CheckResult(
+            conf,
+            status=Status.SKIPPED,
+            title="check_object_deletion",
+            reason="Skipped because check_object_query failed",
+            duration=0.0,
+        ),
+    ]
+
+
+def test_json_lines_writer(check_config):
+    fd = io.StringIO()
+    with JSONLinesWriter(fd) as writer:
+        for result in results(check_config):
+            writer.write(result)
+
+    lines = [json.loads(line) for line in fd.getvalue().splitlines()]
+    assert [line["status"] for line in lines] == ["SUCCESS", "ERROR", "SKIPPED"]
+    assert lines[0] == {
+        "title": "check_object_creation",
+        "resource_type": "User",
+        "status": "SUCCESS",
+        "reason": None,
+        "duration": 0.5,
+        "requests": 2,
+        "bytes_sent": 10,
+        "bytes_received": 20,
+        "transport_time": 0.0,
+    }
+
+
+def test_junit_writer(check_config):
+    """Test that reports are valid XML, even with control characters in the reasons."""
+    fd = io.StringIO()
+    with JUnitWriter(fd) as writer:
+        for result in results(check_config):
+            writer.write(result)
+
+    suite = ET.fromstring(fd.getvalue()).find("testsuite")
+    creation, query, deletion = suite.findall("testcase")
+    assert creation.get("name") == "check_object_creation"
+    assert creation.get("classname") == "scim2_tester.User"
+    assert query.get("classname") == "scim2_tester"
+    assert creation.get("time") == "0.500000"
+    assert creation.find("system-out").text.startswith("2 requests, 10 bytes sent")
+    assert query.find("failure").get("message") == "Unexpected <value>"
+    assert deletion.find("skipped") is not None
+
+
+def test_report_writer_is_abstract():
+    with pytest.raises(TypeError):
+        ReportWriter(io.StringIO())
+
+
+def test_iter_reported_closes_results(check_config):
+    """Test that stopping the iteration closes the reported results."""
+    closed = []
+
+    def checks():
+        try:
+            yield from results(check_config)
+        finally:
+            closed.append(True)
+
+    fd = io.StringIO()
+    reported = iter_reported(checks(), [JSONLinesWriter(fd)])
+    next(reported)
+    reported.close()
+
+    assert closed == [True]
+    assert len(fd.getvalue().splitlines()) == 1
+
+
+def test_reports_cli(scim2_server_url, tmp_path):
+    jsonl = tmp_path / "results.jsonl"
+    junit = tmp_path / "results.xml"
+    main([scim2_server_url, "--jsonl", str(jsonl), "--junit", str(junit)])
+
+    lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    testcases = ET.parse(junit).getroot().find("testsuite").findall("testcase")
+    assert len(lines) == len(testcases) > 0
+    assert {line["resource_type"] for line in lines} == {None, "User", "Group"}
+    assert {testcase.get("classname") for testcase in testcases} == {
+        "scim2_tester",
+        "scim2_tester.User",
+        "scim2_tester.Group",
+    }
+    assert {line["status"] for line in lines} == {"SUCCESS"}
@@ -2,10 +2,17 @@ from enum import Enum
 
 from pydantic import Field
 from scim2_models import ComplexAttribute
+from scim2_models import Group
 from scim2_models import Reference
 from scim2_models import Resource
+from scim2_models import User
 
+from scim2_tester.filling import minimal_field_names
+from scim2_tester.plan import model_index
+from scim2_tester.plan import model_plan
+from scim2_tester.resource import creation_field_names
 from scim2_tester.resource import fill_with_random_values
+from scim2_tester.resource import replacement_field_names
 
 
 class Complex(ComplexAttribute):
@@ -57,3 +64,39 @@ def test_random_values():
 
     assert obj.example_unique in ["foo", "bar"]
     assert all(val in ["foo", "bar"] for val in obj.example_multiple)
+
+
+def test_random_values_empty_field_names():
+    """Check that an empty list of field names fills all the fields."""
+    obj = CustomModel()
+    fill_with_random_values(None, obj, [])
+    assert obj.str_unique is not None
+    assert obj.complex_unique is not None
+
+
+def test_model_plan_is_cached():
+    """Check that models are introspected only once."""
+    plan = model_plan(CustomModel)
+    assert model_plan(CustomModel) is plan
+    assert "str_unique" in plan.fields
+    assert plan.fields["str_multiple"].is_multiple
+    assert plan.fields["complex_unique"].nested_model is Complex
+    assert "schemas" not in plan.fields
+
+
+def test_field_names():
+    """Check the required and mutable field sets."""
+    assert minimal_field_names(User) == ["schemas", "user_name"]
+    assert "user_name" in creation_field_names(User)
+    assert "id" not in creation_field_names(User)
+    assert "id" not in replacement_field_names(User)
+    assert "members" in replacement_field_names(Group)
+
+
+def test_model_index():
+    """Check that models can be found by schema or by name."""
+    index = model_index((User, Group))
+    assert index.get("User") is User
+    assert index.get("urn:ietf:params:scim:schemas:core:2.0:Group") is Group
+    assert index.get("Invalid") is None
+    assert model_index((User, Group)) is index
@@ -0,0 +1,344 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from scim2_client.engines.werkzeug import TestSCIMClient
+from werkzeug.test import Client
+
+from scim2_tester import Status
+from scim2_tester import check_server
+from scim2_tester.registry import checks
+from scim2_tester.registry import select_checks
+from scim2_tester.scheduler import Graph
+from scim2_tester.scheduler import Node
+from scim2_tester.scheduler import iter_graph
+from scim2_tester.scheduler import iter_graphs
+from scim2_tester.scheduler import iter_graphs_async
+from scim2_tester.utils import CheckConfig
+from scim2_tester.utils import CheckResult
+from scim2_tester.utils import Concurrently
+from scim2_tester.utils import run_steps
+from scim2_tester.utils import run_steps_async
+
+DISCOVERY = {
+    "check_service_provider_config_endpoint",
+    "check_resource_types_endpoint",
+    "check_schemas_endpoint",
+}
+
+
+def result_of(name, status=Status.SUCCESS, data=None):
+    def run(conf, data_):
+        return CheckResult(conf, status=status, title=name, data=data)
+
+    return Node(name, run)
+
+
+def test_select_checks():
+    """Test that the checks required by the selected checks are selected too."""
+    assert select_checks(["check_object_query"]) == {
+        "check_object_query",
+        "check_object_creation",
+        *DISCOVERY - {"check_service_provider_config_endpoint"},
+    }
+    assert select_checks(
+        ["check_object_query"], available=["resource_types", "resource_models"]
+    ) == {"check_object_query", "check_object_creation"}
+    assert select_checks(exclude=["etag", "discovery"]).isdisjoint(
+        {"check_conditional_query", "check_conditional_replacement", *DISCOVERY}
+    )
+    assert select_checks(["patch"], exclude=["check_object_creation"]) == {
+        "check_object_patch_replace",
+        "check_object_patch_add",
+        "check_object_patch_remove",
+        *DISCOVERY - {"check_service_provider_config_endpoint"},
+    }
+
+
+def test_select_unknown_check():
+    with pytest.raises(ValueError, match="unknown"):
+        select_checks(["unknown"])
+
+
+def test_skipped_dependents(check_config):
+    """Test that the checks requiring a failed check are skipped."""
+    graph = Graph(
+        [
+            result_of("check_object_creation", Status.ERROR),
+            result_of("check_object_query"),
+            result_of("check_object_patch_add"),
+            result_of("check_object_patch_remove"),
+        ]
+    )
+    results = list(iter_graph(check_config, graph))
+
+    assert [result.status for result in results] == [
+        Status.ERROR,
+        Status.SKIPPED,
+        Status.SKIPPED,
+        Status.SKIPPED,
+    ]
+    assert results[1].reason == "Skipped because check_object_creation failed"
+    assert results[1].description == checks["check_object_query"].description
+    assert results[3].reason == "Skipped because check_object_creation failed"
+
+    graph = Graph(
+        [
+            result_of("check_object_creation", Status.SKIPPED),
+            result_of("check_object_query"),
+        ]
+    )
+    results = list(iter_graph(check_config, graph))
+    assert results[1].reason == "Skipped because check_object_creation was skipped"
+
+
+def test_unselected_requirement(check_config):
+    graph = Graph([result_of("check_object_creation"), result_of("check_object_query")])
+    results = list(iter_graph(check_config, graph, {"check_object_query"}))
+
+    assert [result.title for result in results] == ["check_object_query"]
+    assert results[0].reason == "Skipped because check_object_creation was not run"
+
+
+def test_required_data(check_config):
+    """Test that checks are passed the data of the checks they require."""
+    received = {}
+
+    def query(conf, data):
+        received.update(data)
+        return CheckResult(conf, status=Status.SUCCESS)
+
+    graph = Graph(
+        [
+            result_of("check_object_creation", data="created"),
+            Node("check_object_query", query),
+        ]
+    )
+    list(iter_graph(check_config, graph))
+
+    assert received == {"check_object_creation": "created"}
+
+
+def test_threaded_graphs(check_config):
+    """Test that independent checks run concurrently, and that results keep their order."""
+    check_config.max_workers = 4
+    barrier = threading.Barrier(2, timeout=5)
+    done = []
+
+    def read(name):
+        def run(conf, data):
+            barrier.wait()
+            done.append(name)
+            return CheckResult(conf, status=Status.SUCCESS, title=name)
+
+        return Node(name, run)
+
+    def replacement(conf, data):
+        done.append("check_object_replacement")
+        return CheckResult(
+            conf, status=Status.SUCCESS, title="check_object_replacement"
+        )
+
+    cleaned = []
+    graph = Graph(
+        [
+            result_of("check_object_creation"),
+            read("check_object_query"),
+            read("check_pagination"),
+            Node("check_object_replacement", replacement),
+        ],
+        cleanup=lambda conf: cleaned.append(conf),
+    )
+    results = list(iter_graphs(check_config, [graph]))
+
+    assert [result.title for result in results] == [
+        "check_object_creation",
+        "check_object_query",
+        "check_pagination",
+        "check_object_replacement",
+    ]
+    # The replacement waits for the checks reading the object.
+    assert done[-1] == "check_object_replacement"
+    assert len(cleaned) == 1
+
+
+def test_async_graphs(check_config):
+    """Test that asynchronous checks run concurrently, and that results keep their order."""
+    started = []
+
+    def read(name):
+        async def run(conf, data):
+            started.append(name)
+            await asyncio.sleep(0.01)
+            return CheckResult(conf, status=Status.SUCCESS, title=name)
+
+        return Node(name, run)
+
+    async def cleanup(conf):
+        started.append("cleanup")
+
+    graph = Graph(
+        [
+            result_of("check_object_creation", Status.ERROR),
+            read("check_random_url"),
+            read("check_pagination"),
+            read("check_object_query"),
+        ],
+        cleanup=cleanup,
+    )
+
+    async def run():
+        return [
+            result
+            async for result in iter_graphs_async(
+                CheckConfig(check_config.client), [graph]
+            )
+        ]
+
+    results = asyncio.run(run())
+    assert [result.status for result in results] == [
+        Status.ERROR,
+        Status.SUCCESS,
+        Status.SKIPPED,
+        Status.SKIPPED,
+    ]
+    assert started == ["check_random_url", "cleanup"]
+
+
+def test_async_graphs_cleanup_error(check_config):
+    """Test that asynchronous cleanup errors are recorded on the last result of their graph."""
+
+    async def cleanup(conf):
+        raise ValueError("boom")
+
+    graphs = [
+        Graph([result_of("check_random_url")], cleanup=cleanup),
+        Graph([result_of("check_service_provider_config_endpoint")]),
+    ]
+
+    async def run():
+        return [
+            result
+            async for result in iter_graphs_async(
+                CheckConfig(check_config.client), graphs
+            )
+        ]
+
+    results = asyncio.run(run())
+    assert [result.status for result in results] == [Status.ERROR, Status.SUCCESS]
+    assert results[0].reason == "Could not delete the temporary objects: boom"
+
+
+class Values:
+    """A client returning the values it is passed, and raising the exceptions."""
+
+    def get(self, value):
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class AsyncValues(Values):
+    async def get(self, value):
+        await asyncio.sleep(0)
+        return super().get(value)
+
+
+def test_steps():
+    """Test that the same steps are performed by synchronous and asynchronous clients."""
+
+    def steps(client, log):
+        try:
+            value = yield client.get(1)
+            yield client.get(ValueError("boom"))
+        except ValueError as exc:
+            log.append(str(exc))
+        finally:
+            log.append((yield client.get("cleaned")))
+        return value
+
+    sync_log, async_log = [], []
+    assert run_steps(steps(Values(), sync_log)) == 1
+    assert asyncio.run(run_steps_async(steps(AsyncValues(), async_log))) == 1
+    assert sync_log == async_log == ["boom", "cleaned"]
+
+
+def test_concurrent_steps(check_config):
+    """Test that concurrent steps keep their order, and that a semaphore limits the concurrent requests."""
+    running = []
+    peak = []
+
+    def request(value):
+        running.append(value)
+        peak.append(len(running))
+        time.sleep(0.01)
+        running.remove(value)
+        return value
+
+    async def request_async(value):
+        running.append(value)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(value)
+        return value
+
+    def get_steps(get, value):
+        return (yield get(value))
+
+    def steps(get):
+        calls = [lambda conf, value=value: get_steps(get, value) for value in range(6)]
+        return (yield Concurrently(check_config, calls, max_workers=3))
+
+    assert run_steps(steps(request)) == list(range(6))
+    assert max(peak) == 3
+
+    peak.clear()
+    semaphore = asyncio.Semaphore(2)
+    assert asyncio.run(run_steps_async(steps(request_async), semaphore)) == list(
+        range(6)
+    )
+    assert max(peak) == 2
+
+
+def test_include_checks(scim2_server):
+    """Test that only the selected checks, and the checks they require, are run."""
+    client = TestSCIMClient(Client(scim2_server))
+    results = check_server(
+        client, raise_exceptions=True, include_checks=["check_object_query"]
+    )
+
+    assert {result.title for result in results} == {
+        "check_query_all_resource_types",
+        "check_query_resource_type_by_id",
+        "check_access_invalid_resource_type",
+        "check_query_all_schemas",
+        "check_query_schema_by_id",
+        "check_access_invalid_schema",
+        "check_object_creation",
+        "check_object_query",
+    }
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
+
+
+def test_exclude_checks(scim2_server):
+    """Test that the checks requiring excluded checks are skipped."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    results = check_server(
+        client, exclude_checks=["discovery", "check_object_creation", "bulk"]
+    )
+
+    assert {result.title for result in results if result.status != Status.SKIPPED} == {
+        "check_random_url"
+    }
+    skipped = [result for result in results if result.status == Status.SKIPPED]
+    assert {result.title for result in skipped} >= {
+        "check_object_query",
+        "check_object_deletion",
+    }
+    assert all(
+        result.reason == "Skipped because check_object_creation was not run"
+        for result in skipped
+    )
@@ -1,34 +1,188 @@
+import asyncio
+
 import pytest
+from httpx import AsyncClient
+from scim2_client.engines.httpx import AsyncSCIMClient
 from scim2_client.engines.werkzeug import TestSCIMClient
-from scim2_server.backend import InMemoryBackend
-from scim2_server.provider import SCIMProvider
-from scim2_server.utils import load_default_resource_types
-from scim2_server.utils import load_default_schemas
+from scim2_models import ListResponse
 from werkzeug.test import Client
 
+from scim2_tester import Retention
+from scim2_tester import Status
 from scim2_tester import check_server
+from scim2_tester import check_server_async
+from scim2_tester import iter_check_server
+from scim2_tester import iter_check_server_async
+from scim2_tester.utils import RawPayload
 
 
-@pytest.fixture
-def scim2_server():
-    backend = InMemoryBackend()
-    app = SCIMProvider(backend)
+def test_discovered_scim2_server(scim2_server):
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    check_server(client, raise_exceptions=True)
 
-    for schema in load_default_schemas().values():
-        app.register_schema(schema)
 
-    for resource_type in load_default_resource_types().values():
-        app.register_resource_type(resource_type)
+def test_undiscovered_scim2_server(scim2_server):
+    client = TestSCIMClient(Client(scim2_server))
+    check_server(client, raise_exceptions=True)
+
+
+def test_threaded_scim2_server(scim2_server):
+    """Test that resource types checked in threads produce the same results than sequentially."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    results = check_server(client)
+    threaded_results = check_server(client, raise_exceptions=True, max_workers=2)
 
-    return app
+    assert [result.title for result in threaded_results] == [
+        result.title for result in results
+    ]
+    assert all(result.status == Status.SUCCESS for result in threaded_results)
 
+    lifecycle_clients = {
+        result.conf.client
+        for result in threaded_results
+        if result.title == "check_object_creation"
+    }
+    assert client not in lifecycle_clients
 
-def test_discovered_scim2_server(scim2_server):
+
+def test_undiscovered_scim2_server_async(scim2_server_url):
+    async def run():
+        async with AsyncClient(base_url=scim2_server_url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            return await check_server_async(
+                client, raise_exceptions=True, max_concurrency=2
+            )
+
+    results = asyncio.run(run())
+    assert all(result.status == Status.SUCCESS for result in results)
+
+
+def test_async_results_order(scim2_server, scim2_server_url):
+    """Test that the asynchronous checks produce the same results than the synchronous ones."""
+    client = TestSCIMClient(Client(scim2_server))
+    results = check_server(client)
+
+    async def run():
+        async with AsyncClient(base_url=scim2_server_url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            return await check_server_async(client)
+
+    async_results = asyncio.run(run())
+    assert [result.title for result in async_results] == [
+        result.title for result in results
+    ]
+    assert [result.status for result in async_results] == [
+        result.status for result in results
+    ]
+
+
+def test_iter_check_server_early_stop(scim2_server):
+    """Test that the temporary resources are deleted when the iteration is stopped early."""
     client = TestSCIMClient(Client(scim2_server))
     client.discover()
-    check_server(client, raise_exceptions=True)
+    results = iter_check_server(client, raise_exceptions=True)
+    for result in results:
+        if result.title == "check_object_query":
+            break
+    results.close()
 
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
 
-def test_undiscovered_scim2_server(scim2_server):
+
+def test_iter_check_server_async_early_stop(scim2_server, scim2_server_url):
+    async def run():
+        async with AsyncClient(base_url=scim2_server_url) as http_client:
+            client = AsyncSCIMClient(http_client)
+            results = iter_check_server_async(client, raise_exceptions=True)
+            async for result in results:
+                if result.title == "check_object_creation":
+                    break
+            await results.aclose()
+
+    asyncio.run(run())
     client = TestSCIMClient(Client(scim2_server))
-    check_server(client, raise_exceptions=True)
+    client.discover()
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
+
+
+@pytest.mark.parametrize(
+    "retention,kept",
+    [
+        (Retention.ALL, True),
+        (Retention.FAILURES, False),
+        (Retention.SUMMARY, False),
+    ],
+)
+def test_retention(scim2_server, retention, kept):
+    """Test that results only keep what the retention policy asks for."""
+    client = TestSCIMClient(Client(scim2_server))
+    results = check_server(client, raise_exceptions=True, retention=retention)
+
+    assert all(result.status == Status.SUCCESS for result in results)
+    assert any(result.data is not None for result in results) == kept
+    assert all(result.title for result in results)
+    if retention == Retention.SUMMARY:
+        assert all(result.description is None for result in results)
+
+
+def test_lazy_payloads(scim2_server):
+    """Test that list responses are parsed when the result data is accessed."""
+    client = TestSCIMClient(Client(scim2_server))
+    results = check_server(client, raise_exceptions=True, lazy_payloads=True)
+    result = next(
+        result for result in results if result.title == "check_object_query_without_id"
+    )
+
+    assert isinstance(result._data, RawPayload)
+    assert isinstance(result.data, ListResponse)
+    assert result.data.total_results >= 1
+
+
+class DeletionMiddleware:
+    """Answer deletion requests with a fixed status code."""
+
+    def __init__(self, app, status_code):
+        self.app = app
+        self.status_code = status_code
+
+    def __call__(self, environ, start_response):
+        if environ["REQUEST_METHOD"] != "DELETE":
+            return self.app(environ, start_response)
+
+        def start_with_status(status, headers, exc_info=None):
+            return start_response(f"{self.status_code} Deleted", headers, exc_info)
+
+        if self.status_code < 300:
+            return self.app(environ, start_with_status)
+
+        start_response(f"{self.status_code} Error", [("Content-Length", "0")])
+        return [b""]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_deletion_with_200(scim2_server, max_workers):
+    """Test that temporary objects are deleted by servers answering 200 to deletions."""
+    client = TestSCIMClient(Client(DeletionMiddleware(scim2_server, 200)))
+    client.discover()
+    results = check_server(client, max_workers=max_workers)
+
+    assert {result.title for result in results if result.status != Status.SUCCESS} == {
+        "check_object_deletion"
+    }
+    for model in client.resource_models:
+        assert client.query(model).total_results == 0
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_cleanup_error(scim2_server, max_workers):
+    """Test that cleanup errors are recorded in the last result instead of being raised."""
+    client = TestSCIMClient(Client(DeletionMiddleware(scim2_server, 500)))
+    client.discover()
+    results = check_server(client, max_workers=max_workers)
+
+    assert "Could not delete the temporary objects" in results[-1].reason
+    assert results[-1].status == Status.ERROR
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from scim2_client.engines.werkzeug import TestSCIMClient
+from scim2_models import Error
+from werkzeug.test import Client
+from werkzeug.wrappers import Request
+from werkzeug.wrappers import Response
+
+from scim2_tester.cleanup import cleanup_journal
+from scim2_tester.journal import Journal
+from scim2_tester.seed import batches
+from scim2_tester.seed import run_seed
+from scim2_tester.seed import seeding_order
+from scim2_tester.utils import CheckConfig
+
+from .test_bulk import BulkMiddleware
+
+
+def test_batches():
+    assert list(batches(250, 100)) == [100, 100, 50]
+    assert list(batches(0, 100)) == []
+
+
+def test_seeding_order(scim2_server):
+    """Test that users are seeded before the groups referencing them."""
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    resource_types = sorted(client.resource_types, key=lambda rt: rt.id)
+    ordered = seeding_order(CheckConfig(client), resource_types)
+    assert [resource_type_id for resource_type_id, _, _ in ordered] == [
+        "User",
+        "Group",
+    ]
+
+
+def test_seed_needs_journal(scim2_server):
+    client = TestSCIMClient(Client(scim2_server))
+    client.discover()
+    with pytest.raises(ValueError):
+        run_seed(CheckConfig(client), count=1)
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_seed(scim2_server, tmp_path, bulk):
+    """Test that seeded resources reference each other and can be torn down."""
+    app = BulkMiddleware(scim2_server, max_operations=10) if bulk else scim2_server
+    client = TestSCIMClient(Client(app))
+    client.discover()
+    journal = Journal(tmp_path / "journal.jsonl")
+    conf = CheckConfig(client, max_workers=4, journal=journal)
+
+    report = run_seed(conf, count=3, counts={"User": 25}, batch_size=10)
+    assert report.created == {"User": 25, "Group": 3}
+    assert report.errors == 0
+    if bulk:
+        assert app.bulk_requests
+
+    user_model = client.get_resource_model("User")
+    group_model = client.get_resource_model("Group")
+    users = client.query(user_model, search_request={"count": 100})
+    user_locations = {user.meta.location for user in users.resources}
+    # The first users managers target a fixture, as no user is seeded yet.
+    assert users.total_results == 26
+    groups = client.query(group_model).resources
+    assert all(
+        member.ref in user_locations for group in groups for member in group.members
+    )
+
+    assert cleanup_journal(conf, journal).remaining == []
+    assert client.query(user_model).total_results == 0
+    assert client.query(group_model).total_results == 0
+
+
+class FailingCreationMiddleware:
+    """Make the n-th user creation fail with a 500 error."""
+
+    def __init__(self, app, failing_creation):
+        self.app = app
+        self.failing_creation = failing_creation
+        self.creations = 0
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        if request.method == "POST" and request.path == "/Users":
+            self.creations += 1
+            if self.creations == self.failing_creation:
+                response = Response(
+                    json.dumps(Error(status=500, detail="Injected").model_dump()),
+                    status=500,
+                    content_type="application/scim+json",
+                )
+                return response(environ, start_response)
+
+        return self.app(environ, start_response)
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_seed_partial_batch(scim2_server, tmp_path, bulk):
+    """Test that the objects created before a failure in a batch are counted and journaled."""
+    # The first creation is the fixture targeted by the users managers.
+    app = FailingCreationMiddleware(scim2_server, failing_creation=4)
+    if bulk:
+        app = BulkMiddleware(app, max_operations=10)
+    client = TestSCIMClient(Client(app))
+    client.discover()
+    journal = Journal(tmp_path / "journal.jsonl")
+    conf = CheckConfig(client, max_workers=1, journal=journal)
+    user_resource_type = next(
+        resource_type
+        for resource_type in client.resource_types
+        if resource_type.id == "User"
+    )
+
+    report = run_seed(conf, count=5, resource_types=[user_resource_type])
+    user_model = client.get_resource_model("User")
+    assert report.errors == 1
+    assert report.created == {"User": 4 if bulk else 2}
+    assert client.query(user_model).total_results == report.created["User"] + 1
+
+    assert cleanup_journal(conf, journal).remaining == []
+    assert client.query(user_model).total_results == 0
@@ -0,0 +1,115 @@
+import pytest
+
+from scim2_tester import CheckResult
+from scim2_tester import Status
+from scim2_tester.cli import main
+from scim2_tester.store import ResultStore
+
+
+def result(conf, title, status=Status.SUCCESS):
+    return CheckResult(conf, status=status, title=title, duration=0.1)
+
+
+def test_failed_checks(tmp_path, check_config):
+    """Test that the failed and skipped checks are returned once, in the run order."""
+    store = ResultStore(tmp_path / "results.jsonl")
+    assert store.failed_checks() == []
+
+    store.save(
+        [
+            result(check_config, "check_object_creation"),
+            result(check_config, "check_object_query", Status.ERROR),
+            result(check_config, "check_object_deletion"),
+            result(check_config, "check_object_creation", Status.ERROR),
+            result(check_config, "check_object_query", Status.SKIPPED),
+        ]
+    )
+    assert store.failed_checks() == ["check_object_query", "check_object_creation"]
+    assert store.results()[1].status == Status.ERROR
+
+
+def test_failed_checks_without_title(tmp_path, check_config):
+    """Test that failed results naming no check are saved, but not run again."""
+    store = ResultStore(tmp_path / "results.jsonl")
+    store.save(
+        [
+            result(check_config, None, Status.ERROR),
+            result(check_config, "check_object_query", Status.ERROR),
+        ]
+    )
+    assert store.results()[0].title is None
+    assert store.failed_checks() == ["check_object_query"]
+
+
+def test_save_replaces_results(tmp_path, check_config):
+    """Test that the checks run again replace their previous results only."""
+    store = ResultStore(tmp_path / "results.jsonl")
+    store.save(
+        [
+            result(check_config, "check_object_creation"),
+            result(check_config, "check_object_query", Status.ERROR),
+            result(check_config, "check_object_deletion"),
+        ]
+    )
+    store.save([result(check_config, "check_object_query")])
+
+    assert [(stored.title, stored.status) for stored in store.results()] == [
+        ("check_object_creation", Status.SUCCESS),
+        ("check_object_deletion", Status.SUCCESS),
+        ("check_object_query", Status.SUCCESS),
+    ]
+    assert store.failed_checks() == []
+
+
+def test_rerun_failed(scim2_server_url, tmp_path, check_config, capsys):
+    """Test that only the failed checks, and the checks they require, are run again."""
+    path = tmp_path / "results.jsonl"
+    ResultStore(path).save(
+        [
+            result(check_config, "check_object_creation"),
+            result(check_config, "check_object_query", Status.ERROR),
+            result(check_config, "check_object_deletion"),
+        ]
+    )
+
+    main([scim2_server_url, "--results", str(path), "--rerun-failed"])
+    output = capsys.readouterr().out
+    assert "SUCCESS check_object_query" in output
+    assert "SUCCESS check_object_creation" in output
+    assert "check_object_deletion" not in output
+    assert "check_schemas" not in output
+    assert ResultStore(path).failed_checks() == []
+
+    with pytest.raises(SystemExit) as exc_info:
+        main([scim2_server_url, "--results", str(path), "--rerun-failed"])
+    assert exc_info.value.code is None
+    assert "No failed checks" in capsys.readouterr().out
+
+
+def test_rerun_failed_needs_results(scim2_server_url):
+    with pytest.raises(SystemExit) as exc_info:
+        main([scim2_server_url, "--rerun-failed"])
+    assert exc_info.value.code == 2
+
+
+def test_rerun_failed_sub_check(scim2_server_url, tmp_path, capsys):
+    """Test that a failed sub-check runs its registered check again."""
+    path = tmp_path / "results.jsonl"
+    main([scim2_server_url, "--results", str(path), "--include", "discovery"])
+    capsys.readouterr()
+
+    store = ResultStore(path)
+    results = store.results()
+    for stored in results:
+        if stored.title == "check_query_schema_by_id":
+            stored.status = Status.ERROR
+            assert stored.check == "check_schemas_endpoint"
+    path.unlink()
+    store.save(results)
+    assert store.failed_checks() == ["check_schemas_endpoint"]
+
+    main([scim2_server_url, "--results", str(path), "--rerun-failed"])
+    output = capsys.readouterr().out
+    assert "SUCCESS check_query_schema_by_id" in output
+    assert "check_query_all_resource_types" not in output
+    assert store.failed_checks() == []
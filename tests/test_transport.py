@@ -0,0 +1,81 @@
+import asyncio
+import sys
+
+import pytest
+from scim2_client.engines.httpx import AsyncSCIMClient
+from scim2_client.engines.httpx import SyncSCIMClient
+
+from scim2_tester import Status
+from scim2_tester import check_server
+from scim2_tester import check_server_async
+from scim2_tester.cli import main
+from scim2_tester.transport import TransportOptions
+
+
+def test_limits():
+    """Test that idle connections are kept for every concurrent check."""
+    assert TransportOptions().limits().max_keepalive_connections == 20
+    assert TransportOptions().limits(50).max_keepalive_connections == 50
+    assert (
+        TransportOptions(max_connections=10).limits(50).max_keepalive_connections == 10
+    )
+    assert (
+        TransportOptions(max_keepalive_connections=5)
+        .limits(50)
+        .max_keepalive_connections
+        == 5
+    )
+
+
+def test_client_options():
+    options = TransportOptions(connect_timeout=1.0, read_timeout=30.0)
+    client = options.client("https://scim.example", token="secret")
+
+    assert client.timeout.connect == 1.0
+    assert client.timeout.read == 30.0
+    assert client.headers["Authorization"] == "Bearer secret"
+
+
+def test_missing_http2(monkeypatch):
+    monkeypatch.setitem(sys.modules, "h2", None)
+    with pytest.raises(ImportError, match="http2"):
+        TransportOptions(http2=True).client("https://scim.example")
+
+
+def test_threaded_checks(scim2_server_url):
+    """Test that threads share the connection pool of the client."""
+    options = TransportOptions(max_connections=4)
+    client = SyncSCIMClient(options.client(scim2_server_url, concurrency=4))
+    results = check_server(client, raise_exceptions=True, max_workers=4)
+    assert all(result.status == Status.SUCCESS for result in results)
+
+
+def test_async_checks(scim2_server_url):
+    async def run():
+        options = TransportOptions(max_connections=4)
+        async with options.async_client(scim2_server_url, concurrency=4) as http_client:
+            return await check_server_async(
+                AsyncSCIMClient(http_client), raise_exceptions=True, max_concurrency=4
+            )
+
+    results = asyncio.run(run())
+    assert all(result.status == Status.SUCCESS for result in results)
+
+
+def test_transport_cli(scim2_server_url, capsys):
+    main(
+        [
+            scim2_server_url,
+            "--max-workers",
+            "4",
+            "--max-connections",
+            "4",
+            "--keepalive-expiry",
+            "0",
+            "--read-timeout",
+            "10",
+        ]
+    )
+    output = capsys.readouterr().out
+    assert "SUCCESS check_object_creation" in output
+    assert "ERROR" not in output
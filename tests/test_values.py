@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from scim2_models import User
+
+from scim2_tester.filling import fill_with_random_values
+from scim2_tester.utils import CheckConfig
+from scim2_tester.values import ValueGenerator
+
+
+def test_seed_reproduces_values():
+    first = ValueGenerator(42)
+    second = ValueGenerator(42)
+    assert [first.string() for _ in range(10)] == [second.string() for _ in range(10)]
+    assert first.digits(10) == second.digits(10)
+    assert ValueGenerator(43).string() != ValueGenerator(42).string()
+
+
+def test_random_seed():
+    assert ValueGenerator().seed != ValueGenerator().seed
+
+
+def test_uuid():
+    generator = ValueGenerator(42)
+    value = generator.uuid()
+    assert value.version == 4
+    assert len(generator.digits(10)) == 10
+
+
+def test_unique_values_across_threads():
+    generator = ValueGenerator(42)
+
+    def generate(_):
+        return [generator.string() for _ in range(1000)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = [
+            value for chunk in executor.map(generate, range(8)) for value in chunk
+        ]
+
+    assert len(set(values)) == len(values)
+
+
+def test_fill_with_random_values(scim_client):
+    """Test that objects filled with the same seed are identical."""
+    field_names = ["user_name", "display_name", "emails", "phone_numbers", "active"]
+    first, _ = fill_with_random_values(
+        CheckConfig(scim_client, value_generator=ValueGenerator(42)),
+        User(),
+        field_names,
+    )
+    second, _ = fill_with_random_values(
+        CheckConfig(scim_client, value_generator=ValueGenerator(42)),
+        User(),
+        field_names,
+    )
+    assert first == second
+    assert first.user_name